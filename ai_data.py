@@ -1,29 +1,30 @@
 import time
 import asyncio
-import os
 import random
 import re
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 import openai
 from openai import OpenAI
 from research_manager import ResearchManager
 from storage_manager import StorageManager
 from exmplr_API_Tweet_Class import generate_exmplr_api_payload, generate_exmplr_link, extract_condition
+from components import get_components
 
 
 class Data_generation:
 
-    def __init__(self) -> None:
+    def __init__(self, storage: Optional[StorageManager] = None, gen_ai: Optional[OpenAI] = None,
+                 research_mgr: Optional[ResearchManager] = None) -> None:
         # Load environment variables
         load_dotenv()
         
-        # Load OpenAI API key from environment
-        self.gen_ai = OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
-        self.storage = StorageManager()
-        self.research_mgr = ResearchManager(self.storage)
+        # Shared clients from the registry unless the caller supplies its own
+        components = get_components()
+        self.gen_ai = gen_ai or components.openai
+        self.storage = storage or components.storage
+        self.research_mgr = research_mgr or components.research_manager
         # Marketing content types focused on platform capabilities
         self.content_types = [
             "Platform Update: Advanced Trial Analytics",
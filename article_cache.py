@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from url_index import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleCache:
+    """Disk-backed article text cache keyed by canonical URL.
+
+    Each entry is one JSON file (text, ETag, Last-Modified, fetched_at), so
+    a write never rewrites other entries. An in-memory index keeps LRU order
+    and sizes for eviction once max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(self, directory: str = "article_cache", max_entries: int = 1000,
+                 max_bytes: int = 20 * 1024 * 1024, fresh_for: int = 6 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        self.index: "OrderedDict[str, int]" = OrderedDict()  # key -> size in bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._load_index()
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from the files on disk, oldest first"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            files = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    stat = os.stat(os.path.join(self.directory, name))
+                    files.append((stat.st_mtime, name[:-5], stat.st_size))
+            for _, key, size in sorted(files):
+                self.index[key] = size
+                self.total_bytes += size
+            self._evict()
+        except Exception as e:
+            logger.error(f"Error loading article cache index: {e}")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Cached entry for a URL, or None"""
+        key = self._key(url)
+        if key not in self.index:
+            self.misses += 1
+            return None
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+            self.index.move_to_end(key)
+            self.hits += 1
+            return entry
+        except Exception as e:
+            logger.error(f"Error reading cached article {url}: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """True when the entry can be served without touching the network"""
+        return time.time() - entry.get('fetched_at', 0) < self.fresh_for
+
+    def validators(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Conditional GET headers for a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, text: str, etag: str = None, last_modified: str = None, strategy: str = None) -> None:
+        """Store extracted text and the validators that came with it"""
+        entry = {
+            'url': canonicalize_url(url),
+            'text': text,
+            'etag': etag,
+            'last_modified': last_modified,
+            'strategy': strategy,
+            'fetched_at': time.time()
+        }
+        self._write(self._key(url), entry)
+
+    def touch(self, url: str, entry: Dict) -> None:
+        """Mark an entry revalidated after a 304 Not Modified"""
+        self.revalidations += 1
+        self._write(self._key(url), {**entry, 'fetched_at': time.time()})
+
+    def _write(self, key: str, entry: Dict) -> None:
+        try:
+            data = json.dumps(entry)
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self.total_bytes += len(data) - self.index.pop(key, 0)
+            self.index[key] = len(data)
+            self._evict()
+        except Exception as e:
+            logger.error(f"Error writing article cache entry: {e}")
+
+    def _remove(self, key: str) -> None:
+        self.total_bytes -= self.index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error removing article cache entry: {e}")
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within both bounds"""
+        while self.index and (len(self.index) > self.max_entries or self.total_bytes > self.max_bytes):
+            key = next(iter(self.index))
+            self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self.index),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations
+        }
@@ -0,0 +1,288 @@
+import re
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from lxml import etree, html as lxml_html
+
+from article_cache import ArticleCache
+from http_client import content_type_allowed, get_http_client
+from parse_pool import get_parse_pool
+
+logger = logging.getLogger(__name__)
+
+# Parsers in default priority order
+DEFAULT_PARSER_ORDER = ['dense_text', 'newspaper', 'plain_text']
+# Last-resort parsers: they return the whole page, so they never become a domain's preference
+FALLBACK_PARSERS = {'plain_text'}
+
+# Minimum characters of text for an extraction to count
+MIN_TEXT_LENGTH = 100
+# Characters of article text kept for GPT-4 prompts
+MAX_TEXT_LENGTH = 4000
+
+# Elements dropped before scoring; their text is never article content
+NOISE_TAGS = ('script', 'style', 'noscript', 'template', 'nav', 'header', 'footer', 'aside',
+              'form', 'button', 'select', 'iframe', 'svg', 'figure')
+# Elements whose text is scored and returned as paragraphs
+TEXT_BLOCK_TAGS = frozenset(('p', 'pre', 'blockquote', 'li', 'h2', 'h3', 'h4'))
+# Blocks shorter than this are bylines, captions or buttons
+MIN_BLOCK_LENGTH = 25
+# Blocks mostly made of link text are menus or related-article lists
+MAX_LINK_DENSITY = 0.5
+# Share of a block's score credited to its parent, grandparent and so on;
+# reaching a few levels up lets paragraphs wrapped one per div add up
+ANCESTOR_WEIGHTS = (1.0, 1 / 2, 1 / 3, 1 / 4)
+# Class or id fragments of containers that are never the article body
+BOILERPLATE_HINTS = re.compile(
+    r'comment|sidebar|related|promo|newsletter|share|social|advert|sponsor|footer|popup|cookie',
+    re.IGNORECASE
+)
+
+UTF8_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+# Article downloads stop at this size, or earlier once enough paragraph text
+# has streamed in for the parsers to fill MAX_TEXT_LENGTH with room to spare
+MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024
+ENOUGH_PARAGRAPH_TEXT = 3 * MAX_TEXT_LENGTH
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+def parse_newspaper(url: str, html: str) -> str:
+    """newspaper3k article parse"""
+    # Imported on first use: newspaper3k is slow to import and rarely needed
+    from newspaper import Article
+    # Only the text is used; image fetching would download the page's images
+    article = Article(url, fetch_images=False)
+    article.set_html(html)
+    article.parse()
+    return article.text or ""
+
+def _parse_tree(html: str):
+    """Parse a page with lxml, dropping comments and elements that never hold article text"""
+    if isinstance(html, str):
+        # lxml refuses str input carrying an XML encoding declaration
+        tree = lxml_html.fromstring(html.encode('utf-8'), parser=UTF8_PARSER)
+    else:
+        tree = lxml_html.fromstring(html)
+    etree.strip_elements(tree, etree.Comment, *NOISE_TAGS, with_tail=False)
+    for br in tree.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    return tree
+
+def _is_boilerplate(element, hints: Dict) -> bool:
+    """True for containers whose class or id marks them as comments, sidebars and the like"""
+    if element not in hints:
+        hints[element] = bool(BOILERPLATE_HINTS.search(
+            f"{element.get('class', '')} {element.get('id', '')}"
+        ))
+    return hints[element]
+
+def _text_blocks(root, hints: Dict):
+    """Outermost text blocks under root in document order, skipping boilerplate containers"""
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        if element is not root:
+            if element.tag in TEXT_BLOCK_TAGS:
+                yield element
+                continue
+            if _is_boilerplate(element, hints):
+                continue
+        stack.extend(reversed([child for child in element if isinstance(child.tag, str)]))
+
+def parse_dense_text(url: str, html: str) -> str:
+    """Paragraphs of the densest text block, found in one linear scoring pass.
+
+    Text and link-text lengths are summed bottom-up over the tree; every
+    paragraph-like block then credits its nearest ancestors with its text
+    length discounted by link density, and the highest scoring container
+    wins.
+    """
+    tree = _parse_tree(html)
+    elements = [element for element in tree.iter() if isinstance(element.tag, str)]
+    text_length: Dict = {}
+    link_length: Dict = {}
+    # Document order reversed visits every child before its parent
+    for element in reversed(elements):
+        total = len((element.text or '').strip())
+        links = 0
+        for child in element:
+            if isinstance(child.tag, str):
+                total += text_length[child]
+                links += link_length[child]
+            total += len((child.tail or '').strip())
+        text_length[element] = total
+        link_length[element] = total if element.tag == 'a' else links
+    # Blocks nested inside a link (teaser cards) are all link text
+    for link in tree.iter('a'):
+        for element in link.iter():
+            if isinstance(element.tag, str):
+                link_length[element] = text_length[element]
+
+    scores: Dict = {}
+    hints: Dict = {}
+    for element in elements:
+        if element.tag not in TEXT_BLOCK_TAGS:
+            continue
+        length = text_length[element]
+        if length < MIN_BLOCK_LENGTH:
+            continue
+        score = length * (1 - link_length[element] / length)
+        container = element.getparent()
+        for weight in ANCESTOR_WEIGHTS:
+            if container is None:
+                break
+            if not _is_boilerplate(container, hints):
+                scores[container] = scores.get(container, 0) + score * weight
+            container = container.getparent()
+    if not scores:
+        return ""
+
+    best = max(scores, key=scores.get)
+    paragraphs = []
+    for block in _text_blocks(best, hints):
+        length = text_length[block]
+        if length < MIN_BLOCK_LENGTH or link_length[block] / length > MAX_LINK_DENSITY:
+            continue
+        paragraphs.append(' '.join(block.text_content().split()))
+    return "\n\n".join(paragraphs)
+
+def parse_plain_text(url: str, html: str) -> str:
+    """All visible text of the page body with whitespace collapsed"""
+    tree = _parse_tree(html)
+    body = tree.find('body')
+    return ' '.join((body if body is not None else tree).text_content().split())
+
+PARSERS = {
+    'newspaper': parse_newspaper,
+    'dense_text': parse_dense_text,
+    'plain_text': parse_plain_text,
+}
+
+def run_parsers(url: str, html: str, order: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Try each parser over the same HTML; returns (strategy, text) of the first that succeeds.
+
+    Runs in a worker process so the page is shipped to the pool only once.
+    """
+    for name in order:
+        try:
+            text = PARSERS[name](url, html)
+        except Exception as e:
+            logger.debug(f"{name} parser failed for {url}: {e}")
+            continue
+        if text and len(text.strip()) > MIN_TEXT_LENGTH:
+            return name, text
+    return None, None
+
+
+class TextBudget:
+    """Streaming check that counts paragraph text as the HTML arrives"""
+
+    def __init__(self, target: int = ENOUGH_PARAGRAPH_TEXT):
+        self.target = target
+        self.text_length = 0
+        self._parser = etree.HTMLPullParser(events=('end',), tag='p')
+
+    def __call__(self, chunk: bytes) -> bool:
+        """Feed the next chunk; True once target characters of paragraph text were seen"""
+        self._parser.feed(chunk)
+        for _, paragraph in self._parser.read_events():
+            self.text_length += len(' '.join(''.join(paragraph.itertext()).split()))
+        return self.text_length >= self.target
+
+
+class ArticleExtractor:
+    """Downloads each article once and runs the parsers over the same bytes.
+
+    The content parser that wins for a domain is tried first for later URLs
+    from that domain; a fallback win leaves the default order in place.
+    Extracted text is cached per URL; fresh entries skip the network and
+    stale ones are revalidated with a conditional GET.
+    """
+
+    def __init__(self, parser_order: Optional[List[str]] = None, cache: Optional[ArticleCache] = None):
+        self.parser_order = parser_order or list(DEFAULT_PARSER_ORDER)
+        self.cache = cache if cache is not None else ArticleCache()
+        self.domain_strategy: Dict[str, str] = {}
+        self.strategy_counts: Counter = Counter()
+
+    def _get_domain(self, url: str) -> str:
+        parsed = urlparse(url)
+        return parsed.netloc or parsed.path
+
+    def parsers_for(self, url: str) -> List[str]:
+        """Parser order for a URL, preferring the domain's previous winner"""
+        preferred = self.domain_strategy.get(self._get_domain(url))
+        if not preferred:
+            return list(self.parser_order)
+        return [preferred] + [name for name in self.parser_order if name != preferred]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """Download the page once; returns the response for 200 and 304.
+
+        HTML is streamed until MAX_DOWNLOAD_BYTES or until enough paragraph
+        text has arrived; other content types are rejected unread.
+        """
+        try:
+            response = await get_http_client().get_capped(
+                url,
+                headers=headers,
+                max_bytes=MAX_DOWNLOAD_BYTES,
+                content_types=HTML_CONTENT_TYPES,
+                enough=TextBudget()
+            )
+            if response.status_code == 200 and not content_type_allowed(response, HTML_CONTENT_TYPES):
+                logger.info(f"Skipping {url}: {response.headers.get('Content-Type')} is not HTML")
+                return None
+            if response.status_code in (200, 304):
+                if response.extensions.get('truncated'):
+                    logger.info(f"Stopped reading {url} after {len(response.content)} bytes")
+                return response
+            logger.warning(f"Fetching {url} returned HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Fetching {url} failed: {e}")
+        return None
+
+    async def parse(self, url: str, html: str) -> Tuple[Optional[str], Optional[str]]:
+        """Run the parsers in the worker pool and record the winner"""
+        loop = asyncio.get_running_loop()
+        strategy, text = await loop.run_in_executor(get_parse_pool(), run_parsers, url, html, self.parsers_for(url))
+        if strategy:
+            domain = self._get_domain(url)
+            if strategy in FALLBACK_PARSERS:
+                # Keep trying the content parsers first on this domain's next page
+                self.domain_strategy.pop(domain, None)
+            else:
+                self.domain_strategy[domain] = strategy
+            self.strategy_counts[strategy] += 1
+        return strategy, text
+
+    async def extract(self, url: str) -> Optional[str]:
+        """Fetch and parse an article, returning at most MAX_TEXT_LENGTH characters"""
+        cached = self.cache.get(url)
+        if cached and self.cache.is_fresh(cached):
+            return cached['text'][:MAX_TEXT_LENGTH]
+
+        response = await self.fetch(url, self.cache.validators(cached))
+        if response is None:
+            return None
+        if response.status_code == 304:
+            if cached:
+                self.cache.touch(url, cached)
+                return cached['text'][:MAX_TEXT_LENGTH]
+            return None
+
+        strategy, text = await self.parse(url, response.text)
+        if not text:
+            return None
+        logger.info(f"Extracted {url} with {strategy} parser")
+        self.cache.put(
+            url,
+            text[:MAX_TEXT_LENGTH],
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            strategy=strategy
+        )
+        return text[:MAX_TEXT_LENGTH]
@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the $EXMPLR agent.
+
+The modules in this package drive the real agent code against local
+stand-ins for Twitter, OpenAI, Supabase and the news sources, using a
+virtual clock so days of operation can be simulated in seconds.
+"""
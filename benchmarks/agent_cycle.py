@@ -0,0 +1,338 @@
+"""
+End-to-end benchmark of the agent's main() loop on a simulated clock.
+
+Drives the real Twitter class and the scheduling loop from main.py against
+the stand-ins in benchmarks.fakes and reports throughput, per-stage latency
+and calls per output as JSON.
+
+Usage:
+    python -m benchmarks.agent_cycle --days 7 --output bench_output.txt
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import weakref
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, Optional
+from unittest import mock
+
+from benchmarks.fakes import (
+    FakeFeeds, FakeHTTP, FakeOpenAI, FakePaginator, FakeStorage,
+    FakeTwitterClient, InlineExecutor, MentionStream, SimulationComplete,
+    VirtualClock
+)
+from benchmarks.metrics import Metrics, git_revision
+
+# Monday 2025-01-20 09:00 America/Chicago
+DEFAULT_START = datetime(2025, 1, 20, 15, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _import_agent():
+    """Import the agent modules with placeholder credentials"""
+    for name in ('OPENAI_API_KEY', 'SUPABASE_URL', 'SUPABASE_KEY', 'GOOGLE_API_KEY', 'SEARCH_ENGINE_ID'):
+        os.environ.setdefault(name, 'benchmark')
+    import main
+    import components
+    import twitter
+    import ai_data
+    import collect_news
+    import research_manager
+    import article_extractor
+    import article_cache
+    import http_client
+    import feed_state
+    import feed_service
+    import feed_scheduler
+    import url_index
+    import search_client
+    import rate_limit_manager
+    import domain_limiter
+    import exmplr_API_Tweet_Class
+    return SimpleNamespace(
+        main=main, components=components, twitter=twitter, ai_data=ai_data, collect_news=collect_news,
+        research_manager=research_manager, article_extractor=article_extractor,
+        article_cache=article_cache, http_client=http_client, feed_state=feed_state,
+        feed_service=feed_service, feed_scheduler=feed_scheduler,
+        url_index=url_index, search_client=search_client,
+        rate_limit_manager=rate_limit_manager, domain_limiter=domain_limiter, exmplr_api=exmplr_API_Tweet_Class
+    )
+
+
+def build_environment(days: float = 7, seed: int = 42, mentions_per_hour: float = 2.0,
+                      start: float = DEFAULT_START, mention_stream: Optional[MentionStream] = None,
+                      update_times: Optional[Dict[str, datetime]] = None) -> SimpleNamespace:
+    """Create the virtual clock and all service stand-ins"""
+    rng = random.Random(seed)
+    end = start + days * 86400
+    clock = VirtualClock(start, end)
+    metrics = Metrics()
+    mentions = mention_stream or MentionStream(random.Random(seed + 1), start, end, mentions_per_hour)
+    feeds = FakeFeeds(clock, rng)
+    http = FakeHTTP(clock, metrics, rng, feeds)
+    if update_times is None:
+        # Make the first Wednesday eligible for the weekly research post
+        update_times = {'weekly': datetime.fromtimestamp(start, timezone.utc) - timedelta(days=7)}
+    return SimpleNamespace(
+        rng=rng,
+        clock=clock,
+        metrics=metrics,
+        mentions=mentions,
+        llm=FakeOpenAI(clock, metrics, rng),
+        twitter_client=FakeTwitterClient(clock, metrics, rng, mentions),
+        storage=FakeStorage(clock, metrics, update_times=update_times),
+        feeds=feeds,
+        http=http,
+        transport=None,
+        limiter=None,
+        feed_service=None,
+        agent=None
+    )
+
+
+@contextlib.contextmanager
+def patched_agent(env: SimpleNamespace, modules: SimpleNamespace):
+    """Point every external dependency of the agent modules at the stand-ins"""
+    time_module = env.clock.time_module()
+    asyncio_module = env.clock.asyncio_module()
+    virtual_datetime = env.clock.datetime_class()
+    tweepy_module = SimpleNamespace(
+        Client=lambda **kwargs: env.twitter_client,
+        Paginator=FakePaginator
+    )
+    # The real pooled transport, with the network swapped for the stand-ins
+    env.limiter = modules.domain_limiter.DomainLimiter()
+    env.transport = modules.http_client.HTTPClient(transport=env.http.transport(), limiter=env.limiter)
+    env.feed_service = modules.feed_service.FeedService()
+    patches = [
+        (modules.main, 'time', time_module),
+        (modules.main, 'datetime', virtual_datetime),
+        (modules.twitter, 'tweepy', tweepy_module),
+        (modules.twitter, 'time', time_module),
+        (modules.twitter, 'asyncio', asyncio_module),
+        (modules.twitter, 'datetime', virtual_datetime),
+        (modules.twitter, 'gen_ai', env.llm),
+        # A fresh registry, so the agent's shared clients are the stand-ins
+        (modules.components, '_components', None),
+        (modules.components, 'OpenAI', lambda **kwargs: env.llm),
+        (modules.components, 'StorageManager', lambda: env.storage),
+        (modules.ai_data, 'time', time_module),
+        (modules.ai_data, 'asyncio', asyncio_module),
+        (modules.research_manager, 'OpenAI', lambda **kwargs: env.llm),
+        (modules.research_manager, 'datetime', virtual_datetime),
+        (modules.rate_limit_manager, 'time', time_module),
+        (modules.rate_limit_manager, 'datetime', virtual_datetime),
+        # Managers created here are flushed below, not at interpreter exit
+        (modules.rate_limit_manager, '_managers', weakref.WeakSet()),
+        (modules.http_client, '_client', env.transport),
+        (modules.http_client, 'time', time_module),
+        (modules.domain_limiter, '_limiter', env.limiter),
+        (modules.domain_limiter, 'time', time_module),
+        (modules.domain_limiter, 'asyncio', asyncio_module),
+        # Created lazily so its state file lands in the temporary directory
+        (modules.feed_state, '_store', None),
+        (modules.feed_service, '_service', env.feed_service),
+        (modules.feed_service, 'get_parse_pool', lambda: InlineExecutor()),
+        (modules.feed_service, 'time', time_module),
+        (modules.feed_scheduler, 'time', time_module),
+        (modules.collect_news, 'time', time_module),
+        (modules.url_index, '_index', None),
+        (modules.url_index, 'time', time_module),
+        (modules.search_client, '_client', None),
+        (modules.search_client, 'time', time_module),
+        (modules.feed_service, 'ThreadPoolExecutor', lambda **kwargs: InlineExecutor()),
+        (modules.article_cache, 'time', time_module),
+        (modules.article_extractor, 'get_parse_pool', lambda: InlineExecutor()),
+        (modules.exmplr_api, 'gen_ai', env.llm),
+    ]
+    with contextlib.ExitStack() as stack:
+        for module, name, value in patches:
+            stack.enter_context(mock.patch.object(module, name, value))
+        # JSON fallbacks (rate_limits.json etc.) must not land in the repo
+        workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        stack.callback(os.chdir, cwd)
+        # Shutdown flush of write-behind state, while still in the temporary directory
+        stack.callback(modules.rate_limit_manager.flush_all)
+        yield
+
+
+def _timed(env: SimpleNamespace, stage: str, func):
+    """Wrap a sync or async agent method to record its simulated latency"""
+    if asyncio.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            started, cpu = env.clock.now, time.perf_counter()
+            result = await func(*args, **kwargs)
+            env.metrics.record_stage(stage, env.clock.now - started, time.perf_counter() - cpu)
+            return result
+    else:
+        def wrapper(*args, **kwargs):
+            started, cpu = env.clock.now, time.perf_counter()
+            result = func(*args, **kwargs)
+            env.metrics.record_stage(stage, env.clock.now - started, time.perf_counter() - cpu)
+            return result
+    return wrapper
+
+
+def instrument(env: SimpleNamespace, client) -> None:
+    """Attach stage timers to a Twitter instance"""
+    cycle_starts = []
+    make_reply = _timed(env, 'mentions', client.make_reply_to_mention)
+
+    def make_reply_to_mention():
+        # Every main() cycle starts with the mention check
+        if cycle_starts:
+            env.metrics.record_stage('cycle', env.clock.now - cycle_starts[-1], 0.0)
+        cycle_starts.append(env.clock.now)
+        return make_reply()
+
+    news = _timed(env, 'news', client.analyze_news)
+    weekly = _timed(env, 'weekly_research', client.analyze_news)
+
+    async def analyze_news(is_weekly=False):
+        return await (weekly if is_weekly else news)(is_weekly=is_weekly)
+
+    client.make_reply_to_mention = make_reply_to_mention
+    client.check_news_feeds = _timed(env, 'feeds', client.check_news_feeds)
+    client.monitor_following_feed = _timed(env, 'timeline', client.monitor_following_feed)
+    client.search_and_interact = _timed(env, 'search', client.search_and_interact)
+    client.analyze_news = analyze_news
+    client.gen_ai.generate_marketing_post = _timed(env, 'marketing', client.gen_ai.generate_marketing_post)
+
+
+@contextlib.contextmanager
+def quiet(verbose: bool = False):
+    """Silence agent logging and prints unless running verbose"""
+    if verbose:
+        yield
+        return
+    logging.disable(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def run_simulation(coroutine_factory) -> float:
+    """Run agent code until the virtual clock reaches its horizon"""
+    started = time.perf_counter()
+    try:
+        asyncio.run(coroutine_factory())
+    except SimulationComplete:
+        pass
+    return time.perf_counter() - started
+
+
+def _pacing_report(limiter) -> Dict:
+    """Domain limiter totals: requests, requests that waited for a token, and time waited"""
+    stats = limiter.stats().values() if limiter else []
+    return {
+        'domains': len(stats),
+        'requests': sum(s['requests'] for s in stats),
+        'delayed': sum(s['delayed'] for s in stats),
+        'wait_total': round(sum(s['wait_total'] for s in stats), 3),
+        'wait_max': max((s['wait_max'] for s in stats), default=0.0)
+    }
+
+
+def report(env: SimpleNamespace, wall_seconds: float, benchmark: str) -> Dict:
+    """Build the JSON-serialisable result document"""
+    metrics = env.metrics
+    outputs = metrics.outputs
+    hours = (env.clock.now - env.clock.start) / 3600
+    published = outputs['mentions_replied'] + outputs['replies'] + outputs['posts_made'] + outputs['quotes']
+    llm_calls = metrics.total_calls('llm')
+    api_calls = metrics.total_calls('twitter') + metrics.total_calls('http')
+
+    def ratio(numerator, denominator):
+        return round(numerator / denominator, 3) if denominator else None
+
+    return {
+        'benchmark': benchmark,
+        'git_revision': git_revision(),
+        'simulated_hours': round(hours, 2),
+        'wall_seconds': round(wall_seconds, 3),
+        'speedup': ratio(hours * 3600, wall_seconds),
+        'throughput': {
+            'mentions_arrived': env.mentions.arrived(env.clock.now),
+            'mentions_replied': outputs['mentions_replied'],
+            'articles_queued': outputs['articles_queued'],
+            'posts_made': outputs['posts_made'],
+            'news_posts': outputs['news_posts'],
+            'quotes': outputs['quotes'],
+            'likes': outputs['likes'],
+            'retweets': outputs['retweets'],
+            'mentions_replied_per_hour': ratio(outputs['mentions_replied'], hours),
+            'articles_queued_per_hour': ratio(outputs['articles_queued'], hours),
+            'posts_made_per_hour': ratio(outputs['posts_made'], hours)
+        },
+        'stages': metrics.stage_report(),
+        'calls': metrics.calls_report(),
+        'transport': env.transport.stats() if env.transport else {},
+        'pacing': _pacing_report(env.limiter),
+        'feed_parsing': env.feed_service.parse_report() if env.feed_service else {},
+        'feed_polling': {
+            'skipped_not_due': sum(env.feed_service.skipped.values()) if env.feed_service else 0
+        },
+        'efficiency': {
+            'published_outputs': published,
+            'llm_calls_per_output': ratio(llm_calls, published),
+            'api_calls_per_output': ratio(api_calls, published),
+            'llm_calls_per_queued_article': ratio(metrics.calls['llm']['news_tweet'] + metrics.calls['llm']['relevance'],
+                                                  outputs['articles_queued'])
+        },
+        'sleep': {
+            'simulated_seconds_sleeping': round(env.clock.slept, 1),
+            'share_of_time_sleeping': ratio(env.clock.slept, hours * 3600)
+        }
+    }
+
+
+def run(days: float = 7, seed: int = 42, mentions_per_hour: float = 2.0, verbose: bool = False) -> Dict:
+    """Simulate ``days`` of main() and return the result document"""
+    with quiet(verbose):
+        modules = _import_agent()
+        env = build_environment(days=days, seed=seed, mentions_per_hour=mentions_per_hour)
+
+        def make_client():
+            client = modules.twitter.Twitter()
+            instrument(env, client)
+            env.agent = client
+            return client
+
+        with patched_agent(env, modules), mock.patch.object(modules.main, 'Twitter', make_client):
+            wall_seconds = run_simulation(modules.main.main)
+    return report(env, wall_seconds, 'agent_cycle')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate the agent main loop on a virtual clock")
+    parser.add_argument('--days', type=float, default=7, help="simulated days (default: 7)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mentions-per-hour', type=float, default=2.0)
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    parser.add_argument('--verbose', action='store_true', help="show agent logs")
+    args = parser.parse_args(argv)
+
+    result = run(days=args.days, seed=args.seed, mentions_per_hour=args.mentions_per_hour, verbose=args.verbose)
+    document = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
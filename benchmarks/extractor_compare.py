@@ -0,0 +1,145 @@
+"""
+Speed and quality of the article parsers on saved HTML pages.
+
+Runs each parser in article_extractor.PARSERS over the pages in
+benchmarks/fixtures and scores the output against the hand-checked article
+text stored next to each page (<name>.txt), reporting parse time and
+word-level precision, recall and F1 per parser and page as JSON.
+
+Usage:
+    python -m benchmarks.extractor_compare --repeat 3 --output extractor_output.txt
+    python -m benchmarks.extractor_compare --parsers dense_text newspaper
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from benchmarks.metrics import git_revision, percentile
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+FIXTURE_URL = "https://news.example.com/articles/{name}"
+
+
+def _words(text: str) -> Counter:
+    return Counter(re.findall(r"\w+", text.lower()))
+
+
+def quality(extracted: str, expected: str) -> Dict[str, float]:
+    """Word-overlap precision, recall and F1 of extracted text against the expected text"""
+    got = _words(extracted or "")
+    want = _words(expected)
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 3), 'recall': round(recall, 3), 'f1': round(f1, 3)}
+
+
+def load_fixtures(directory: str = FIXTURES_DIR) -> List[Dict]:
+    """Pages with an expected-text file next to them"""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        expected_path = path[:-len('.html')] + '.txt'
+        if not os.path.exists(expected_path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = f.read()
+        name = os.path.basename(path)[:-len('.html')]
+        fixtures.append({'name': name, 'html': html, 'expected': expected})
+    return fixtures
+
+
+def time_parser(parser, url: str, html: str, repeat: int) -> Dict:
+    """Median and worst parse time in milliseconds, with the output of the last run"""
+    timings = []
+    text = ""
+    error = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            text = parser(url, html)
+        except Exception as e:
+            text, error = "", str(e)
+        timings.append(time.perf_counter() - started)
+    return {
+        'text': text,
+        'error': error,
+        'ms_p50': round(percentile(timings, 50) * 1000, 2),
+        'ms_max': round(max(timings) * 1000, 2)
+    }
+
+
+def run(parsers: Optional[List[str]] = None, repeat: int = 3, directory: str = FIXTURES_DIR) -> Dict:
+    from article_extractor import MIN_TEXT_LENGTH, PARSERS
+
+    names = parsers or list(PARSERS)
+    fixtures = load_fixtures(directory)
+    pages = {}
+    totals = {name: {'ms_total': 0.0, 'f1': []} for name in names}
+    for fixture in fixtures:
+        url = FIXTURE_URL.format(name=fixture['name'])
+        results = {}
+        for name in names:
+            timing = time_parser(PARSERS[name], url, fixture['html'], repeat)
+            score = quality(timing['text'], fixture['expected'])
+            results[name] = {
+                'ms_p50': timing['ms_p50'],
+                'ms_max': timing['ms_max'],
+                'chars': len(timing['text'] or ""),
+                'accepted': len((timing['text'] or "").strip()) > MIN_TEXT_LENGTH,
+                **score
+            }
+            if timing['error']:
+                results[name]['error'] = timing['error']
+            totals[name]['ms_total'] += timing['ms_p50']
+            totals[name]['f1'].append(score['f1'])
+        pages[fixture['name']] = {'html_bytes': len(fixture['html'].encode('utf-8')), 'parsers': results}
+
+    summary = {
+        name: {
+            'ms_total': round(stats['ms_total'], 2),
+            'f1_mean': round(sum(stats['f1']) / len(stats['f1']), 3) if stats['f1'] else None,
+            'f1_min': min(stats['f1']) if stats['f1'] else None
+        }
+        for name, stats in totals.items()
+    }
+    return {
+        'benchmark': 'extractor_compare',
+        'git_revision': git_revision(),
+        'repeat': repeat,
+        'fixtures': len(fixtures),
+        'summary': summary,
+        'pages': pages
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare article parser speed and quality on saved pages")
+    parser.add_argument('--parsers', nargs='+', help="parsers to compare (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per parser and page (default: 3)")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="directory of <name>.html and <name>.txt pairs")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    result = run(parsers=args.parsers, repeat=max(1, args.repeat), directory=args.fixtures)
+    document = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,677 @@
+import asyncio
+import random
+import zlib
+from email.utils import format_datetime
+from concurrent.futures import Executor, Future
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape
+
+import httpx
+
+from benchmarks.metrics import Metrics
+
+_real_asyncio_sleep = asyncio.sleep
+
+
+class SimulationComplete(BaseException):
+    """Raised by the virtual clock once the simulated horizon is reached.
+
+    Derives from BaseException so the agent's ``except Exception`` handlers
+    cannot swallow it and keep the loop running.
+    """
+
+
+class VirtualClock:
+    def __init__(self, start: float, end: float):
+        self.start = start
+        self.end = end
+        self.now = start
+        self.slept = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward without yielding (simulated I/O latency)"""
+        self.now += max(0.0, seconds)
+
+    def sleep(self, seconds: float) -> None:
+        """Stand-in for time.sleep; ends the simulation past the horizon"""
+        self.slept += max(0.0, seconds)
+        self.advance(seconds)
+        if self.now >= self.end:
+            raise SimulationComplete()
+
+    async def async_sleep(self, seconds: float, result: Any = None) -> Any:
+        """Stand-in for asyncio.sleep"""
+        self.sleep(seconds)
+        await _real_asyncio_sleep(0)
+        return result
+
+    def datetime(self, tz=timezone.utc) -> datetime:
+        return datetime.fromtimestamp(self.now, tz)
+
+    def time_module(self) -> SimpleNamespace:
+        """Replacement for the ``time`` module inside agent modules"""
+        return SimpleNamespace(sleep=self.sleep, time=self.time, monotonic=self.time)
+
+    def asyncio_module(self) -> "AsyncioShim":
+        return AsyncioShim(self)
+
+    def datetime_class(self) -> type:
+        """datetime subclass whose now() follows the virtual clock"""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(clock.now, tz)
+
+            @classmethod
+            def utcnow(cls):
+                return datetime.fromtimestamp(clock.now, timezone.utc).replace(tzinfo=None)
+
+        return VirtualDatetime
+
+
+class InlineExecutor(Executor):
+    """Runs submitted work immediately so worker pools stay on the virtual clock"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class AsyncioShim:
+    """Proxies the asyncio module, replacing sleep with the virtual clock"""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(asyncio, name)
+
+    def sleep(self, delay: float, result: Any = None):
+        return self._clock.async_sleep(delay, result)
+
+
+def _response(data: Any = None, includes: Optional[Dict] = None) -> SimpleNamespace:
+    """Shape of a tweepy.Response"""
+    return SimpleNamespace(data=data, includes=includes or {}, errors=[], meta={})
+
+
+# ---------------------------------------------------------------------------
+# OpenAI
+# ---------------------------------------------------------------------------
+
+RESEARCH_THREAD = "\n\n".join([
+    "(1/7) 💡 AI trial matching cuts screening time by 40%. $EXMPLR tracks the shift. #AIinHealthcare",
+    "(2/7) 📊 Over 3,000 trials now report AI-assisted recruitment, up from 900 in 2023.",
+    "(3/7) 🔬 New models flag eligible patients with 91% precision in retrospective cohorts.",
+    "(4/7) 💪 Impact: $EXMPLR analytics surface matching trials in seconds, not weeks.",
+    "(5/7) 🚀 By 2026, half of phase II sponsors expect AI-driven site selection.",
+    "(6/7) 🌐 Regulators are publishing guidance on validated AI tools in trials.",
+    "(7/7) ✨ Explore the data with $EXMPLR. Follow @exmplrai https://app.exmplr.io"
+])
+
+CLASSIFIER_KEYWORDS = [
+    ('price', 'price_trading'),
+    ('token', 'price_trading'),
+    ('trial', 'clinical_trials'),
+    ('study', 'clinical_trials'),
+    ('exmplr', 'product_inquiry'),
+    ('platform', 'product_inquiry'),
+    ('today', 'live_data'),
+    ('hello', 'random'),
+]
+
+
+class FakeOpenAI:
+    """Answers each agent prompt with a plausible canned completion"""
+
+    def __init__(self, clock: VirtualClock, metrics: Metrics, rng: random.Random,
+                 latency: tuple = (2.0, 8.0), relevance_rate: float = 0.4):
+        self.clock = clock
+        self.metrics = metrics
+        self.rng = rng
+        self.latency = latency
+        self.relevance_rate = relevance_rate
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str = None, messages: List[Dict] = None, **kwargs) -> SimpleNamespace:
+        prompt = messages[-1]['content'] if messages else ''
+        kind, content = self._respond(prompt)
+        self.metrics.count('llm', kind)
+        self.clock.advance(self.rng.uniform(*self.latency))
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _respond(self, prompt: str) -> tuple:
+        if 'query classifier' in prompt:
+            query = prompt.split('Query:', 1)[-1].lower()
+            for keyword, category in CLASSIFIER_KEYWORDS:
+                if keyword in query:
+                    return 'classify', category
+            return 'classify', 'generic_healthcare'
+        if 'Extract the medical condition' in prompt:
+            return 'extract_condition', self.rng.choice(['diabetes', 'breast cancer', 'clinical research'])
+        if "Return ONLY 'relevant'" in prompt:
+            relevant = self.rng.random() < self.relevance_rate
+            return 'relevance', 'relevant' if relevant else 'not relevant'
+        if 'Extract key insights' in prompt:
+            return 'insights', '- 40% faster screening\n- 3,000 AI-enabled trials'
+        if 'research thread about' in prompt:
+            return 'research_thread', RESEARCH_THREAD
+        if 'Twitter thread (7 tweets)' in prompt:
+            return 'weekly_thread', RESEARCH_THREAD
+        if 'Twitter thread (3 tweets)' in prompt:
+            return 'marketing_thread', (
+                "(1/3) 🔬 Trial Analytics processes 10,000+ trials daily with $EXMPLR.\n\n"
+                "(2/3) 📊 Matching accuracy reaches 95% across 500+ research centers.\n\n"
+                "(3/3) 💡 See it at https://app.exmplr.io with @exmplrai and $EXMPLR."
+            )
+        if 'single powerful tweet' in prompt:
+            return 'marketing_tweet', "🔬 $EXMPLR Trial Monitoring tracks 50,000+ updates daily. https://app.exmplr.io"
+        if 'concise, impactful tweet' in prompt:
+            return 'news_tweet', "🔬 New AI model improves trial recruitment by 35% in a multi-site study."
+        if 'single concise reply tweet' in prompt:
+            return 'reply', "🔍 $EXMPLR Agent finds matching trials in seconds. Explore https://app.exmplr.io"
+        return 'other', 'ok'
+
+
+# ---------------------------------------------------------------------------
+# Twitter
+# ---------------------------------------------------------------------------
+
+MENTION_TEMPLATES = {
+    'clinical_trials': [
+        "@exmplr_agent any diabetes trial recruiting near Boston?",
+        "@exmplr_agent looking for a breast cancer study for my mother",
+    ],
+    'generic_healthcare': [
+        "@exmplr_agent what are the side effects of metformin?",
+        "@exmplr_agent is immunotherapy effective for melanoma?",
+    ],
+    'product_inquiry': [
+        "@exmplr_agent what does the Exmplr platform do?",
+    ],
+    'price_trading': [
+        "@exmplr_agent wen token pump? price target?",
+    ],
+    'live_data': [
+        "@exmplr_agent what changed in oncology trials today?",
+    ],
+    'random': [
+        "@exmplr_agent hello bot, how are you?",
+    ],
+}
+
+PII_TEMPLATES = [
+    "@exmplr_agent I am 54 and I have type 2 diabetes, any trial for me?",
+    "@exmplr_agent my name is Sam and I have leukemia, which study should I join?",
+]
+
+
+class MentionStream:
+    """Synthetic mentions arriving over simulated time"""
+
+    def __init__(self, rng: random.Random, start: float, end: float,
+                 per_hour: float, history: int = 10,
+                 category_weights: Optional[Dict[str, float]] = None,
+                 pii_rate: float = 0.1, reference_rate: float = 0.3,
+                 bursts: Optional[List[tuple]] = None):
+        self.rng = rng
+        self.category_weights = category_weights or {
+            'clinical_trials': 0.35, 'generic_healthcare': 0.25, 'product_inquiry': 0.15,
+            'price_trading': 0.1, 'live_data': 0.05, 'random': 0.1
+        }
+        self.pii_rate = pii_rate
+        self.reference_rate = reference_rate
+        self.mentions: List[SimpleNamespace] = []
+        self.referenced: Dict[int, str] = {}
+        self.replied_at: Dict[int, float] = {}
+        self._next_id = 5_000_000
+
+        # Mentions received before the agent started
+        for i in range(history):
+            self._add(start - (history - i) * 600)
+
+        # Poisson arrivals, optionally with (start, end, per_hour) burst windows
+        arrival = start
+        while per_hour > 0:
+            arrival += rng.expovariate(per_hour / 3600)
+            if arrival >= end:
+                break
+            self._add(arrival)
+        for burst_start, burst_end, burst_rate in bursts or []:
+            arrival = burst_start
+            while True:
+                arrival += rng.expovariate(burst_rate / 3600)
+                if arrival >= min(burst_end, end):
+                    break
+                self._add(arrival)
+        self.mentions.sort(key=lambda m: m.arrived_at)
+        self._ids = {m.id: m for m in self.mentions}
+
+    def _add(self, arrived_at: float) -> None:
+        self._next_id += 1
+        categories = list(self.category_weights)
+        category = self.rng.choices(categories, weights=[self.category_weights[c] for c in categories])[0]
+        is_pii = self.rng.random() < self.pii_rate
+        text = self.rng.choice(PII_TEMPLATES if is_pii else MENTION_TEMPLATES[category])
+
+        referenced_tweets = None
+        if self.rng.random() < self.reference_rate:
+            ref_id = self._next_id + 10_000_000
+            self.referenced[ref_id] = "New AI-assisted trial shows faster recruitment in oncology."
+            referenced_tweets = [SimpleNamespace(id=ref_id, type='quoted')]
+
+        self.mentions.append(SimpleNamespace(
+            id=self._next_id,
+            text=text,
+            author_id=self.rng.randint(10_000, 99_999),
+            created_at=datetime.fromtimestamp(arrived_at, timezone.utc),
+            referenced_tweets=referenced_tweets,
+            arrived_at=arrived_at,
+            category=category,
+            is_pii=is_pii
+        ))
+
+    def visible(self, now: float, limit: int) -> List[SimpleNamespace]:
+        """Newest-first mentions that have arrived by ``now``"""
+        result = []
+        for mention in reversed(self.mentions):
+            if mention.arrived_at > now:
+                continue
+            result.append(mention)
+            if len(result) >= limit:
+                break
+        return result
+
+    def arrived(self, now: float) -> int:
+        return sum(1 for m in self.mentions if m.arrived_at <= now)
+
+    def mark_replied(self, tweet_id: int, now: float) -> bool:
+        if tweet_id in self._ids and tweet_id not in self.replied_at:
+            self.replied_at[tweet_id] = now
+            return True
+        return False
+
+
+class FakePaginator:
+    """Single-page stand-in for tweepy.Paginator"""
+
+    def __init__(self, method, *args, **kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    def flatten(self, limit: int = None):
+        response = self.method(*self.args, **self.kwargs)
+        for item in (response.data or [])[:limit]:
+            yield item
+
+
+class FakeTwitterClient:
+    """tweepy.Client stand-in backed by a MentionStream and synthetic timelines"""
+
+    def __init__(self, clock: VirtualClock, metrics: Metrics, rng: random.Random,
+                 mentions: MentionStream, user_id: int = 1000,
+                 latency: tuple = (0.2, 1.0)):
+        self.clock = clock
+        self.metrics = metrics
+        self.rng = rng
+        self.mentions = mentions
+        self.user_id = user_id
+        self.latency = latency
+        self.posts: List[Dict] = []
+        self._next_id = 90_000_000
+
+    def _call(self, operation: str) -> None:
+        self.metrics.count('twitter', operation)
+        self.clock.advance(self.rng.uniform(*self.latency))
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def get_me(self, **kwargs):
+        self._call('get_me')
+        return _response(SimpleNamespace(id=self.user_id, username='exmplr_agent', name='$EXMPLR Agent'))
+
+    def get_users_mentions(self, id, max_results: int = 10, **kwargs):
+        self._call('get_users_mentions')
+        return _response(self.mentions.visible(self.clock.now, max_results))
+
+    def get_tweet(self, id, **kwargs):
+        self._call('get_tweet')
+        text = self.mentions.referenced.get(id)
+        if text is None:
+            raise Exception(f"404 Not Found: tweet {id}")
+        return _response(SimpleNamespace(id=id, text=text))
+
+    def like(self, tweet_id, **kwargs):
+        self._call('like')
+        self.metrics.outputs['likes'] += 1
+        return _response({'liked': True})
+
+    def retweet(self, tweet_id, **kwargs):
+        self._call('retweet')
+        self.metrics.outputs['retweets'] += 1
+        return _response({'retweeted': True})
+
+    def create_tweet(self, text: str = None, in_reply_to_tweet_id=None, quote_tweet_id=None, **kwargs):
+        self._call('create_tweet')
+        tweet_id = self._new_id()
+        if in_reply_to_tweet_id is not None:
+            kind = 'mentions_replied' if self.mentions.mark_replied(in_reply_to_tweet_id, self.clock.now) else 'replies'
+        elif quote_tweet_id is not None:
+            kind = 'quotes'
+        else:
+            kind = 'posts_made'
+        self.metrics.outputs[kind] += 1
+        self.posts.append({'id': tweet_id, 'kind': kind, 'text': text, 'at': self.clock.now})
+        return _response({'id': str(tweet_id), 'text': text})
+
+    def _synthetic_tweets(self, count: int, topic: str):
+        words = ["AI", "healthcare", "clinical", "trials", "research", "medical", "crypto", "startup"]
+        tweets, users = [], {}
+        for _ in range(count):
+            author_id = self.rng.randint(1, 400)
+            if author_id not in users:
+                users[author_id] = SimpleNamespace(
+                    id=author_id,
+                    public_metrics={'followers_count': int(self.rng.paretovariate(1.2) * 2000)},
+                    verified=self.rng.random() < 0.1
+                )
+            text = f"{topic}: " + " ".join(self.rng.sample(words, self.rng.randint(2, 5)))
+            age = self.rng.uniform(0, 12 * 3600)
+            tweets.append(SimpleNamespace(
+                id=self._new_id(),
+                text=text,
+                author_id=author_id,
+                created_at=datetime.fromtimestamp(self.clock.now - age, timezone.utc),
+                public_metrics={
+                    'retweet_count': int(self.rng.expovariate(1 / 8)),
+                    'like_count': int(self.rng.expovariate(1 / 20)),
+                    'reply_count': 0,
+                    'quote_count': 0
+                }
+            ))
+        return _response(tweets, {'users': list(users.values())})
+
+    def get_home_timeline(self, max_results: int = 100, **kwargs):
+        self._call('get_home_timeline')
+        return self._synthetic_tweets(max_results, "Timeline")
+
+    def search_recent_tweets(self, query: str, max_results: int = 100, **kwargs):
+        self._call('search_recent_tweets')
+        return self._synthetic_tweets(max_results, query.split(' -is:')[0])
+
+
+# ---------------------------------------------------------------------------
+# Supabase
+# ---------------------------------------------------------------------------
+
+class FakeStorage:
+    """In-memory StorageManager with the same async interface"""
+
+    def __init__(self, clock: VirtualClock, metrics: Metrics,
+                 update_times: Optional[Dict[str, datetime]] = None,
+                 latency: float = 0.05):
+        self.clock = clock
+        self.metrics = metrics
+        self.latency = latency
+        self.supabase = None
+        self.interactions: List[Dict] = []
+        self.tweet_interactions: List[Dict] = []
+        self.research: Dict[str, Dict] = {}
+        self.article_queue: List[Dict] = []
+        self.update_times: Dict[str, datetime] = dict(update_times or {})
+
+    def _call(self, operation: str) -> None:
+        self.metrics.count('storage', operation)
+        self.clock.advance(self.latency)
+
+    async def store_interaction(self, data: Dict) -> None:
+        self._call('store_interaction')
+        self.interactions.append(dict(data))
+
+    async def flush_writes(self, table: str = None) -> None:
+        # Rows are stored as they are recorded, so there is never anything buffered
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    async def get_recent_interactions(self, interaction_type: str = None, limit: int = 100) -> List[Dict]:
+        self._call('get_recent_interactions')
+        rows = self.tweet_interactions
+        if isinstance(interaction_type, str):
+            rows = [r for r in rows if r['interaction_type'] == interaction_type]
+        return list(reversed(rows))[:limit]
+
+    async def get_recent_query_interactions(self, limit: int = 10) -> List[Dict]:
+        self._call('get_recent_query_interactions')
+        return list(reversed(self.interactions))[:limit]
+
+    async def store_research(self, topic: str, content: str, expires_at: str) -> None:
+        self._call('store_research')
+        self.research[topic] = {
+            'topic': topic,
+            'content': content,
+            'summary': content[:250] if content else None,
+            'expires_at': expires_at,
+            'created_at': self.clock.datetime().isoformat()
+        }
+
+    async def get_research(self, topic: str) -> Optional[Dict]:
+        self._call('get_research')
+        # Same expiry rule as StorageManager.get_research, on the virtual clock
+        from storage_manager import research_expired
+        data = self.research.get(topic)
+        if data and research_expired(data, now=self.clock.datetime()):
+            return None
+        return data
+
+    async def queue_article(self, title: str, url: str, tweet_content: str, source_feed: str, is_weekly: bool = False) -> bool:
+        self._call('queue_article')
+        # Same posted-URL dedupe as StorageManager.queue_article
+        from url_index import get_url_index
+        posted = get_url_index()
+        if url in posted:
+            return False
+        now = self.clock.datetime()
+        scheduled_for = now + timedelta(minutes=5)
+        queued = [a for a in self.article_queue if a['status'] == 'queued']
+        if queued:
+            scheduled_for = max(max(a['scheduled_for'] for a in queued) + timedelta(minutes=50), scheduled_for)
+        self.article_queue.append({
+            'id': len(self.article_queue) + 1,
+            'title': title,
+            'url': url,
+            'tweet_content': tweet_content,
+            'source_feed': source_feed,
+            'is_weekly': is_weekly,
+            'scheduled_for': scheduled_for,
+            'status': 'queued'
+        })
+        posted.add(url, posted_at=now.timestamp())
+        self.metrics.outputs['articles_queued'] += 1
+        return True
+
+    async def get_next_article(self) -> Optional[Dict]:
+        self._call('get_next_article')
+        now = self.clock.datetime()
+        ready = [a for a in self.article_queue if a['status'] == 'queued' and a['scheduled_for'] <= now]
+        return min(ready, key=lambda a: a['scheduled_for']) if ready else None
+
+    async def mark_article_posted(self, article_id: int) -> bool:
+        self._call('mark_article_posted')
+        self.article_queue[article_id - 1]['status'] = 'posted'
+        self.metrics.outputs['news_posts'] += 1
+        return True
+
+    async def mark_article_failed(self, article_id: int, error_message: str) -> bool:
+        self._call('mark_article_failed')
+        self.article_queue[article_id - 1]['status'] = 'failed'
+        return True
+
+    async def record_interaction(self, tweet_id: str, interaction_type: str, content: str = None) -> bool:
+        self._call('record_interaction')
+        self.tweet_interactions.append({
+            'tweet_id': str(tweet_id),
+            'interaction_type': interaction_type,
+            'content': content,
+            'success': True,
+            'created_at': self.clock.datetime().isoformat()
+        })
+        return True
+
+    async def record_failed_interaction(self, tweet_id: str, interaction_type: str, error_message: str) -> bool:
+        self._call('record_failed_interaction')
+        return True
+
+    async def store_update_time(self, update_type: str, timestamp: datetime) -> bool:
+        self._call('store_update_time')
+        self.update_times[update_type] = timestamp
+        return True
+
+    async def get_last_update_times(self) -> Dict[str, datetime]:
+        self._call('get_last_update_times')
+        return dict(self.update_times)
+
+
+# ---------------------------------------------------------------------------
+# News sources
+# ---------------------------------------------------------------------------
+
+ARTICLE_PARAGRAPH = (
+    "Researchers reported that an AI-assisted screening workflow reduced the time needed "
+    "to identify eligible participants for phase II oncology trials. The multi-site study "
+    "compared manual chart review with a model that ranks candidates using structured and "
+    "unstructured records. "
+)
+
+
+def article_html(url: str, paragraphs: int = 12) -> str:
+    """Synthetic article page with navigation chrome around the body"""
+    nav = "".join(f"<li><a href='/section/{i}'>Section {i}</a></li>" for i in range(40))
+    body = "".join(f"<p>{ARTICLE_PARAGRAPH}</p>" for _ in range(paragraphs))
+    return (
+        f"<html><head><title>{url}</title></head><body>"
+        f"<nav><ul>{nav}</ul></nav><article><h1>{url}</h1>{body}</article>"
+        f"<footer>Copyright</footer></body></html>"
+    )
+
+
+class FakeFeeds:
+    """RSS publishers releasing entries on a per-feed cadence"""
+
+    def __init__(self, clock: VirtualClock, rng: random.Random, page_size: int = 20):
+        self.clock = clock
+        self.rng = rng
+        self.page_size = page_size
+        self._cadence: Dict[str, tuple] = {}
+
+    def cadence(self, url: str) -> tuple:
+        """(publish interval seconds, phase offset) for a feed"""
+        if url not in self._cadence:
+            interval = self.rng.choice([2, 6, 12, 24, 72]) * 3600
+            self._cadence[url] = (interval, self.rng.uniform(0, interval))
+        return self._cadence[url]
+
+    def newest(self, url: str, now: float) -> int:
+        """Index of the most recently published entry"""
+        interval, offset = self.cadence(url)
+        return int((now - self.clock.start - offset) // interval)
+
+    def etag(self, url: str, now: float) -> str:
+        return f'"{zlib.crc32(url.encode("utf-8")):08x}-{self.newest(url, now)}"'
+
+    def entries(self, url: str, now: float) -> List[Dict[str, Any]]:
+        interval, offset = self.cadence(url)
+        newest = self.newest(url, now)
+        domain = urlparse(url).netloc
+        entries = []
+        for k in range(newest, newest - self.page_size, -1):
+            link = f"https://{domain}/articles/{k}"
+            entries.append({
+                'id': link,
+                'title': f"{domain} article {k}",
+                'summary': f"Summary of {domain} article {k}. " + ARTICLE_PARAGRAPH[:160],
+                'link': link,
+                'published': self.clock.start + offset + k * interval
+            })
+        return entries
+
+    def render(self, url: str) -> str:
+        """RSS 2.0 document for the feed as of the current virtual time"""
+        items = "".join(
+            f"<item><title>{escape(e['title'])}</title><link>{escape(e['link'])}</link>"
+            f"<guid>{escape(e['id'])}</guid><description>{escape(e['summary'])}</description>"
+            f"<pubDate>{format_datetime(datetime.fromtimestamp(e['published'], timezone.utc), usegmt=True)}</pubDate></item>"
+            for e in self.entries(url, self.clock.now)
+        )
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(url)}</title><link>{escape(url)}</link>{items}</channel></rss>"
+        )
+
+
+class FakeHTTP:
+    """Web stand-in behind an httpx MockTransport: feeds, articles and search"""
+
+    def __init__(self, clock: VirtualClock, metrics: Metrics, rng: random.Random, feeds: FakeFeeds,
+                 latency: tuple = (0.2, 1.5), feed_latency: tuple = (0.3, 2.0)):
+        self.clock = clock
+        self.metrics = metrics
+        self.rng = rng
+        self.feeds = feeds
+        self.latency = latency
+        self.feed_latency = feed_latency
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        path = request.url.path
+        if 'googleapis.com' in request.url.host:
+            self.clock.advance(self.rng.uniform(*self.latency))
+            self.metrics.count('http', 'search')
+            items = [
+                {'title': f"Search result {i}", 'link': f"https://techcrunch.com/ai-trials/{i}"}
+                for i in range(10)
+            ]
+            return httpx.Response(200, json={'items': items})
+        if '/articles/' not in path and '/ai-trials/' not in path:
+            self.clock.advance(self.rng.uniform(*self.feed_latency))
+            etag = self.feeds.etag(url, self.clock.now)
+            if request.headers.get('If-None-Match') == etag:
+                self.metrics.count('http', 'feed_not_modified')
+                return httpx.Response(304)
+            self.metrics.count('http', 'feed')
+            return httpx.Response(200, text=self.feeds.render(url), headers={
+                'Content-Type': 'application/rss+xml; charset=utf-8',
+                'ETag': etag
+            })
+        self.clock.advance(self.rng.uniform(*self.latency))
+        # Synthetic articles never change, so a matching validator is always a 304
+        etag = f'"{zlib.crc32(url.encode("utf-8")):08x}"'
+        if request.headers.get('If-None-Match') == etag:
+            self.metrics.count('http', 'article_not_modified')
+            return httpx.Response(304)
+        self.metrics.count('http', 'article')
+        return httpx.Response(200, text=article_html(url), headers={
+            'Content-Type': 'text/html; charset=utf-8',
+            'ETag': etag,
+            'Last-Modified': 'Mon, 20 Jan 2025 09:00:00 GMT'
+        })
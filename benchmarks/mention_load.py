@@ -0,0 +1,180 @@
+"""
+Synthetic mention load generator for the reply pipeline.
+
+Feeds thousands of synthetic mentions (mixed categories, PII cases and
+referenced tweets) into Twitter.make_reply_to_mention through the local
+stand-ins and measures sustained replies per hour, backlog growth and
+time-to-first-reply.
+
+Usage:
+    python -m benchmarks.mention_load --mentions 5000 --hours 24
+    python -m benchmarks.mention_load --mentions 500 --hours 24 --spike-at 2 --spike-hours 1 --spike-rate 600
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from benchmarks.agent_cycle import DEFAULT_START, _import_agent, build_environment, patched_agent, quiet
+from benchmarks.fakes import MentionStream, SimulationComplete
+from benchmarks.metrics import git_revision, summarize
+
+# Gap between mention checks in main(): 5 minute post-check sleep + 10 minute cycle sleep
+DEFAULT_CYCLE_GAP = 15 * 60
+
+
+def drive(env, client, cycle_gap: float, samples: List[Dict]) -> None:
+    """Call the reply pipeline once per simulated cycle until the horizon"""
+    client.collect_initial_mention()
+    # Mentions received before start-up are skipped by design, not backlog
+    pre_existing = sum(1 for m in env.mentions.mentions if m.arrived_at < env.clock.start)
+    while True:
+        started = env.clock.now
+        processed = client.make_reply_to_mention()
+        arrived = env.mentions.arrived(env.clock.now) - pre_existing
+        replied = len(env.mentions.replied_at)
+        samples.append({
+            'hour': round((env.clock.now - env.clock.start) / 3600, 3),
+            'arrived': arrived,
+            'replied': replied,
+            'backlog': arrived - replied,
+            'processed': processed,
+            'cycle_seconds': round(env.clock.now - started, 1)
+        })
+        env.clock.sleep(cycle_gap)
+
+
+def _backlog_series(samples: List[Dict]) -> List[Dict]:
+    """Last sample of every simulated hour"""
+    hourly = {}
+    for sample in samples:
+        hourly[int(sample['hour'])] = sample
+    return [
+        {'hour': hour, 'arrived': s['arrived'], 'replied': s['replied'], 'backlog': s['backlog']}
+        for hour, s in sorted(hourly.items())
+    ]
+
+
+def report(env, samples: List[Dict], wall_seconds: float, history: int) -> Dict:
+    mentions = env.mentions
+    hours = (env.clock.now - env.clock.start) / 3600
+    live = [m for m in mentions.mentions if m.arrived_at >= env.clock.start and m.arrived_at <= env.clock.now]
+    replied = [m for m in live if m.id in mentions.replied_at]
+    first_reply = [mentions.replied_at[m.id] - m.arrived_at for m in replied]
+
+    by_category = Counter(m.category for m in live)
+    replied_by_category = Counter(m.category for m in replied)
+    pii_replies = sum(1 for p in env.twitter_client.posts if p['kind'] == 'mentions_replied' and 'HIPAA' in (p['text'] or ''))
+
+    first_backlog = samples[0]['backlog'] if samples else 0
+    last_backlog = samples[-1]['backlog'] if samples else 0
+
+    def ratio(numerator, denominator):
+        return round(numerator / denominator, 3) if denominator else None
+
+    return {
+        'benchmark': 'mention_load',
+        'git_revision': git_revision(),
+        'simulated_hours': round(hours, 2),
+        'wall_seconds': round(wall_seconds, 3),
+        'load': {
+            'mentions_arrived': len(live),
+            'arrival_rate_per_hour': ratio(len(live), hours),
+            'pre_existing_mentions': history,
+            'pii_mentions': sum(1 for m in live if m.is_pii),
+            'with_referenced_tweet': sum(1 for m in live if m.referenced_tweets),
+            'by_category': dict(sorted(by_category.items()))
+        },
+        'replies': {
+            'total': len(replied),
+            'sustained_per_hour': ratio(len(replied), hours),
+            'pii_warnings': pii_replies,
+            'by_category': dict(sorted(replied_by_category.items())),
+            'never_replied': len(live) - len(replied)
+        },
+        'backlog': {
+            'start': first_backlog,
+            'end': last_backlog,
+            'growth_per_hour': ratio(last_backlog - first_backlog, hours),
+            'max': max((s['backlog'] for s in samples), default=0),
+            'hourly': _backlog_series(samples)
+        },
+        'time_to_first_reply_seconds': summarize(first_reply),
+        'mention_check_cycle_seconds': summarize([s['cycle_seconds'] for s in samples]),
+        'calls': env.metrics.calls_report(),
+        'efficiency': {
+            'llm_calls_per_reply': ratio(env.metrics.total_calls('llm'), len(replied)),
+            'twitter_calls_per_reply': ratio(env.metrics.total_calls('twitter'), len(replied))
+        }
+    }
+
+
+def run(mentions: int = 5000, hours: float = 24, seed: int = 7, cycle_gap: float = DEFAULT_CYCLE_GAP,
+        pii_rate: float = 0.1, reference_rate: float = 0.3, history: int = 10,
+        spike: Optional[tuple] = None, verbose: bool = False) -> Dict:
+    """Run the load test; ``spike`` is (start hour, duration hours, mentions per hour)"""
+    start = DEFAULT_START
+    end = start + hours * 3600
+    bursts = []
+    if spike:
+        spike_at, spike_hours, spike_rate = spike
+        bursts.append((start + spike_at * 3600, start + (spike_at + spike_hours) * 3600, spike_rate))
+    stream = MentionStream(
+        random.Random(seed), start, end,
+        per_hour=mentions / hours if hours else 0,
+        history=history,
+        pii_rate=pii_rate,
+        reference_rate=reference_rate,
+        bursts=bursts
+    )
+
+    samples: List[Dict] = []
+    with quiet(verbose):
+        modules = _import_agent()
+        env = build_environment(days=hours / 24, seed=seed, start=start, mention_stream=stream)
+        started = time.perf_counter()
+        with patched_agent(env, modules):
+            try:
+                client = modules.twitter.Twitter()
+                drive(env, client, cycle_gap, samples)
+            except SimulationComplete:
+                pass
+        wall_seconds = time.perf_counter() - started
+    return report(env, samples, wall_seconds, history)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the mention reply pipeline on a virtual clock")
+    parser.add_argument('--mentions', type=int, default=5000, help="steady-state mentions over the run")
+    parser.add_argument('--hours', type=float, default=24, help="simulated hours (default: 24)")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--cycle-gap', type=float, default=DEFAULT_CYCLE_GAP,
+                        help="simulated seconds between mention checks")
+    parser.add_argument('--pii-rate', type=float, default=0.1)
+    parser.add_argument('--reference-rate', type=float, default=0.3)
+    parser.add_argument('--spike-at', type=float, help="hour at which an announcement spike starts")
+    parser.add_argument('--spike-hours', type=float, default=1.0)
+    parser.add_argument('--spike-rate', type=float, default=500.0, help="extra mentions per hour during the spike")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    parser.add_argument('--verbose', action='store_true', help="show agent logs")
+    args = parser.parse_args(argv)
+
+    spike = (args.spike_at, args.spike_hours, args.spike_rate) if args.spike_at is not None else None
+    result = run(
+        mentions=args.mentions, hours=args.hours, seed=args.seed, cycle_gap=args.cycle_gap,
+        pii_rate=args.pii_rate, reference_rate=args.reference_rate, spike=spike, verbose=args.verbose
+    )
+    document = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
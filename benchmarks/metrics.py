@@ -0,0 +1,77 @@
+import math
+import subprocess
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None for an empty sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict:
+    """Summarize a latency sample in seconds"""
+    if not values:
+        return {'count': 0, 'p50': None, 'p95': None, 'max': None, 'total': 0.0}
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'max': round(max(values), 3),
+        'total': round(sum(values), 3)
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Current commit hash so results can be compared between commits"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Metrics:
+    def __init__(self):
+        # category ("llm", "twitter", "http", "storage") -> operation -> count
+        self.calls: Dict[str, Counter] = defaultdict(Counter)
+        # stage -> list of simulated seconds
+        self.stage_latency: Dict[str, List[float]] = defaultdict(list)
+        # stage -> list of real CPU seconds spent in agent code
+        self.stage_cpu: Dict[str, List[float]] = defaultdict(list)
+        self.outputs: Counter = Counter()
+
+    def count(self, category: str, operation: str, amount: int = 1) -> None:
+        """Count a call made to one of the simulated services"""
+        self.calls[category][operation] += amount
+
+    def record_stage(self, stage: str, simulated: float, cpu: float) -> None:
+        """Record one execution of an agent stage"""
+        self.stage_latency[stage].append(simulated)
+        self.stage_cpu[stage].append(cpu)
+
+    def total_calls(self, category: str) -> int:
+        return sum(self.calls[category].values())
+
+    def stage_report(self) -> Dict[str, Dict]:
+        """Per-stage latency summary (simulated and CPU seconds)"""
+        return {
+            stage: {
+                'simulated_seconds': summarize(samples),
+                'cpu_seconds': summarize(self.stage_cpu[stage])
+            }
+            for stage, samples in sorted(self.stage_latency.items())
+        }
+
+    def calls_report(self) -> Dict[str, Dict]:
+        return {
+            category: {'total': sum(ops.values()), **dict(sorted(ops.items()))}
+            for category, ops in sorted(self.calls.items())
+        }
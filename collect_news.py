@@ -1,5 +1,8 @@
-import feedparser
+import time
 import logging
+from feed_service import get_feed_service
+from feed_state import get_feed_state, entry_key
+from feed_scheduler import publish_times
 
 # Configure logging
 logging.basicConfig(
@@ -8,13 +11,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _published_at(entry):
+    """Publish timestamp of an entry; undated entries count as current"""
+    times = publish_times([entry])
+    return times[0] if times else time.time()
+
 def collect_initial_news(links):
-    """Collect the latest entries from each feed"""
+    """Collect the latest entries from each feed, baselining feeds never seen before"""
     latest_feeds = {}
+    state = get_feed_state()
+    snapshot = get_feed_service().snapshot_sync(links)
     for link in links:
         try:
-            feed = feedparser.parse(link)
-            if feed.entries:
+            feed = snapshot.feed(link)
+            if feed and feed.entries:
+                if not state.has_seen_state(link):
+                    # First run: only entries published from now on count as new
+                    state.mark_seen(link, [entry_key(entry) for entry in reversed(feed.entries)])
                 # Store only the latest entry for each feed
                 latest_entry = feed.entries[0]
                 entry_data = {
@@ -31,37 +44,50 @@ def collect_initial_news(links):
     
     return latest_feeds
 
-def check_latest_feed(url, previous_entries):
-    """Check for new entries in a feed and return all new articles"""
+async def check_latest_feed(url, snapshot=None, scope=None, max_age_hours=None, limit=None):
+    """Return entries published since the last poll.
+
+    Feeds are newest-first, so scanning stops at the first entry already
+    in the feed's seen-set. A feed without a seen-set is baselined instead,
+    unless ``max_age_hours`` is given, in which case entries younger than
+    that count as new. ``scope`` keeps a separate seen-set per consumer.
+    """
     try:
-        feed = feedparser.parse(url)
-        if not feed.entries:
+        if snapshot is None:
+            snapshot = await get_feed_service().snapshot([url])
+        feed = snapshot.feed(url)
+        if not feed or not feed.entries:
             logger.warning(f"No entries found in feed: {url}")
             return None
 
-        # Check all entries for new content
+        state = get_feed_state()
+        if max_age_hours is None and not state.has_seen_state(url, scope):
+            state.mark_seen(url, [entry_key(entry) for entry in reversed(feed.entries)], scope)
+            logger.info(f"Baselined {len(feed.entries)} entries for {url}")
+            return None
+        cutoff = time.time() - max_age_hours * 3600 if max_age_hours is not None else None
+
         new_entries = []
-        for entry in feed.entries:  # Check all entries
+        new_keys = []
+        for entry in feed.entries:
+            key = entry_key(entry)
+            if state.is_seen(url, key, scope):
+                break
+            if cutoff is not None and _published_at(entry) < cutoff:
+                break
             entry_data = {
                 'title': entry.title,
                 'summary': entry.summary,
                 'url': entry.link
             }
-            
-            # Check if this entry is new
-            is_new = True
-            if previous_entries:  # Only check if we have previous entries
-                for prev_entry in previous_entries:
-                    if (prev_entry['title'] == entry_data['title'] and
-                        prev_entry['url'] == entry_data['url']):
-                        is_new = False
-                        break
-            
-            if is_new:
-                logger.info(f"Found new article: {entry_data['title']}")
-                new_entries.append(entry_data)
+            logger.info(f"Found new article: {entry_data['title']}")
+            new_entries.append(entry_data)
+            new_keys.append(key)
+            if limit and len(new_entries) >= limit:
+                break
 
         if new_entries:
+            state.mark_seen(url, list(reversed(new_keys)), scope)
             logger.info(f"Found {len(new_entries)} new articles in {url}")
             return new_entries
         else:
@@ -70,4 +96,4 @@ def check_latest_feed(url, previous_entries):
 
     except Exception as e:
         logger.error(f"Error checking feed {url}: {str(e)}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,86 @@
+import os
+import logging
+from typing import Optional
+from dotenv import load_dotenv
+from openai import OpenAI
+from storage_manager import StorageManager
+from rate_limit_manager import RateLimitManager
+from research_manager import ResearchManager
+from http_client import get_http_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class Components:
+    """The agent's heavy dependencies, each built on first use and then shared.
+
+    Twitter, Data_generation, ResearchManager and find_enquiry all take their
+    storage, OpenAI client and rate limiter from here, so a mention reuses the
+    warm MemoryCache and open connections instead of building its own.
+    """
+
+    def __init__(self):
+        self._openai: Optional[OpenAI] = None
+        self._storage: Optional[StorageManager] = None
+        self._rate_limiter: Optional[RateLimitManager] = None
+        self._research_manager: Optional[ResearchManager] = None
+        self._data_generation = None
+
+    @property
+    def openai(self) -> OpenAI:
+        if self._openai is None:
+            self._openai = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        return self._openai
+
+    @property
+    def storage(self) -> StorageManager:
+        if self._storage is None:
+            self._storage = StorageManager()
+        return self._storage
+
+    @property
+    def rate_limiter(self) -> RateLimitManager:
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimitManager(self.storage)
+        return self._rate_limiter
+
+    @property
+    def research_manager(self) -> ResearchManager:
+        if self._research_manager is None:
+            self._research_manager = ResearchManager(
+                self.storage, gen_ai=self.openai, rate_limiter=self.rate_limiter
+            )
+        return self._research_manager
+
+    @property
+    def data_generation(self):
+        if self._data_generation is None:
+            # Import here to avoid circular import
+            from ai_data import Data_generation
+            self._data_generation = Data_generation(
+                storage=self.storage, gen_ai=self.openai, research_mgr=self.research_manager
+            )
+        return self._data_generation
+
+    async def aclose(self) -> None:
+        """Write out buffered state and close network clients at shutdown"""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.aflush()
+        if self._storage is not None:
+            try:
+                await self._storage.aclose()
+            except Exception as e:
+                logger.error(f"Error closing storage: {e}")
+        await get_http_client().aclose()
+
+
+_components: Optional[Components] = None
+
+def get_components() -> Components:
+    """Process-wide component registry"""
+    global _components
+    if _components is None:
+        _components = Components()
+    return _components
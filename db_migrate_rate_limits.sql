@@ -0,0 +1,9 @@
+-- Adds the circuit breaker columns to a rate_limits table created before
+-- they existed. db_setup.sql drops and recreates every table; run this
+-- instead on a live database to keep its data. Safe to run more than once.
+ALTER TABLE rate_limits ADD COLUMN IF NOT EXISTS circuit_state VARCHAR DEFAULT 'closed';
+ALTER TABLE rate_limits ADD COLUMN IF NOT EXISTS open_count INTEGER DEFAULT 0;
+
+ALTER TABLE rate_limits DROP CONSTRAINT IF EXISTS rate_limits_circuit_state_check;
+ALTER TABLE rate_limits ADD CONSTRAINT rate_limits_circuit_state_check
+    CHECK (circuit_state IN ('closed', 'open', 'half_open'));
@@ -105,7 +105,12 @@ CREATE TABLE IF NOT EXISTS rate_limits (
     consecutive_failures INTEGER DEFAULT 0,
     backoff_period INTEGER DEFAULT 0,
     
+    -- Circuit Breaker
+    circuit_state VARCHAR DEFAULT 'closed',
+    open_count INTEGER DEFAULT 0,
+    
     -- Constraints
+    CONSTRAINT rate_limits_circuit_state_check CHECK (circuit_state IN ('closed', 'open', 'half_open')),
     CONSTRAINT rate_limits_request_count_check CHECK (request_count >= 0),
     CONSTRAINT rate_limits_consecutive_failures_check CHECK (consecutive_failures >= 0),
     CONSTRAINT rate_limits_backoff_period_check CHECK (backoff_period >= 0)
@@ -0,0 +1,141 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from news_config import DOMAIN_LIMITS
+
+logger = logging.getLogger(__name__)
+
+
+def url_domain(url: str) -> str:
+    """Host of a URL, lowercased"""
+    parsed = urlparse(url)
+    return (parsed.netloc or parsed.path).lower()
+
+
+class TokenBucket:
+    """Request pacing for one domain: rate tokens per second, up to capacity banked"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait until it is actually available.
+
+        The balance may go negative, so callers queue up behind each other
+        without polling.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class DomainLimiter:
+    """Per-domain token buckets plus a cap on concurrent requests.
+
+    Every outgoing request waits for a slot (at most max_in_flight per
+    domain) and a token from the domain's bucket. Limits come from
+    DOMAIN_LIMITS, with the "default" entry applying to unlisted domains.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None):
+        self.limits = limits or DOMAIN_LIMITS
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._sync_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._loop = None
+        self._lock = threading.Lock()
+        self.domain_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            'requests': 0, 'delayed': 0, 'wait_total': 0.0, 'wait_max': 0.0
+        })
+
+    def _limits(self, domain: str) -> Dict:
+        return {**self.limits["default"], **self.limits.get(domain, {})}
+
+    def _bucket(self, domain: str) -> TokenBucket:
+        with self._lock:
+            if domain not in self._buckets:
+                limits = self._limits(domain)
+                self._buckets[domain] = TokenBucket(limits["requests_per_minute"] / 60, limits["burst"])
+            return self._buckets[domain]
+
+    def _slot(self, domain: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores cannot cross event loops
+            self._slots = {}
+            self._loop = loop
+        if domain not in self._slots:
+            self._slots[domain] = asyncio.Semaphore(self._limits(domain)["max_in_flight"])
+        return self._slots[domain]
+
+    def _sync_slot(self, domain: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if domain not in self._sync_slots:
+                self._sync_slots[domain] = threading.BoundedSemaphore(self._limits(domain)["max_in_flight"])
+            return self._sync_slots[domain]
+
+    def _record(self, domain: str, wait: float) -> None:
+        stats = self.domain_stats[domain]
+        stats['requests'] += 1
+        if wait > 0:
+            stats['delayed'] += 1
+            stats['wait_total'] += wait
+            stats['wait_max'] = max(stats['wait_max'], wait)
+
+    @asynccontextmanager
+    async def acquire(self, url: str):
+        """Hold one of the domain's request slots, paced by its token bucket"""
+        domain = url_domain(url)
+        async with self._slot(domain):
+            wait = self._bucket(domain).reserve()
+            self._record(domain, wait)
+            if wait > 0:
+                logger.debug(f"Pacing {domain}: waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+            yield
+
+    @contextmanager
+    def acquire_sync(self, url: str):
+        """Blocking variant of acquire for requests made from worker threads"""
+        domain = url_domain(url)
+        with self._sync_slot(domain):
+            wait = self._bucket(domain).reserve()
+            self._record(domain, wait)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-domain request count and time spent waiting for a token"""
+        return {
+            domain: {
+                'requests': stats['requests'],
+                'delayed': stats['delayed'],
+                'wait_total': round(stats['wait_total'], 3),
+                'wait_max': round(stats['wait_max'], 3)
+            }
+            for domain, stats in self.domain_stats.items()
+        }
+
+
+_limiter: Optional[DomainLimiter] = None
+
+def get_domain_limiter() -> DomainLimiter:
+    """Process-wide domain limiter"""
+    global _limiter
+    if _limiter is None:
+        _limiter = DomainLimiter()
+    return _limiter
@@ -1,13 +1,12 @@
 from http.client import HTTPException
-import os
 import logging
 import re
 import random
 import urllib.parse
 from pydantic import BaseModel
 import openai
-from openai import OpenAI
 from dotenv import load_dotenv
+from components import get_components
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -16,10 +15,8 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Load OpenAI API key from environment
-gen_ai = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+# OpenAI client shared with the rest of the agent
+gen_ai = get_components().openai
 
 # Define Models
 class TweetRequest(BaseModel):
@@ -213,12 +210,10 @@ def generate_exmplr_link(api_payload: dict) -> str:
     query_string = "&".join(param_parts)
     return f"{base_url}?{query_string}"
 
-def find_enquiry(query):
+def find_enquiry(query, genai=None):
     """Process a tweet request and route it to the appropriate handler."""
     try:
-        # Import here to avoid circular import
-        from ai_data import Data_generation
-        genai = Data_generation()
+        genai = genai or get_components().data_generation
         category = classify_query(query)
 
         # Check for PII/PHI
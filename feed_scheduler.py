@@ -0,0 +1,108 @@
+import time
+import logging
+from statistics import median
+from typing import Dict, List, Optional
+
+from dateutil import parser as date_parser
+
+from feed_state import FeedStateStore, entry_key, get_feed_state
+from news_config import FEED_POLLING
+
+logger = logging.getLogger(__name__)
+
+
+def publish_times(entries: List[Dict]) -> List[float]:
+    """Publish timestamps of feed entries, newest first, skipping unparseable dates"""
+    times = []
+    for entry in entries:
+        published = entry.get('published')
+        if not published:
+            continue
+        try:
+            times.append(date_parser.parse(published).timestamp())
+        except (ValueError, OverflowError, TypeError):
+            continue
+    return sorted(times, reverse=True)
+
+
+class FeedScheduler:
+    """Per-feed poll times learned from each feed's publish history.
+
+    A feed is polled about twice per typical interval between its entries,
+    bounded by the configured floor and ceiling. A feed that has gone quiet
+    for longer than usual backs off towards the ceiling, and the interval
+    tightens again as soon as new entries appear.
+    """
+
+    def __init__(self, state: Optional[FeedStateStore] = None, floor: float = FEED_POLLING["floor"],
+                 ceiling: float = FEED_POLLING["ceiling"],
+                 default_interval: float = FEED_POLLING["default_interval"],
+                 history: int = FEED_POLLING["history"]):
+        self.state = state
+        self.floor = floor
+        self.ceiling = ceiling
+        self.default_interval = default_interval
+        self.history = history
+
+    def _state(self) -> FeedStateStore:
+        return self.state or get_feed_state()
+
+    def is_due(self, url: str) -> bool:
+        """True when the feed has never been polled or its next poll time has passed"""
+        return time.time() >= self._state().get_schedule(url).get('next_poll_at', 0)
+
+    def delay(self, typical: Optional[float], quiet_for: Optional[float]) -> float:
+        """Seconds until the next poll"""
+        if typical is None:
+            wait = self.default_interval
+        else:
+            wait = typical / 2
+            # Quiet for longer than usual: back off rather than keep polling a dormant feed
+            if quiet_for is not None and quiet_for > typical:
+                wait = max(wait, quiet_for / 2)
+        return min(max(wait, self.floor), self.ceiling)
+
+    def observe(self, url: str, entries: Optional[List[Dict]]) -> float:
+        """Update a feed's schedule after a poll; ``entries`` is None for a 304.
+
+        Returns the next poll time.
+        """
+        now = time.time()
+        schedule = self._state().get_schedule(url)
+        newest_key = entry_key(entries[0]) if entries else None
+        if newest_key and newest_key != schedule.get('newest_key'):
+            schedule['newest_key'] = newest_key
+            times = publish_times(entries)[:self.history + 1]
+            intervals = [newer - older for newer, older in zip(times, times[1:]) if newer > older]
+            if not intervals and schedule.get('last_change'):
+                # No usable dates: fall back to the gap between observed changes
+                intervals = [now - schedule['last_change']]
+            if intervals:
+                schedule['typical_interval'] = median(intervals)
+            schedule['last_change'] = now
+            schedule['last_published'] = times[0] if times else now
+            schedule['unchanged_polls'] = 0
+        else:
+            schedule['unchanged_polls'] = schedule.get('unchanged_polls', 0) + 1
+
+        last_published = schedule.get('last_published')
+        quiet_for = now - last_published if last_published else None
+        wait = self.delay(schedule.get('typical_interval'), quiet_for)
+        schedule['next_poll_at'] = now + wait
+        self._state().set_schedule(url, schedule)
+        logger.info(f"Next poll of {url} in {wait / 60:.0f} minutes")
+        return schedule['next_poll_at']
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Learned interval and next poll time per feed"""
+        now = time.time()
+        report = {}
+        for url, state in self._state().feeds.items():
+            schedule = state.get('schedule')
+            if schedule:
+                report[url] = {
+                    'typical_interval_hours': round(schedule.get('typical_interval', 0) / 3600, 2),
+                    'next_poll_in_minutes': round((schedule.get('next_poll_at', now) - now) / 60, 1),
+                    'unchanged_polls': schedule.get('unchanged_polls', 0)
+                }
+        return report
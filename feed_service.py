@@ -0,0 +1,227 @@
+import time
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import feedparser
+
+from http_client import get_http_client
+from feed_state import ENTRY_FIELDS, get_feed_state
+from feed_scheduler import FeedScheduler
+from parse_pool import get_parse_pool
+from news_config import FEED_CATEGORIES, RATE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Threads used to fetch feeds from synchronous callers
+SYNC_FETCH_WORKERS = 8
+
+
+def parse_feed_records(url: str, content: bytes) -> Tuple[List[Dict], float]:
+    """Parse a feed body into compact entry records; returns (records, parse seconds).
+
+    Runs in a worker process, so only the raw bytes and the small records
+    cross the process boundary.
+    """
+    started = perf_counter()
+    parsed = feedparser.parse(content, response_headers={'content-location': url})
+    records = [
+        {field: entry.get(field) for field in ENTRY_FIELDS if entry.get(field) is not None}
+        for entry in parsed.entries
+    ]
+    return records, perf_counter() - started
+
+def _feed(entries, status, not_modified=False, **extra):
+    return feedparser.FeedParserDict(
+        entries=[feedparser.FeedParserDict(entry) for entry in entries],
+        status=status,
+        not_modified=not_modified,
+        **extra
+    )
+
+def _failed_feed(url, error):
+    logger.error(f"Error fetching feed {url}: {error}")
+    return _feed([], None, error=str(error))
+
+
+class FeedSnapshot:
+    """Immutable view of the feeds fetched during one polling window"""
+
+    def __init__(self, window: int, feeds: Optional[Dict[str, feedparser.FeedParserDict]] = None):
+        self.window = window
+        self.feeds = MappingProxyType(dict(feeds or {}))
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.feeds
+
+    def feed(self, url: str) -> Optional[feedparser.FeedParserDict]:
+        return self.feeds.get(url)
+
+    def entries(self, url: str) -> List[feedparser.FeedParserDict]:
+        feed = self.feeds.get(url)
+        return list(feed.entries) if feed else []
+
+    def with_feeds(self, feeds: Dict[str, feedparser.FeedParserDict]) -> "FeedSnapshot":
+        """New snapshot of the same window with more feeds added"""
+        return FeedSnapshot(self.window, {**self.feeds, **feeds})
+
+
+class FeedService:
+    """Fetches the configured feeds concurrently, at most once per polling window.
+
+    Every consumer asking for a feed within the same window gets the same
+    parsed entries; concurrent requests for a feed share one fetch. Feeds
+    the scheduler does not consider due are served from their stored
+    entries without a request.
+    """
+
+    def __init__(self, feed_urls: Optional[List[str]] = None,
+                 window: int = RATE_LIMITS["rss_feeds"]["minimum_interval"],
+                 scheduler: Optional[FeedScheduler] = None):
+        self.feed_urls = list(feed_urls or FEED_CATEGORIES["all_feeds"])
+        self.window = window
+        self.scheduler = scheduler or FeedScheduler()
+        self.skipped: Counter = Counter()
+        self.fetch_counts: Counter = Counter()
+        self.parse_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            'parses': 0, 'seconds_total': 0.0, 'seconds_max': 0.0, 'bytes': 0, 'entries': 0
+        })
+        self._snapshot = FeedSnapshot(-1)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop = None
+
+    def _current(self) -> FeedSnapshot:
+        """Snapshot of the current window, starting a new one when the window rolls over"""
+        window = int(time.time() // self.window)
+        if self._snapshot.window != window:
+            self._snapshot = FeedSnapshot(window)
+        return self._snapshot
+
+    def _store(self, url: str, feed: feedparser.FeedParserDict) -> None:
+        self.fetch_counts[url] += 1
+        self._snapshot = self._current().with_feeds({url: feed})
+
+    def _not_parsed(self, url: str, response) -> Optional[feedparser.FeedParserDict]:
+        """Result for responses that need no parsing; a 304 is answered from the stored entries"""
+        if response.status_code == 304:
+            self.scheduler.observe(url, None)
+            return _feed(get_feed_state().entries(url), 304, not_modified=True)
+        if response.status_code != 200:
+            logger.warning(f"Feed {url} returned HTTP {response.status_code}")
+            return _feed([], response.status_code)
+        return None
+
+    def _parsed(self, url: str, response, records: List[Dict], seconds: float) -> feedparser.FeedParserDict:
+        """Record parse time and validators for a freshly parsed feed"""
+        stats = self.parse_stats[url]
+        stats['parses'] += 1
+        stats['seconds_total'] += seconds
+        stats['seconds_max'] = max(stats['seconds_max'], seconds)
+        stats['bytes'] += len(response.content)
+        stats['entries'] += len(records)
+        logger.info(f"Parsed {len(records)} entries from {url} in {seconds * 1000:.0f} ms")
+        get_feed_state().update(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), records)
+        self.scheduler.observe(url, records)
+        return _feed(records, 200)
+
+    def _not_due(self, url: str) -> feedparser.FeedParserDict:
+        """Stored entries for a feed whose next scheduled poll has not come yet"""
+        self.skipped[url] += 1
+        return _feed(get_feed_state().entries(url), None, not_modified=True)
+
+    def _pending(self, urls: List[str]) -> List[str]:
+        """Feeds missing from this window that are due a poll; the rest are filled from stored entries"""
+        current = self._current()
+        pending = []
+        not_due = {}
+        for url in urls:
+            if url in current or url in self._inflight:
+                continue
+            if self.scheduler.is_due(url) or not get_feed_state().entries(url):
+                pending.append(url)
+            else:
+                not_due[url] = self._not_due(url)
+        if not_due:
+            self._snapshot = current.with_feeds(not_due)
+        return pending
+
+    async def _fetch(self, url: str) -> None:
+        try:
+            response = await get_http_client().get(url, headers=get_feed_state().validators(url))
+            feed = self._not_parsed(url, response)
+            if feed is None:
+                loop = asyncio.get_running_loop()
+                records, seconds = await loop.run_in_executor(
+                    get_parse_pool(), parse_feed_records, url, response.content
+                )
+                feed = self._parsed(url, response, records, seconds)
+        except Exception as e:
+            feed = _failed_feed(url, e)
+        finally:
+            self._inflight.pop(url, None)
+        self._store(url, feed)
+
+    def _fetch_sync(self, url: str) -> feedparser.FeedParserDict:
+        try:
+            response = get_http_client().get_sync(url, headers=get_feed_state().validators(url))
+            feed = self._not_parsed(url, response)
+            if feed is None:
+                records, seconds = get_parse_pool().submit(parse_feed_records, url, response.content).result()
+                feed = self._parsed(url, response, records, seconds)
+            return feed
+        except Exception as e:
+            return _failed_feed(url, e)
+
+    async def snapshot(self, urls: Optional[Iterable[str]] = None) -> FeedSnapshot:
+        """Snapshot holding ``urls`` (default: every configured feed), fetching what the window lacks"""
+        urls = list(urls or self.feed_urls)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Fetches started on another event loop can never complete here
+            self._inflight = {}
+            self._loop = loop
+        for url in self._pending(urls):
+            self._inflight[url] = asyncio.ensure_future(self._fetch(url))
+        waiting = [self._inflight[url] for url in urls if url in self._inflight]
+        if waiting:
+            await asyncio.gather(*waiting)
+        return self._snapshot
+
+    def snapshot_sync(self, urls: Optional[Iterable[str]] = None) -> FeedSnapshot:
+        """Blocking variant of snapshot, fetching missing feeds on a thread pool"""
+        urls = list(urls or self.feed_urls)
+        missing = self._pending(urls)
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(SYNC_FETCH_WORKERS, len(missing))) as pool:
+                feeds = list(pool.map(self._fetch_sync, missing))
+            for url, feed in zip(missing, feeds):
+                self._store(url, feed)
+        return self._snapshot
+
+    def parse_report(self) -> Dict[str, Dict[str, float]]:
+        """Per-feed parse cost, most expensive feed first"""
+        report = {}
+        for url, stats in sorted(self.parse_stats.items(), key=lambda item: -item[1]['seconds_total']):
+            report[url] = {
+                'parses': stats['parses'],
+                'seconds_total': round(stats['seconds_total'], 4),
+                'seconds_avg': round(stats['seconds_total'] / stats['parses'], 4) if stats['parses'] else 0.0,
+                'seconds_max': round(stats['seconds_max'], 4),
+                'bytes': stats['bytes'],
+                'entries': stats['entries']
+            }
+        return report
+
+
+_service: Optional[FeedService] = None
+
+def get_feed_service() -> FeedService:
+    """Process-wide feed service"""
+    global _service
+    if _service is None:
+        _service = FeedService()
+    return _service
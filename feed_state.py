@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+# Entry fields kept so a 304 can be answered without the feed body
+ENTRY_FIELDS = ('id', 'title', 'summary', 'link', 'published')
+
+# Entry keys remembered per feed for diffing
+SEEN_LIMIT = 500
+
+def entry_key(entry) -> str:
+    """Stable short hash identifying a feed entry by GUID, falling back to its link"""
+    identity = entry.get('id') or entry.get('link') or entry.get('title') or ''
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+
+class FeedStateStore:
+    """Per-feed polling state persisted to a local JSON file.
+
+    Holds each feed's ETag and Last-Modified validators together with a
+    compact copy of the entries they describe, so a 304 Not Modified can
+    be served from here without downloading or parsing the feed. Also
+    keeps a bounded set of entry keys already seen per feed. Safe to use
+    from the feed service's fetch threads.
+    """
+
+    def __init__(self, state_file: str = "feed_state.json"):
+        self.state_file = state_file
+        # Reentrant: mutators hold it across their own save()
+        self._lock = threading.RLock()
+        self.feeds: Dict[str, Dict[str, Any]] = self._load()
+        self._seen: Dict[tuple, set] = {
+            (url, field): set(keys)
+            for url, state in self.feeds.items()
+            for field, keys in state.items() if field.startswith('seen')
+        }
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading feed state: {e}")
+        return {}
+
+    def save(self) -> None:
+        try:
+            tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+            with self._lock:
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.feeds, f)
+                os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.error(f"Error saving feed state: {e}")
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional GET headers for a feed we already hold entries for"""
+        with self._lock:
+            state = self.feeds.get(url)
+            headers = {}
+            if state and state.get('entries'):
+                if state.get('etag'):
+                    headers['If-None-Match'] = state['etag']
+                if state.get('last_modified'):
+                    headers['If-Modified-Since'] = state['last_modified']
+            return headers
+
+    def entries(self, url: str) -> List[feedparser.FeedParserDict]:
+        """Entries stored with the current validators"""
+        with self._lock:
+            state = self.feeds.get(url) or {}
+            return [feedparser.FeedParserDict(entry) for entry in state.get('entries', [])]
+
+    def update(self, url: str, etag: Optional[str], last_modified: Optional[str], entries: List) -> None:
+        """Record the validators and entries of a full 200 response"""
+        stored = [
+            {field: entry.get(field) for field in ENTRY_FIELDS if entry.get(field) is not None}
+            for entry in entries
+        ]
+        with self._lock:
+            self.feeds[url] = {
+                **self.feeds.get(url, {}),
+                'etag': etag,
+                'last_modified': last_modified,
+                'entries': stored
+            }
+            self.save()
+
+    def get_schedule(self, url: str) -> Dict[str, Any]:
+        """Polling schedule learned for a feed"""
+        with self._lock:
+            return dict(self.feeds.get(url, {}).get('schedule', {}))
+
+    def set_schedule(self, url: str, schedule: Dict[str, Any]) -> None:
+        with self._lock:
+            self.feeds.setdefault(url, {})['schedule'] = schedule
+            self.save()
+
+    def _seen_field(self, scope: Optional[str]) -> str:
+        """State field of a seen-set; consumers with their own notion of "new" pass a scope"""
+        return 'seen' if scope is None else f'seen_{scope}'
+
+    def has_seen_state(self, url: str, scope: Optional[str] = None) -> bool:
+        """False until the feed has been baselined"""
+        with self._lock:
+            return self._seen_field(scope) in self.feeds.get(url, {})
+
+    def is_seen(self, url: str, key: str, scope: Optional[str] = None) -> bool:
+        with self._lock:
+            return key in self._seen.get((url, self._seen_field(scope)), ())
+
+    def mark_seen(self, url: str, keys: List[str], scope: Optional[str] = None) -> None:
+        """Remember entry keys (oldest first), keeping the newest SEEN_LIMIT per feed"""
+        field = self._seen_field(scope)
+        with self._lock:
+            state = self.feeds.setdefault(url, {})
+            seen = self._seen.setdefault((url, field), set())
+            ordered = state.get(field, [])
+            new_keys = [key for key in keys if key not in seen]
+            if not new_keys and field in state:
+                return
+            ordered = (ordered + new_keys)[-SEEN_LIMIT:]
+            state[field] = ordered
+            self._seen[(url, field)] = set(ordered)
+            self.save()
+
+_store: Optional[FeedStateStore] = None
+_store_lock = threading.Lock()
+
+def get_feed_state() -> FeedStateStore:
+    """Process-wide feed state store"""
+    global _store
+    if _store is None:
+        # Fetch threads may be the first callers
+        with _store_lock:
+            if _store is None:
+                _store = FeedStateStore()
+    return _store
@@ -0,0 +1,282 @@
+import time
+import random
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from domain_limiter import DomainLimiter, get_domain_limiter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool limits; per-host concurrency and pacing come from the domain limiter
+MAX_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60  # seconds an idle connection stays warm
+
+DEFAULT_TIMEOUT = 10.0
+
+# Largest body get_capped reads before cutting the download off
+MAX_STREAM_BYTES = 2 * 1024 * 1024
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class RetryPolicy:
+    """Retry transient failures with exponential backoff and jitter"""
+
+    def __init__(self, attempts: int = 3, backoff: float = 0.5, max_backoff: float = 8.0,
+                 retry_statuses=(429, 500, 502, 503, 504)):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(retry_statuses)
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        if attempt + 1 >= self.attempts:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait before the next attempt, honouring Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        return min(self.backoff * (2 ** attempt), self.max_backoff) * random.uniform(0.5, 1.0)
+
+
+def content_type_allowed(response: httpx.Response, content_types: Optional[Tuple[str, ...]]) -> bool:
+    """True when the response's media type is one of content_types; a missing header is allowed"""
+    if not content_types:
+        return True
+    media_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    return not media_type or media_type in content_types
+
+
+class HTTPClient:
+    """Shared pooled HTTP transport for feeds, articles and search.
+
+    One httpx client keeps connections (and TLS sessions) warm across
+    requests, using HTTP/2 when the h2 package is installed. Every request
+    is paced and capped per domain by the domain limiter, transient
+    failures are retried with a shared policy, and bytes and latency are
+    counted per host.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT,
+                 retry: Optional[RetryPolicy] = None, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 limiter: Optional[DomainLimiter] = None):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.transport = transport
+        self.limiter = limiter
+        self.host_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0, 'truncated': 0,
+            'latency_total': 0.0, 'latency_max': 0.0
+        })
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._loop = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Client bound to the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Connections cannot cross event loops
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and self.transport is None,
+                limits=self._limits(),
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                transport=self.transport
+            )
+            self._loop = loop
+        return self._client
+
+    def _blocking_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(
+                limits=self._limits(),
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                transport=self.transport
+            )
+        return self._sync_client
+
+    def _limiter(self) -> DomainLimiter:
+        return self.limiter or get_domain_limiter()
+
+    def _record(self, host: str, started: float, response: Optional[httpx.Response]) -> None:
+        latency = time.monotonic() - started
+        stats = self.host_stats[host]
+        stats['requests'] += 1
+        stats['latency_total'] += latency
+        stats['latency_max'] = max(stats['latency_max'], latency)
+        if response is None:
+            stats['errors'] += 1
+        else:
+            stats['bytes'] += len(response.content)
+            if response.status_code >= 400:
+                stats['errors'] += 1
+
+    async def _with_retries(self, url: str, send: Callable[[], Awaitable[httpx.Response]],
+                            retry: Optional[RetryPolicy] = None) -> httpx.Response:
+        """Run send() under the domain limiter, retrying transient failures per the policy"""
+        policy = retry or self.retry
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                async with self._limiter().acquire(url):
+                    response = await send()
+            except httpx.TransportError as e:
+                self._record(host, started, None)
+                if not policy.should_retry(attempt):
+                    raise
+                logger.warning(f"Retrying {url} after {type(e).__name__}")
+                delay = policy.delay(attempt)
+            else:
+                self._record(host, started, response)
+                if not policy.should_retry(attempt, response.status_code):
+                    return response
+                logger.warning(f"Retrying {url} after HTTP {response.status_code}")
+                delay = policy.delay(attempt, response)
+            self.host_stats[host]['retries'] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict] = None,
+                  timeout: Optional[float] = None, retry: Optional[RetryPolicy] = None) -> httpx.Response:
+        """GET with per-host limits and retries; raises httpx.HTTPError once retries run out.
+
+        retry overrides the shared policy for this request.
+        """
+        client = self._async_client()
+        return await self._with_retries(url, lambda: client.get(
+            url, headers=headers, params=params, timeout=timeout or self.timeout
+        ), retry)
+
+    async def _read_capped(self, client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]],
+                           max_bytes: int, content_types: Optional[Tuple[str, ...]],
+                           enough: Optional[Callable[[bytes], bool]], timeout: float) -> httpx.Response:
+        async with client.stream('GET', url, headers=headers, timeout=timeout) as response:
+            body = bytearray()
+            truncated = False
+            if response.status_code == 200 and content_type_allowed(response, content_types):
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= max_bytes or (enough is not None and enough(chunk)):
+                        truncated = True
+                        break
+            # The body is already decoded, so the encoding and length headers no longer apply
+            response_headers = [
+                (name, value) for name, value in response.headers.multi_items()
+                if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')
+            ]
+            return httpx.Response(
+                response.status_code,
+                headers=response_headers,
+                content=bytes(body[:max_bytes]),
+                request=response.request,
+                extensions={'truncated': truncated}
+            )
+
+    async def get_capped(self, url: str, headers: Optional[Dict[str, str]] = None,
+                         max_bytes: int = MAX_STREAM_BYTES, content_types: Optional[Tuple[str, ...]] = None,
+                         enough: Optional[Callable[[bytes], bool]] = None,
+                         timeout: Optional[float] = None) -> httpx.Response:
+        """Streaming GET that reads at most max_bytes of a 200 body.
+
+        The body is skipped entirely when the Content-Type is not one of
+        content_types, and reading stops early once enough(chunk) returns
+        True. Truncated responses carry extensions['truncated'].
+        """
+        client = self._async_client()
+        response = await self._with_retries(url, lambda: self._read_capped(
+            client, url, headers, max_bytes, content_types, enough, timeout or self.timeout
+        ))
+        if response.extensions.get('truncated'):
+            self.host_stats[urlparse(url).netloc]['truncated'] += 1
+        return response
+
+    def get_sync(self, url: str, headers: Optional[Dict[str, str]] = None, params: Optional[Dict] = None,
+                 timeout: Optional[float] = None) -> httpx.Response:
+        """Blocking GET sharing the retry policy and counters, for synchronous callers"""
+        client = self._blocking_client()
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                with self._limiter().acquire_sync(url):
+                    response = client.get(url, headers=headers, params=params, timeout=timeout or self.timeout)
+            except httpx.TransportError as e:
+                self._record(host, started, None)
+                if not self.retry.should_retry(attempt):
+                    raise
+                logger.warning(f"Retrying {url} after {type(e).__name__}")
+                delay = self.retry.delay(attempt)
+            else:
+                self._record(host, started, response)
+                if not self.retry.should_retry(attempt, response.status_code):
+                    return response
+                logger.warning(f"Retrying {url} after HTTP {response.status_code}")
+                delay = self.retry.delay(attempt, response)
+            self.host_stats[host]['retries'] += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host request, error, retry, byte and latency counters"""
+        report = {}
+        for host, stats in self.host_stats.items():
+            report[host] = {
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'bytes': stats['bytes'],
+                'truncated': stats['truncated'],
+                'avg_latency': round(stats['latency_total'] / stats['requests'], 3) if stats['requests'] else 0.0,
+                'max_latency': round(stats['latency_max'], 3)
+            }
+        return report
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+_client: Optional[HTTPClient] = None
+
+def get_http_client() -> HTTPClient:
+    """Process-wide HTTP transport"""
+    global _client
+    if _client is None:
+        _client = HTTPClient()
+    return _client
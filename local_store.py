@@ -0,0 +1,318 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from dateutil.parser import isoparse
+
+# Synced rows older than this are pruned from the local copy at startup
+LOCAL_RETENTION_DAYS = 30
+
+# Mirrors db_setup.sql. Tables with a SERIAL id in Supabase carry the
+# remote id next to the local one; timestamps are UTC text in the same
+# format StorageManager.format_timestamp produces, so they sort correctly.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    remote_id INTEGER UNIQUE,
+    tweet_id TEXT,
+    query_text TEXT,
+    query_type TEXT,
+    response_text TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    metadata TEXT
+);
+
+CREATE TABLE IF NOT EXISTS research_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    remote_id INTEGER UNIQUE,
+    topic TEXT NOT NULL,
+    content TEXT NOT NULL,
+    summary VARCHAR(255),
+    expires_at TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS article_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    remote_id INTEGER UNIQUE,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tweet_content TEXT NOT NULL,
+    source_feed TEXT NOT NULL,
+    is_weekly BOOLEAN DEFAULT FALSE,
+    queued_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    scheduled_for TEXT,
+    posted_at TEXT,
+    status TEXT CHECK (status IN ('queued', 'posted', 'failed')) DEFAULT 'queued',
+    error_message TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_queue_scheduling
+ON article_queue(status, scheduled_for)
+WHERE status = 'queued';
+
+CREATE TRIGGER IF NOT EXISTS update_article_queue_updated_at
+    AFTER UPDATE ON article_queue
+    FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE article_queue SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS rate_limits (
+    domain VARCHAR PRIMARY KEY,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    last_request TEXT,
+    last_attempt_at TEXT,
+    next_retry_at TEXT,
+    request_count INTEGER DEFAULT 0 CHECK (request_count >= 0),
+    reset_time TEXT,
+    success BOOLEAN DEFAULT TRUE,
+    consecutive_failures INTEGER DEFAULT 0 CHECK (consecutive_failures >= 0),
+    backoff_period INTEGER DEFAULT 0 CHECK (backoff_period >= 0),
+    circuit_state VARCHAR DEFAULT 'closed' CHECK (circuit_state IN ('closed', 'open', 'half_open')),
+    open_count INTEGER DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limits_last_request ON rate_limits(last_request);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_last_attempt ON rate_limits(last_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_next_retry ON rate_limits(next_retry_at);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_success ON rate_limits(success);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_updated_at ON rate_limits(updated_at);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_reset_time ON rate_limits(reset_time);
+
+CREATE TABLE IF NOT EXISTS tweet_interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    remote_id INTEGER UNIQUE,
+    tweet_id VARCHAR NOT NULL,
+    interaction_type VARCHAR NOT NULL CHECK (interaction_type IN ('like', 'quote', 'retweet')),
+    content TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    success BOOLEAN DEFAULT FALSE,
+    error_message TEXT
+);
+
+CREATE TABLE IF NOT EXISTS update_times (
+    type VARCHAR PRIMARY KEY CHECK (type IN ('marketing', 'weekly', 'news', 'timeline', 'search')),
+    last_update TEXT NOT NULL,
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_tweet_interactions_type ON tweet_interactions(interaction_type);
+CREATE INDEX IF NOT EXISTS idx_tweet_interactions_tweet_id ON tweet_interactions(tweet_id);
+CREATE INDEX IF NOT EXISTS idx_tweet_interactions_created_at ON tweet_interactions(created_at);
+CREATE INDEX IF NOT EXISTS idx_interactions_created_at ON interactions(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_research_cache_topic ON research_cache(topic);
+CREATE INDEX IF NOT EXISTS idx_article_queue_status ON article_queue(status);
+CREATE INDEX IF NOT EXISTS idx_update_times_last_update ON update_times(last_update DESC);
+
+-- Writes made while Supabase was unreachable, replayed in id order
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'upsert')),
+    row_id INTEGER,
+    payload TEXT NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+"""
+
+TIMESTAMP_COLUMNS = {
+    'created_at', 'updated_at', 'expires_at', 'queued_at', 'scheduled_for', 'posted_at', 'last_update'
+}
+BOOLEAN_COLUMNS = {'is_weekly', 'success'}
+JSON_COLUMNS = {'metadata'}
+# Tables whose rows get a SERIAL id from Supabase
+SERIAL_TABLES = {'interactions', 'research_cache', 'article_queue', 'tweet_interactions'}
+# Conflict column of the tables written with upsert
+UPSERT_KEYS = {'rate_limits': 'domain', 'update_times': 'type'}
+
+def sortable_timestamp(value: Any) -> Any:
+    """UTC text like 2025-01-20T22:42:54.737Z for any ISO timestamp; naive values are taken as local time"""
+    if not value:
+        return value
+    try:
+        parsed = value if isinstance(value, datetime) else isoparse(str(value))
+    except ValueError:
+        return value
+    parsed = parsed if parsed.tzinfo else parsed.astimezone()
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class LocalStore:
+    """SQLite copy of the Supabase tables for offline and fallback use.
+
+    StorageManager writes every row here as well as to Supabase, so reads
+    keep working at local-disk latency when Supabase is unreachable.
+    Writes that could not reach Supabase are also recorded in an outbox
+    and replayed in order once the connection returns. The database runs
+    in WAL mode so reads never wait on a write.
+
+    Rows queued offline have no Supabase id yet; they are handed out with
+    the negative of their local id until the outbox insert assigns one.
+    """
+
+    def __init__(self, path: str = "local_store.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._columns = {
+            table: {row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for table in ('interactions', 'research_cache', 'article_queue', 'rate_limits',
+                          'tweet_interactions', 'update_times')
+        }
+        self.pending = self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        self._prune()
+
+    def _prune(self) -> None:
+        """Drop synced rows past retention; unsynced rows are always kept"""
+        cutoff = sortable_timestamp(datetime.now(timezone.utc) - timedelta(days=LOCAL_RETENTION_DAYS))
+        with self._lock, self._conn:
+            for table in ('interactions', 'tweet_interactions'):
+                self._conn.execute(f"DELETE FROM {table} WHERE remote_id IS NOT NULL AND created_at < ?", (cutoff,))
+            self._conn.execute(
+                "DELETE FROM article_queue WHERE remote_id IS NOT NULL AND status != 'queued' AND updated_at < ?",
+                (cutoff,)
+            )
+            self._conn.execute(
+                "DELETE FROM research_cache WHERE remote_id IS NOT NULL AND expires_at < ?",
+                (sortable_timestamp(datetime.now(timezone.utc)),)
+            )
+
+    def _encode(self, table: str, row: Dict) -> Dict:
+        """Known columns only, with timestamps normalized and JSON encoded"""
+        encoded = {}
+        for column, value in row.items():
+            if column not in self._columns[table] or column in ('id', 'remote_id'):
+                continue
+            if column in TIMESTAMP_COLUMNS:
+                value = sortable_timestamp(value)
+            elif column in JSON_COLUMNS and value is not None:
+                value = json.dumps(value, default=str)
+            encoded[column] = value
+        return encoded
+
+    def _decode(self, table: str, row: sqlite3.Row) -> Dict:
+        data = dict(row)
+        for column in BOOLEAN_COLUMNS & data.keys():
+            if data[column] is not None:
+                data[column] = bool(data[column])
+        for column in JSON_COLUMNS & data.keys():
+            if data[column]:
+                try:
+                    data[column] = json.loads(data[column])
+                except ValueError:
+                    pass
+        if table in SERIAL_TABLES:
+            remote_id = data.pop('remote_id', None)
+            data['id'] = remote_id if remote_id is not None else -data['id']
+        return data
+
+    def _where_id(self, row_id: int):
+        """Match a row by the id handed out for it"""
+        return ("id = ?", -row_id) if row_id < 0 else ("remote_id = ?", row_id)
+
+    def _queue(self, table: str, operation: str, payload: Dict, row_id: Optional[int] = None) -> None:
+        self._conn.execute(
+            "INSERT INTO outbox (table_name, operation, row_id, payload) VALUES (?, ?, ?, ?)",
+            (table, operation, row_id, json.dumps(payload, default=str))
+        )
+        self.pending += 1
+
+    def insert(self, table: str, row: Dict, remote_id: Optional[int] = None, pending: bool = False) -> int:
+        """Store a row, queueing it for Supabase when pending; returns the id to hand out"""
+        encoded = self._encode(table, row)
+        sql = f"INSERT INTO {table} ({', '.join(encoded)}, remote_id) VALUES ({', '.join('?' for _ in encoded)}, ?)"
+        if remote_id is not None:
+            # A row read back from Supabase again keeps its local id
+            updates = ', '.join(f"{column} = excluded.{column}" for column in encoded)
+            sql += f" ON CONFLICT(remote_id) DO UPDATE SET {updates}"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(sql, (*encoded.values(), remote_id))
+            if pending:
+                self._queue(table, 'insert', row, row_id=cursor.lastrowid)
+        return remote_id if remote_id is not None else -cursor.lastrowid
+
+    def update(self, table: str, row_id: int, changes: Dict, pending: bool = False) -> bool:
+        """Apply changes to the row handed out as row_id; False if it is neither stored nor queued"""
+        encoded = self._encode(table, changes)
+        where, value = self._where_id(row_id)
+        assignments = ', '.join(f"{column} = ?" for column in encoded)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE {table} SET {assignments} WHERE {where}", (*encoded.values(), value)
+            )
+            if pending:
+                self._queue(table, 'update', changes, row_id=row_id)
+        return cursor.rowcount > 0 or pending
+
+    def upsert(self, table: str, row: Dict, pending: bool = False) -> bool:
+        """Insert or replace a row of a table keyed by its primary key"""
+        encoded = self._encode(table, row)
+        columns = ', '.join(encoded)
+        placeholders = ', '.join('?' for _ in encoded)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})", tuple(encoded.values())
+            )
+            if pending:
+                self._queue(table, 'upsert', row)
+        return True
+
+    def mirror(self, table: str, rows: List[Dict]) -> None:
+        """Keep a local copy of rows read from Supabase"""
+        for row in rows:
+            if row.get('id') is not None:
+                self.insert(table, row, remote_id=row['id'])
+
+    def select(self, table: str, where: str = "1", params: tuple = (), order: Optional[str] = None,
+               limit: Optional[int] = None, columns: str = "*") -> List[Dict]:
+        sql = f"SELECT {columns} FROM {table} WHERE {where}"
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [self._decode(table, row) for row in self._conn.execute(sql, params)]
+
+    def outbox(self, limit: int = 100) -> List[Dict]:
+        """Oldest unsynced writes"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM outbox ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [{**dict(row), 'payload': json.loads(row['payload'])} for row in rows]
+
+    def resolve(self, table: str, row_id: int) -> Optional[int]:
+        """Supabase id of a row handed out as row_id, None until its insert has synced"""
+        if row_id > 0:
+            return row_id
+        with self._lock:
+            row = self._conn.execute(f"SELECT remote_id FROM {table} WHERE id = ?", (-row_id,)).fetchone()
+        return row['remote_id'] if row else None
+
+    def synced(self, entry: Dict, remote_id: Optional[int] = None) -> None:
+        """Drop a replayed outbox entry, recording the id Supabase gave an inserted row"""
+        with self._lock, self._conn:
+            if remote_id is not None and entry['operation'] == 'insert' and entry['table_name'] in SERIAL_TABLES:
+                self._conn.execute(
+                    f"UPDATE {entry['table_name']} SET remote_id = ? WHERE id = ?", (remote_id, entry['row_id'])
+                )
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry['id'],))
+            self.pending -= 1
+
+    def failed(self, entry: Dict) -> int:
+        """Count a failed replay of an outbox entry; returns its attempts so far"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (entry['id'],))
+        return entry['attempts'] + 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
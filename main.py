@@ -1,10 +1,12 @@
 from twitter import Twitter
+from components import get_components
 import time
 from datetime import datetime, timedelta
 import pytz
 import logging
 import sys
 import os
+import signal
 
 # Configure logging to output to stdout for Heroku
 logging.basicConfig(
@@ -147,6 +149,14 @@ async def main():
                 else:
                     logger.info("⏳ Topic search in cooldown")
                 
+                # News feed polling (each feed on its own learned schedule)
+                logger.info("\n📡 Polling news feeds that are due...")
+                queued_articles = await client.check_news_feeds()
+                if queued_articles > 0:
+                    logger.info(f"✅ Queued {queued_articles} new articles")
+                else:
+                    logger.info("ℹ️ No new articles queued")
+                
                 # News analysis (every 4 hours)
                 time_since_news = (current_time - last_news_post).total_seconds()
                 time_until_news = max(0, 14400 - time_since_news)
@@ -211,6 +221,9 @@ async def main():
                     last_weekly_post = current_time
                     logger.info("✅ Weekly research post complete")
                 
+                # Nothing runs on the event loop during the sleep, so write buffered interactions now
+                await client.storage.flush_writes()
+
                 logger.info("\n" + "="*50)
                 logger.info("CYCLE COMPLETE - Sleeping 10 minutes")
                 logger.info("="*50 + "\n")
@@ -224,9 +237,13 @@ async def main():
     except Exception as e:
         logger.critical(f"Critical error in main function: {str(e)}")
         raise
+    finally:
+        await get_components().aclose()
 
 import asyncio
 
 if __name__ == "__main__":
+    # Heroku stops dynos with SIGTERM; exit normally so write-behind state is flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     logger.info("=== Starting $EXMPLR social media agent ===")
     asyncio.run(main())
@@ -80,9 +80,44 @@ RATE_LIMITS = {
     }
 }
 
+# Per-domain pacing shared by feed, article and search requests: a token
+# bucket refilled at requests_per_minute that holds up to burst requests,
+# and at most max_in_flight concurrent requests. Keys other than "default"
+# override it for one domain.
+DOMAIN_LIMITS = {
+    "default": {
+        "requests_per_minute": RATE_LIMITS["rss_feeds"]["requests_per_minute"],
+        "burst": 5,
+        "max_in_flight": 4
+    }
+}
+
+# Per-domain circuit breaker for feeds and article sites: a domain opens
+# once error_rate of its last window_size attempts (within window_seconds,
+# at least min_requests of them) failed, stays open for a jittered
+# exponential backoff, then lets a single probe through to decide
+CIRCUIT_BREAKER = {
+    "window_size": 10,
+    "window_seconds": 24 * 3600,
+    "min_requests": 3,
+    "error_rate": 0.5,
+    "base_backoff": 15 * 60,  # seconds open after the first trip
+    "max_backoff": 24 * 3600,  # seconds
+    "probe_timeout": 10 * 60   # seconds before an unanswered probe is retried
+}
+
 # Content Freshness Settings
 CONTENT_AGE_LIMITS = {
     "news": 24,        # hours
     "research": 168,   # hours (1 week)
     "evergreen": 720   # hours (30 days)
-}
\ No newline at end of file
+}
+
+# Adaptive feed polling: each feed is polled about twice per observed
+# publish interval, never more often than the floor or less than the ceiling
+FEED_POLLING = {
+    "floor": RATE_LIMITS["rss_feeds"]["minimum_interval"],  # seconds
+    "ceiling": CONTENT_AGE_LIMITS["news"] * 3600,           # seconds
+    "default_interval": 4 * 3600,  # seconds, until a feed has publish history
+    "history": 20                  # publish intervals considered per feed
+}
@@ -0,0 +1,15 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+# Worker processes for CPU-bound article and feed parsing
+PARSE_WORKERS = int(os.getenv('ARTICLE_PARSE_WORKERS', '2'))
+
+_parse_pool: Optional[Executor] = None
+
+def get_parse_pool() -> Executor:
+    """Shared process pool for CPU-bound parsing"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_pool
@@ -1,23 +1,152 @@
 import os
 import json
 import time
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import atexit
+import random
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Deque, Tuple
 from urllib.parse import urlparse
 from storage_manager import StorageManager
+from domain_limiter import get_domain_limiter
+from news_config import CIRCUIT_BREAKER
+
+# Seconds between batched writes of changed domains
+FLUSH_INTERVAL = 60
+# Circuit state transitions kept in memory for diagnostics
+TRANSITION_HISTORY = 200
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Live managers, flushed together at shutdown
+_managers: "weakref.WeakSet[RateLimitManager]" = weakref.WeakSet()
+
+def flush_all() -> None:
+    """Write pending rate limit changes of every live manager"""
+    for manager in list(_managers):
+        manager.flush()
+
+atexit.register(flush_all)
+
+
+class CircuitBreaker:
+    """Closed / open / half-open state of one domain.
+
+    Closed lets everything through and opens once the error rate over the
+    sliding window crosses the threshold. Open rejects until a jittered,
+    exponentially growing backoff has passed, then half-open lets a single
+    probe through: its success closes the circuit, its failure reopens it
+    for longer.
+    """
+
+    def __init__(self, settings: Optional[Dict] = None):
+        self.settings = settings or CIRCUIT_BREAKER
+        self.state = CLOSED
+        self.outcomes: Deque[Tuple[float, bool]] = deque(maxlen=self.settings["window_size"])
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.open_until = 0.0
+        self.opened_for = 0.0
+        self.closed_at = 0.0
+        self.probe_started: Optional[float] = None
+
+    def error_rate(self, now: float) -> Tuple[float, int]:
+        """Share of failed attempts in the window, and the number of attempts"""
+        horizon = now - self.settings["window_seconds"]
+        while self.outcomes and self.outcomes[0][0] < horizon:
+            self.outcomes.popleft()
+        if not self.outcomes:
+            return 0.0, 0
+        failures = sum(1 for _, ok in self.outcomes if not ok)
+        return failures / len(self.outcomes), len(self.outcomes)
+
+    def backoff(self) -> float:
+        """Seconds to stay open after the current trip, before jitter"""
+        return min(self.settings["base_backoff"] * 2 ** max(self.open_count - 1, 0), self.settings["max_backoff"])
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may go out now; an expired open circuit lets one probe through"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if now < self.open_until:
+                return False
+            self.state = HALF_OPEN
+            self.probe_started = now
+            return True
+        # Half-open: only the probe, unless it never reported back
+        if self.probe_started is None or now - self.probe_started >= self.settings["probe_timeout"]:
+            self.probe_started = now
+            return True
+        return False
+
+    def record(self, ok: bool, now: float) -> None:
+        self.outcomes.append((now, ok))
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        if self.state == HALF_OPEN:
+            if ok:
+                self.state = CLOSED
+                self.closed_at = now
+                self.outcomes.clear()
+                self.probe_started = None
+            else:
+                self._trip(now)
+        elif self.state == CLOSED and not ok:
+            rate, attempts = self.error_rate(now)
+            if attempts >= self.settings["min_requests"] and rate >= self.settings["error_rate"]:
+                self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        if self.closed_at and now - self.closed_at > self.settings["window_seconds"]:
+            # Healthy for a whole window since the last trip: start the backoff over
+            self.open_count = 0
+        self.open_count += 1
+        self.opened_for = self.backoff() * random.uniform(0.5, 1.0)
+        self.open_until = now + self.opened_for
+        self.state = OPEN
+        self.probe_started = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], open_until: float, now: float) -> "CircuitBreaker":
+        """Breaker restored from a stored rate_limits row"""
+        breaker = cls()
+        state = row.get('circuit_state') or (CLOSED if row.get('success', True) else OPEN)
+        breaker.consecutive_failures = row.get('consecutive_failures') or 0
+        breaker.open_count = row.get('open_count') or (0 if state == CLOSED else 1)
+        if state != CLOSED:
+            # A probe that was in flight at shutdown is simply sent again
+            breaker.state = OPEN
+            breaker.open_until = open_until if state == OPEN else now
+        for _ in range(min(breaker.consecutive_failures, breaker.settings["window_size"])):
+            breaker.outcomes.append((now, False))
+        return breaker
+
 
 class RateLimitManager:
-    def __init__(self, storage_manager: StorageManager):
+    """Per-domain circuit breakers held in memory and written behind.
+
+    All rows are loaded once from Supabase (and the JSON fallback) when the
+    manager is created. Checks are dictionary lookups; successes and
+    failures update memory and mark the domain dirty, and dirty domains are
+    upserted in one batch every FLUSH_INTERVAL seconds and at shutdown.
+    Every circuit state change is kept in ``transitions``.
+    """
+
+    def __init__(self, storage_manager: StorageManager, flush_interval: float = FLUSH_INTERVAL):
         self.storage = storage_manager
         self.rate_limits_file = "rate_limits.json"
-        self.backoff_schedule = [
-            60,      # 1 hour
-            240,     # 4 hours
-            1440,    # 24 hours
-            4320,    # 3 days
-            10080    # 7 days
-        ]
         self.datetime_format = '%Y-%m-%d %H:%M:%S'
+        self.flush_interval = flush_interval
+        self.limits: Dict[str, Dict[str, Any]] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=TRANSITION_HISTORY)
+        self._dirty: set = set()
+        self._last_flush = time.monotonic()
+        self._load()
+        _managers.add(self)
 
     def _get_domain(self, url: str) -> str:
         """Extract domain from URL"""
@@ -38,8 +167,10 @@ class RateLimitManager:
     def _save_json_limits(self, limits: Dict) -> None:
         """Save rate limits to JSON file (fallback storage)"""
         try:
-            with open(self.rate_limits_file, 'w') as f:
+            tmp_file = self.rate_limits_file + '.tmp'
+            with open(tmp_file, 'w') as f:
                 json.dump(limits, f, indent=2, default=str)
+            os.replace(tmp_file, self.rate_limits_file)
         except Exception as e:
             print(f"Error saving rate limits to JSON: {e}")
 
@@ -59,117 +190,172 @@ class RateLimitManager:
             # If all else fails, try parsing ISO format
             return datetime.fromisoformat(timestamp_str)
 
-    async def get_rate_limit(self, url: str) -> Optional[Dict[str, Any]]:
-        """Get rate limit info for a domain"""
-        domain = self._get_domain(url)
+    def _epoch(self, timestamp_str: Optional[str]) -> float:
+        """Epoch seconds of a stored timestamp, naive values taken as local time"""
+        if not timestamp_str:
+            return 0.0
+        try:
+            return self._parse_timestamp(str(timestamp_str)).timestamp()
+        except ValueError:
+            return 0.0
+
+    def _load(self) -> None:
+        """Read every domain once, preferring the most recently updated copy of each row"""
+        rows: List[Dict[str, Any]] = [
+            {'domain': domain, **row} for domain, row in self._load_json_limits().items()
+        ]
         try:
-            # Try Supabase
             if self.storage.supabase:
-                response = self.storage.supabase.table('rate_limits')\
-                    .select('*')\
-                    .eq('domain', domain)\
-                    .execute()
-                
-                if hasattr(response, 'data'):
-                    data = response.data
-                    if isinstance(data, list) and len(data) > 0:
-                        return data[0]
-                    
+                response = self.storage.supabase.table('rate_limits').select('*').execute()
+                if hasattr(response, 'data') and isinstance(response.data, list):
+                    rows.extend(response.data)
         except Exception as e:
-            print(f"Error getting rate limit from Supabase: {e}")
-        
-        # Fallback to JSON
-        limits = self._load_json_limits()
-        return limits.get(domain)
+            print(f"Error loading rate limits from Supabase: {e}")
+
+        for row in rows:
+            domain = row.get('domain')
+            if not domain:
+                continue
+            current = self.limits.get(domain)
+            if current and self._epoch(current.get('updated_at')) >= self._epoch(row.get('updated_at')):
+                continue
+            self._set(domain, row)
+
+    def _set(self, domain: str, row: Dict[str, Any]) -> None:
+        self.limits[domain] = row
+        self.breakers[domain] = CircuitBreaker.from_row(row, self._epoch(row.get('next_retry_at')), time.time())
+
+    def _transition(self, domain: str, previous: str, breaker: CircuitBreaker, now: float) -> None:
+        """Record a circuit state change and mirror it into the stored row"""
+        rate, attempts = breaker.error_rate(now)
+        transition = {
+            'domain': domain,
+            'at': datetime.fromtimestamp(now).astimezone().isoformat(),
+            'from': previous,
+            'to': breaker.state,
+            'error_rate': round(rate, 2),
+            'attempts': attempts,
+            'open_count': breaker.open_count,
+            'open_for': round(breaker.opened_for) if breaker.state == OPEN else 0
+        }
+        self.transitions.append(transition)
+        detail = f" for {transition['open_for'] / 60:.0f} minutes" if breaker.state == OPEN else ""
+        print(f"Circuit for {domain}: {previous} -> {breaker.state}{detail} "
+              f"(error rate {rate:.0%} over {attempts} attempts)")
+        if domain in self.limits:
+            self.limits[domain]['circuit_state'] = breaker.state
+            self._dirty.add(domain)
+
+    async def get_rate_limit(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get rate limit info for a domain"""
+        return self.limits.get(self._get_domain(url))
 
     async def update_rate_limit(self, url: str, success: bool) -> None:
-        """Update rate limit info after an attempt"""
+        """Feed an attempt's outcome to the domain's breaker; written to storage on the next flush"""
         domain = self._get_domain(url)
         now = datetime.now().astimezone()
-        
+        now_ts = time.time()
+        breaker = self.breakers.get(domain) or CircuitBreaker()
+        self.breakers[domain] = breaker
+        previous = breaker.state
+        breaker.record(success, now_ts)
+
+        row = dict(self.limits.get(domain) or {'domain': domain, 'created_at': self._format_timestamp(now)})
+        is_open = breaker.state == OPEN
+        row.update({
+            'last_attempt_at': self._format_timestamp(now),
+            'success': success,
+            'consecutive_failures': breaker.consecutive_failures,
+            'next_retry_at': self._format_timestamp(
+                datetime.fromtimestamp(breaker.open_until).astimezone() if is_open else now
+            ),
+            'backoff_period': round(breaker.opened_for / 60) if is_open else 0,
+            'circuit_state': breaker.state,
+            'open_count': breaker.open_count,
+            'updated_at': self._format_timestamp(now)
+        })
+        self.limits[domain] = row
+        self._dirty.add(domain)
+        if breaker.state != previous:
+            self._transition(domain, previous, breaker, now_ts)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.aflush()
+
+    def _offline(self) -> bool:
+        """Supabase is configured but the storage manager currently can't reach it"""
+        return bool(self.storage.supabase) and getattr(self.storage, 'offline', False)
+
+    def _flush_failed(self, dirty: set, error: Exception) -> None:
+        # Rows stay dirty so the next flush retries them
+        print(f"Error flushing {len(dirty)} rate limits to Supabase: {error}")
+        self._dirty |= dirty
+        self._save_json_limits(self.limits)
+
+    def _flush_locally(self, dirty: set) -> None:
+        """JSON file only: the file holds the full state, written once per flush"""
+        self._save_json_limits(self.limits)
+        if self._offline():
+            # Upserted once Supabase answers again
+            self._dirty |= dirty
+
+    async def aflush(self) -> None:
+        """Upsert every changed domain in one batch on the async client, falling back to the JSON file"""
+        self._last_flush = time.monotonic()
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rows = [self.limits[domain] for domain in dirty]
         try:
-            # Get current rate limit info
-            rate_limit = await self.get_rate_limit(url)
-            
-            if rate_limit:
-                # Update existing rate limit
-                consecutive_failures = 0 if success else rate_limit['consecutive_failures'] + 1
-                backoff_idx = min(consecutive_failures, len(self.backoff_schedule) - 1)
-                backoff_period = self.backoff_schedule[backoff_idx] if not success else 0
-                
-                next_retry = (now if success else now + timedelta(minutes=backoff_period))
-                
-                data = {
-                    'last_attempt_at': self._format_timestamp(now),
-                    'success': success,
-                    'consecutive_failures': consecutive_failures,
-                    'next_retry_at': self._format_timestamp(next_retry),
-                    'backoff_period': backoff_period,
-                    'updated_at': self._format_timestamp(now)
-                }
-            else:
-                # Create new rate limit entry
-                consecutive_failures = 0 if success else 1
-                backoff_period = self.backoff_schedule[0] if not success else 0
-                next_retry = (now if success else now + timedelta(minutes=backoff_period))
-                
-                data = {
-                    'domain': domain,
-                    'last_attempt_at': self._format_timestamp(now),
-                    'success': success,
-                    'consecutive_failures': consecutive_failures,
-                    'next_retry_at': self._format_timestamp(next_retry),
-                    'backoff_period': backoff_period,
-                    'created_at': self._format_timestamp(now),
-                    'updated_at': self._format_timestamp(now)
-                }
-            
-            try:
-                # Try Supabase
-                if self.storage.supabase:
-                    if rate_limit:
-                        response = self.storage.supabase.table('rate_limits')\
-                            .update(data)\
-                            .eq('domain', domain)\
-                            .execute()
-                    else:
-                        response = self.storage.supabase.table('rate_limits')\
-                            .insert(data)\
-                            .execute()
-                    
-                    if not hasattr(response, 'data'):
-                        raise Exception("No response data from Supabase")
-                        
-            except Exception as e:
-                print(f"Error updating rate limit in Supabase: {e}")
-                # Fallback to JSON
-                limits = self._load_json_limits()
-                limits[domain] = data
-                self._save_json_limits(limits)
-                
+            # None without Supabase or while the storage manager is offline
+            db = self.storage._db() if self.storage.supabase else None
+            if db:
+                response = await db.table('rate_limits')\
+                    .upsert(rows, on_conflict='domain')\
+                    .execute()
+                if not hasattr(response, 'data'):
+                    raise Exception("No response data from Supabase")
+                return
         except Exception as e:
-            print(f"Error updating rate limit: {e}")
+            self.storage._connection_failed(e)
+            self._flush_failed(dirty, e)
+            return
+        self._flush_locally(dirty)
 
-    async def can_access(self, url: str) -> bool:
-        """Check if a domain can be accessed"""
+    def flush(self) -> None:
+        """Blocking variant of aflush for shutdown, when no event loop is running"""
+        self._last_flush = time.monotonic()
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        rows = [self.limits[domain] for domain in dirty]
         try:
-            rate_limit = await self.get_rate_limit(url)
-            if not rate_limit:
-                return True
-            
-            if rate_limit['success']:
-                return True
-                
-            now = datetime.now().astimezone()
-            next_retry = self._parse_timestamp(rate_limit['next_retry_at'])
-            if next_retry.tzinfo is None:
-                next_retry = next_retry.replace(tzinfo=now.tzinfo)
-            
-            return now >= next_retry
-            
+            if self.storage.supabase and not self._offline():
+                response = self.storage.supabase.table('rate_limits')\
+                    .upsert(rows, on_conflict='domain')\
+                    .execute()
+                if not hasattr(response, 'data'):
+                    raise Exception("No response data from Supabase")
+                return
         except Exception as e:
-            print(f"Error checking rate limit: {e}")
-            return True  # Allow access on error
+            self._flush_failed(dirty, e)
+            return
+        self._flush_locally(dirty)
+
+    def acquire(self, url: str):
+        """Request slot for the URL's domain (async context manager), paced by the domain limiter"""
+        return get_domain_limiter().acquire(url)
+
+    async def can_access(self, url: str) -> bool:
+        """Check if a domain can be accessed; an open circuit past its backoff admits one probe"""
+        domain = self._get_domain(url)
+        breaker = self.breakers.get(domain)
+        if breaker is None or breaker.state == CLOSED:
+            return True
+        previous = breaker.state
+        allowed = breaker.allow(time.time())
+        if breaker.state != previous:
+            self._transition(domain, previous, breaker, time.time())
+        return allowed
 
     async def record_success(self, url: str) -> None:
         """Record a successful access attempt"""
@@ -179,7 +365,25 @@ class RateLimitManager:
         """Record a failed access attempt"""
         await self.update_rate_limit(url, False)
 
-    def get_backoff_time(self, consecutive_failures: int) -> int:
-        """Get backoff time in minutes for number of failures"""
-        idx = min(consecutive_failures, len(self.backoff_schedule) - 1)
-        return self.backoff_schedule[idx]
\ No newline at end of file
+    def get_backoff_time(self, open_count: int) -> int:
+        """Backoff in minutes after the given number of consecutive trips, before jitter"""
+        breaker = CircuitBreaker()
+        breaker.open_count = open_count
+        return round(breaker.backoff() / 60)
+
+    def circuit_report(self) -> Dict[str, Dict[str, Any]]:
+        """Domains whose circuit is not closed, with their window error rate"""
+        now = time.time()
+        report = {}
+        for domain, breaker in self.breakers.items():
+            if breaker.state == CLOSED:
+                continue
+            rate, attempts = breaker.error_rate(now)
+            report[domain] = {
+                'state': breaker.state,
+                'error_rate': round(rate, 2),
+                'attempts': attempts,
+                'open_count': breaker.open_count,
+                'retry_in_minutes': round(max(0.0, breaker.open_until - now) / 60, 1)
+            }
+        return report
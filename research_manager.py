@@ -1,30 +1,36 @@
 import os
-import re
-import requests
-import feedparser
-import openai
+import asyncio
 from openai import OpenAI
 from dotenv import load_dotenv
-import bleach
 
 # Load environment variables
 load_dotenv()
-from newspaper import Article, ArticleException
-from datetime import datetime, timedelta
-from storage_manager import StorageManager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from storage_manager import StorageManager, parse_timestamp
 from rate_limit_manager import RateLimitManager
-import urllib3
+from article_extractor import ArticleExtractor
+from feed_service import get_feed_service
+from search_client import get_search_client
+from url_index import get_url_index
 
-# Disable urllib3 warnings
-urllib3.disable_warnings()
+# Generated research stays in research_cache this long
+RESEARCH_TTL = timedelta(days=7)
+# Older cached research is still served, but regenerated in the background
+RESEARCH_REFRESH_AFTER = timedelta(days=1)
+
+def normalize_topic(topic) -> str:
+    """Research cache key for a topic: case and whitespace insensitive"""
+    return ' '.join(str(topic).lower().split())
 
 class ResearchManager:
-    def __init__(self, storage_manager: StorageManager):
+    def __init__(self, storage_manager: StorageManager, gen_ai: Optional[OpenAI] = None,
+                 rate_limiter: Optional[RateLimitManager] = None):
         # Initialize storage
         self.storage = storage_manager
         
         # Load OpenAI API key from environment
-        self.gen_ai = OpenAI(
+        self.gen_ai = gen_ai or OpenAI(
             api_key=os.getenv('OPENAI_API_KEY')
         )
         
@@ -45,15 +51,26 @@ class ResearchManager:
         # Initialize API keys
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.search_engine_id = os.getenv("SEARCH_ENGINE_ID")
+        self.search_client = get_search_client()
         
         # Initialize rate limiter
-        self.rate_limiter = RateLimitManager(self.storage)
+        self.rate_limiter = rate_limiter or RateLimitManager(self.storage)
+
+        # Fetch-once, parse-many article extraction
+        self.extractor = ArticleExtractor()
+        # Stop extracting once this many articles have been collected
+        self.extraction_target = 3
+
+        # Research generations in flight, shared by concurrent requests per topic
+        self._research_tasks: Dict[str, asyncio.Task] = {}
+        self.research_cache_hits = 0
+        self.research_refreshes = 0
 
     async def get_recent_research(self):
         """Get recent research for content inspiration"""
         try:
             # Get last 5 research posts from storage
-            interactions = await self.storage.get_recent_interactions(5)
+            interactions = await self.storage.get_recent_query_interactions(5)
             return [interaction['response_text'] for interaction in interactions 
                    if interaction['query_type'] == 'research']
         except Exception as e:
@@ -104,21 +121,28 @@ class ResearchManager:
         articles = []
         recent_articles = []  # Store recent articles as backup
         
-        # Get posted URLs from storage
-        interactions = await self.storage.get_recent_interactions(100)
-        posted_urls = [i.get('metadata', {}).get('url') for i in interactions 
-                      if i.get('metadata', {}).get('url')]
-        posted_urls = [url for url in posted_urls if url]  # Filter None values
-        
+        # Fold URLs recorded on recent interactions into the posted-URL index
+        posted = get_url_index()
+        interactions = await self.storage.get_recent_query_interactions(100)
+        for interaction in interactions:
+            metadata = interaction.get('metadata') or {}
+            posted.add_many([metadata.get('url')] + list(metadata.get('urls') or []))
+
+        # Check rate limits before accessing feeds
+        feed_urls = []
         for feed_url in self.rss_feeds:
-            try:
-                # Check rate limits before accessing feed
-                if not await self.rate_limiter.can_access(feed_url):
-                    print(f"Rate limited, skipping feed: {feed_url}")
-                    continue
+            if await self.rate_limiter.can_access(feed_url):
+                feed_urls.append(feed_url)
+            else:
+                print(f"Rate limited, skipping feed: {feed_url}")
 
-                feed = feedparser.parse(feed_url)
-                if not feed.entries:
+        # Feeds already fetched this polling window are reused, the rest fetched concurrently
+        snapshot = await get_feed_service().snapshot(feed_urls)
+        
+        for feed_url in feed_urls:
+            try:
+                feed = snapshot.feed(feed_url)
+                if not feed or not feed.entries:
                     print(f"No entries found for feed: {feed_url}")
                     await self.rate_limiter.record_failure(feed_url)
                     continue
@@ -131,7 +155,7 @@ class ResearchManager:
                         "link": entry.link
                     }
                     
-                    if entry.link not in posted_urls:
+                    if entry.link not in posted:
                         articles.append(article)
                     elif allow_recent:
                         # Store as recent if it's in our history
@@ -148,14 +172,14 @@ class ResearchManager:
             # Sort recent articles to get the most relevant ones
             sorted_recent = sorted(
                 recent_articles,
-                key=lambda x: posted_urls.index(x["link"]) if x["link"] in posted_urls else float('inf'),
+                key=lambda x: posted.posted_at(x["link"]) or 0,
                 reverse=True  # Most recently used first
             )
             return sorted_recent[:3]  # Return up to 3 recent articles
             
         return articles[:3]  # Limit to 3 new articles
 
-    def search_google(self, query):
+    async def search_google(self, query):
         """Search for articles using Google Custom Search with domain filtering"""
         if not (self.google_api_key and self.search_engine_id):
             print("Google Search API credentials not configured")
@@ -164,14 +188,14 @@ class ResearchManager:
         try:
             # Add focus on news and blog sites
             search_query = f"{query} (site:techcrunch.com OR site:venturebeat.com OR site:wired.com OR site:thenextweb.com OR site:medium.com)"
-            url = f"https://www.googleapis.com/customsearch/v1?q={search_query}&key={self.google_api_key}&cx={self.search_engine_id}"
-            response = requests.get(url).json()
-            articles = response.get('items', [])[:5]
+            # Quota-accounted and cached per query; degrades to cached results when out of quota
+            articles = (await self.search_client.search(search_query))[:5]
             
             # Filter out already posted URLs
             new_articles = [
                 {"title": a["title"], "link": a["link"]} 
                 for a in articles
+                if a["link"] not in get_url_index()
             ]
             
             return new_articles[:3]
@@ -180,64 +204,116 @@ class ResearchManager:
             return []
 
     async def extract_article_text(self, url):
-        """Extract content from article URL with multiple fallback methods"""
+        """Extract content from article URL, downloading it only once"""
         # Check rate limits before accessing URL
         if not await self.rate_limiter.can_access(url):
             print(f"Rate limited, skipping URL: {url}")
             return None
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-
-        # Method 1: Direct newspaper3k extraction
+        # Per-domain pacing and concurrency are enforced by the domain limiter on every request
         try:
-            article = Article(url)
-            article.download()
-            article.parse()
-            if article.text and len(article.text.strip()) > 100:  # Ensure meaningful content
+            text = await self.extractor.extract(url)
+            if text:
                 await self.rate_limiter.record_success(url)
-                return article.text[:4000]  # Limit input size for GPT-4
-        except Exception as e:
-            print(f"Primary extraction failed for {url}: {e}")
-
-        # Method 2: Custom request with headers
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                article = Article(url)
-                article.set_html(response.text)
-                article.parse()
-                if article.text and len(article.text.strip()) > 100:
-                    await self.rate_limiter.record_success(url)
-                    return article.text[:4000]
-        except Exception as e:
-            print(f"Secondary extraction failed for {url}: {e}")
-
-        # Method 3: Try to extract main content from HTML
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                # Sanitize HTML content using bleach
-                text = bleach.clean(response.text, tags=[], strip=True)
-                # Remove extra whitespace
-                text = ' '.join(text.split())
-                if text and len(text.strip()) > 100:
-                    await self.rate_limiter.record_success(url)
-                    return text[:4000]
+                return text
         except Exception as e:
-            print(f"Fallback extraction failed for {url}: {e}")
+            print(f"Extraction failed for {url}: {e}")
 
         await self.rate_limiter.record_failure(url)
         print(f"All extraction methods failed for {url}")
         return None
 
+    async def extract_articles(self, articles: List[Dict], target: int, exclude=()) -> List[Tuple[Dict, str]]:
+        """Extract articles concurrently, stopping once ``target`` succeed.
+
+        Returns (article, text) pairs in input order. Extractions still in
+        flight when the target is reached are cancelled.
+        """
+        tasks = {}
+        seen = set(exclude)
+        for index, article in enumerate(articles):
+            if article["link"] in seen:
+                continue
+            seen.add(article["link"])
+            task = asyncio.ensure_future(self.extract_article_text(article["link"]))
+            tasks[task] = (index, article)
+
+        extracted = []
+        pending = set(tasks)
+        try:
+            while pending and len(extracted) < target:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, article = tasks[task]
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        print(f"Extraction failed for {article['link']}: {e}")
+                        continue
+                    if text:
+                        extracted.append((index, article, text))
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        extracted.sort(key=lambda item: item[0])
+        return [(article, text) for _, article, text in extracted[:target]]
+
     async def generate_research(self, topic):
-        """Generate research content from multiple sources"""
+        """Research content for a topic, read through the research cache.
+
+        Unexpired cached research is returned without searching or calling
+        GPT-4; entries older than RESEARCH_REFRESH_AFTER are still returned
+        but regenerated in the background. Concurrent requests for the same
+        topic share one generation.
+        """
+        key = normalize_topic(topic)
+        try:
+            cached = await self.storage.get_research(key)
+        except Exception as e:
+            print(f"Research cache lookup failed: {e}")
+            cached = None
+
+        if cached and cached.get('content'):
+            self.research_cache_hits += 1
+            print(f"Using cached research for: {topic}")
+            if self._research_is_stale(cached) and key not in self._research_tasks:
+                print(f"Refreshing cached research in the background for: {topic}")
+                self.research_refreshes += 1
+                self._research_task(key, topic)
+            return cached['content'], []
+
+        # Shielded so one caller giving up does not cancel the shared generation
+        return await asyncio.shield(self._research_task(key, topic))
+
+    def _research_is_stale(self, cached: Dict) -> bool:
+        created_at = parse_timestamp(cached.get('created_at'))
+        if created_at is None:
+            return True
+        return datetime.now(timezone.utc) - created_at > RESEARCH_REFRESH_AFTER
+
+    def _research_task(self, key: str, topic) -> asyncio.Task:
+        """The in-flight generation for a topic, starting one if there is none"""
+        task = self._research_tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._generate_research(key, topic))
+            self._research_tasks[key] = task
+
+            def forget(done: asyncio.Task) -> None:
+                if self._research_tasks.get(key) is done:
+                    del self._research_tasks[key]
+
+            task.add_done_callback(forget)
+        return task
+
+    async def _generate_research(self, key: str, topic):
+        """Generate research content from multiple sources and cache it under key"""
         try:
             # First try with only new articles
             print(f"Searching for articles about: {topic}")
-            google_articles = self.search_google(topic)
+            google_articles = await self.search_google(topic)
             rss_articles = await self.fetch_rss_articles(allow_recent=False)
             
             all_articles = google_articles + rss_articles
@@ -254,31 +330,25 @@ class ResearchManager:
 
             # Extract and combine content
             print("Extracting content from articles...")
+            extracted = await self.extract_articles(all_articles, target=self.extraction_target)
+
+            # Ensure we have at least 2 successful extractions
+            if len(extracted) < 2:
+                print("Insufficient article extractions, trying with recent articles")
+                more_articles = await self.fetch_rss_articles(allow_recent=True)
+                extracted += await self.extract_articles(
+                    more_articles,
+                    target=2 - len(extracted),
+                    exclude=[article["link"] for article, _ in extracted]
+                )
+
             combined_text = ""
             new_urls = []
-            successful_extractions = 0
-
-            for article in all_articles:
+            for article, text in extracted:
                 print(f"Processing article: {article['title']}")
-                text = await self.extract_article_text(article["link"])
-                if text:
-                    combined_text += f"\n\nArticle: {article['title']}\n{text[:2000]}"
-                    new_urls.append(article["link"])
-                    successful_extractions += 1
-                
-                # Ensure we have at least 2 successful extractions
-                if successful_extractions < 2 and article == all_articles[-1]:
-                    print("Insufficient article extractions, trying with recent articles")
-                    more_articles = await self.fetch_rss_articles(allow_recent=True)
-                    for more_article in more_articles:
-                        if more_article["link"] not in new_urls:
-                            text = await self.extract_article_text(more_article["link"])
-                            if text:
-                                combined_text += f"\n\nArticle: {more_article['title']}\n{text[:2000]}"
-                                new_urls.append(more_article["link"])
-                                successful_extractions += 1
-                                if successful_extractions >= 2:
-                                    break
+                combined_text += f"\n\nArticle: {article['title']}\n{text[:2000]}"
+                new_urls.append(article["link"])
+            successful_extractions = len(extracted)
 
             if not combined_text:
                 print("No content could be extracted from articles")
@@ -393,11 +463,14 @@ class ResearchManager:
 
             # Store research in database
             await self.storage.store_research(
-                topic=topic,
+                topic=key,
                 content=research_text,
-                expires_at=(datetime.now() + timedelta(days=7)).isoformat()
+                expires_at=(datetime.now(timezone.utc) + RESEARCH_TTL).isoformat()
             )
 
+            # Articles used here are not picked again while new ones exist
+            get_url_index().add_many(new_urls)
+
             # Store interaction record
             await self.storage.store_interaction({
                 'tweet_id': f'research_{int(datetime.now().timestamp())}',
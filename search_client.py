@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from http_client import RetryPolicy, get_http_client
+from news_config import RATE_LIMITS, CONTENT_AGE_LIMITS
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+# Cached result sets kept for reuse and quota fallback
+MAX_CACHED_QUERIES = 200
+
+# Google bills every HTTP attempt, so a search is sent once and counted once
+SEARCH_RETRY = RetryPolicy(attempts=1)
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: case and whitespace insensitive"""
+    return ' '.join(query.lower().split())
+
+
+class SearchClient:
+    """Google Custom Search client with a persisted daily quota and result cache.
+
+    Requests are counted against RATE_LIMITS["google_search"] (requests per
+    day and minimum interval) in a local state file. Each search is a
+    single HTTP attempt, never retried, so the count matches what Google
+    bills. The state file survives process restarts but not a Heroku dyno
+    restart: the dyno filesystem is ephemeral, so the count and cache start
+    over after each deploy or daily cycle. Results are cached per
+    normalized query for cache_ttl seconds, identical concurrent queries
+    share one request, and once the quota is spent searches are answered
+    from the cache, stale or not.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, engine_id: Optional[str] = None,
+                 state_file: str = "search_state.json",
+                 daily_limit: int = RATE_LIMITS["google_search"]["requests_per_day"],
+                 min_interval: float = RATE_LIMITS["google_search"]["minimum_interval"],
+                 cache_ttl: float = CONTENT_AGE_LIMITS["news"] * 3600):
+        self.api_key = api_key if api_key is not None else os.getenv("GOOGLE_API_KEY")
+        self.engine_id = engine_id if engine_id is not None else os.getenv("SEARCH_ENGINE_ID")
+        self.state_file = state_file
+        self.daily_limit = daily_limit
+        self.min_interval = min_interval
+        self.cache_ttl = cache_ttl
+        self.state = self._load()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.cache_hits = 0
+        self.quota_fallbacks = 0
+
+    def _load(self) -> Dict:
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    state = json.load(f)
+                state.setdefault('quota', {})
+                state.setdefault('results', {})
+                return state
+        except Exception as e:
+            logger.error(f"Error loading search state: {e}")
+        return {'quota': {}, 'results': {}}
+
+    def _save(self) -> None:
+        try:
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.error(f"Error saving search state: {e}")
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.engine_id)
+
+    def _quota(self, now: float) -> Dict:
+        """Today's quota counter, reset when the UTC day changes"""
+        today = datetime.fromtimestamp(now, timezone.utc).date().isoformat()
+        quota = self.state['quota']
+        if quota.get('date') != today:
+            quota.update({'date': today, 'count': 0})
+        return quota
+
+    def remaining(self) -> int:
+        """Searches left today"""
+        return max(0, self.daily_limit - self._quota(time.time())['count'])
+
+    def _can_request(self, now: float) -> bool:
+        quota = self._quota(now)
+        if quota['count'] >= self.daily_limit:
+            return False
+        return now - quota.get('last_request_at', 0) >= self.min_interval
+
+    def _cached(self, key: str, allow_stale: bool = False) -> Optional[List[Dict]]:
+        entry = self.state['results'].get(key)
+        if not entry:
+            return None
+        if allow_stale or time.time() - entry['fetched_at'] < self.cache_ttl:
+            return entry['items']
+        return None
+
+    def _store(self, key: str, items: List[Dict]) -> None:
+        results = self.state['results']
+        results.pop(key, None)
+        results[key] = {'items': items, 'fetched_at': time.time()}
+        while len(results) > MAX_CACHED_QUERIES:
+            results.pop(next(iter(results)))
+
+    async def search(self, query: str) -> List[Dict]:
+        """Search results (title and link per item) for a query"""
+        key = normalize_query(query)
+        cached = self._cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        now = time.time()
+        if not self.configured or not self._can_request(now):
+            # Out of quota or too soon since the last request: degrade to whatever we have
+            self.quota_fallbacks += 1
+            stale = self._cached(key, allow_stale=True)
+            logger.info(f"Search quota unavailable ({self.remaining()} left today), "
+                        f"{'using cached' if stale else 'no cached'} results for: {query}")
+            return stale or []
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            items = await self._request(query, now)
+            future.set_result(items)
+            return items
+        except Exception as e:
+            future.set_exception(e)
+            # Consume the exception if nobody else awaited the shared future
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _request(self, query: str, now: float) -> List[Dict]:
+        key = normalize_query(query)
+        quota = self._quota(now)
+        quota['count'] += 1
+        quota['last_request_at'] = now
+        self._save()
+        response = await get_http_client().get(
+            SEARCH_URL, params={'q': query, 'key': self.api_key, 'cx': self.engine_id},
+            retry=SEARCH_RETRY
+        )
+        response.raise_for_status()
+        items = [
+            {'title': item.get('title'), 'link': item.get('link')}
+            for item in response.json().get('items', [])
+            if item.get('link')
+        ]
+        self._store(key, items)
+        self._save()
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requests_today': self._quota(time.time())['count'],
+            'remaining_today': self.remaining(),
+            'cached_queries': len(self.state['results']),
+            'cache_hits': self.cache_hits,
+            'quota_fallbacks': self.quota_fallbacks
+        }
+
+
+_client: Optional[SearchClient] = None
+
+def get_search_client() -> SearchClient:
+    """Process-wide search client"""
+    global _client
+    if _client is None:
+        _client = SearchClient()
+    return _client
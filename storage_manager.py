@@ -1,45 +1,317 @@
 import os
 import json
 import time
+import heapq
+import atexit
+import weakref
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple, Callable, Deque
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from dateutil.parser import isoparse
+import httpx
+from supabase import create_client, Client, AsyncClient, AsyncClientOptions
+from url_index import get_url_index
+from local_store import LocalStore, UPSERT_KEYS
 
 # Load environment variables
 load_dotenv()
 
+# Entry limits per key namespace (the prefix before the first "_"); others get max_size
+NAMESPACE_CAPACITY = {
+    'interaction': 1000,
+    'research': 200
+}
+
+def cache_namespace(key: str) -> str:
+    return key.split('_', 1)[0]
+
 class MemoryCache:
-    def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, Dict] = {}
+    """LRU cache with per-entry TTL, partitioned by key namespace.
+
+    Each namespace ("interaction_*", "research_*", ...) is an OrderedDict in
+    recency order with its own capacity, so a burst of interactions cannot
+    push research out. Expiry times sit in a min-heap and expired entries
+    are dropped on every write, not only when their key is read. All
+    operations are O(1) or O(log n) and guarded by a lock, so one cache can
+    be shared by every task and worker thread in the agent.
+    """
+
+    def __init__(self, max_size: int = 1000, capacities: Optional[Dict[str, int]] = None):
         self.max_size = max_size
+        self.capacities = NAMESPACE_CAPACITY if capacities is None else capacities
+        self.cache: Dict[str, "OrderedDict[str, Tuple[Any, float]]"] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0
+        })
+
+    def _entries(self, namespace: str) -> "OrderedDict[str, Tuple[Any, float]]":
+        if namespace not in self.cache:
+            self.cache[namespace] = OrderedDict()
+        return self.cache[namespace]
+
+    def _expire(self, now: float) -> None:
+        """Drop entries whose TTL has passed, skipping heap items superseded by a later set"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, key = heapq.heappop(self._expiry)
+            namespace = cache_namespace(key)
+            entries = self.cache.get(namespace)
+            if entries is not None and key in entries and entries[key][1] == expires:
+                del entries[key]
+                self.counters[namespace]['expirations'] += 1
+        if len(self._expiry) > 2 * len(self) + 64:
+            # Overwritten and evicted keys leave stale heap items behind
+            self._expiry = [(expires, key) for entries in self.cache.values() for key, (_, expires) in entries.items()]
+            heapq.heapify(self._expiry)
 
     def set(self, key: str, value: Any, ttl: int = 3600) -> None:
         """Set a value in the cache with TTL in seconds"""
-        if len(self.cache) >= self.max_size:
-            # Remove oldest entries
-            oldest = sorted(self.cache.items(), key=lambda x: x[1]['timestamp'])[:-900]
-            for k, _ in oldest:
-                del self.cache[k]
-
-        self.cache[key] = {
-            'value': value,
-            'timestamp': time.time(),
-            'expires': time.time() + ttl
-        }
+        now = time.time()
+        namespace = cache_namespace(key)
+        with self._lock:
+            self._expire(now)
+            entries = self._entries(namespace)
+            entries.pop(key, None)
+            expires = now + ttl
+            entries[key] = (value, expires)
+            heapq.heappush(self._expiry, (expires, key))
+            capacity = self.capacities.get(namespace, self.max_size)
+            while len(entries) > capacity:
+                entries.popitem(last=False)
+                self.counters[namespace]['evictions'] += 1
 
     def get(self, key: str) -> Optional[Any]:
-        """Get a value from the cache"""
-        if key in self.cache:
-            data = self.cache[key]
-            if data['expires'] > time.time():
-                return data['value']
-            del self.cache[key]
+        """Get a value from the cache, marking it most recently used"""
+        namespace = cache_namespace(key)
+        with self._lock:
+            entries = self.cache.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None:
+                self.counters[namespace]['misses'] += 1
+                return None
+            value, expires = entry
+            if expires <= time.time():
+                del entries[key]
+                self.counters[namespace]['expirations'] += 1
+                self.counters[namespace]['misses'] += 1
+                return None
+            entries.move_to_end(key)
+            self.counters[namespace]['hits'] += 1
+            return value
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.cache.values())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size, capacity, hit rate and eviction counters per namespace"""
+        with self._lock:
+            report = {}
+            for namespace in set(self.cache) | set(self.counters):
+                counters = self.counters[namespace]
+                lookups = counters['hits'] + counters['misses']
+                report[namespace] = {
+                    'size': len(self.cache.get(namespace, ())),
+                    'capacity': self.capacities.get(namespace, self.max_size),
+                    **counters,
+                    'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0
+                }
+            return report
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Timezone-aware datetime from an ISO string; naive values are taken as local time"""
+    if not value:
         return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            # Postgres trims trailing zeros from the fraction, which fromisoformat rejects before 3.11
+            parsed = isoparse(str(value))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+def research_expired(data: Dict, now: Optional[datetime] = None) -> bool:
+    """True once a research_cache row is past its expires_at; rows without one never expire"""
+    expires_at = parse_timestamp(data.get('expires_at'))
+    if expires_at is None:
+        return False
+    return expires_at <= (now or datetime.now(timezone.utc))
+
+# Records the JSON fallback keeps per log
+INTERACTIONS_RETAIN = 1000
+RESEARCH_RETAIN = 500
+# A log is compacted once it holds this many times its retained records
+COMPACT_FACTOR = 2
+# fsync after this many appended records or seconds, whichever comes first
+FSYNC_BATCH = 20
+FSYNC_INTERVAL = 5.0
+
+# Open logs, synced together at shutdown
+_logs: "weakref.WeakSet[JSONLLog]" = weakref.WeakSet()
+
+def sync_all() -> None:
+    """fsync every open JSONL log"""
+    for log in list(_logs):
+        log.sync()
+
+atexit.register(sync_all)
+
+
+class JSONLLog:
+    """Append-only JSON Lines file with batched fsync and an in-memory tail.
+
+    append() writes one line, so an insert costs the same however large the
+    file is. Lines are flushed to the OS immediately and fsynced every
+    FSYNC_BATCH records or FSYNC_INTERVAL seconds. The newest ``retain``
+    records are kept in memory for reads. Once the file holds
+    COMPACT_FACTOR times that many lines, a background thread rewrites it
+    to the retained records that still pass ``keep``.
+    """
+
+    def __init__(self, path: str, retain: int, legacy_file: Optional[str] = None,
+                 keep: Optional[Callable[[Dict], bool]] = None):
+        self.path = path
+        self.retain = retain
+        self.keep = keep
+        self.tail: Deque[Dict] = deque(maxlen=retain)
+        self.lines = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compacting = False
+        # Records appended while a compaction rewrites the file, copied over when it finishes
+        self._compaction_appends: Optional[List[Dict]] = None
+        self._lock = threading.Lock()
+        if legacy_file and not os.path.exists(path):
+            self._migrate(legacy_file)
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        _logs.add(self)
+
+    def _migrate(self, legacy_file: str) -> None:
+        """One-time import of a JSON array file written by earlier versions"""
+        try:
+            if os.path.exists(legacy_file):
+                with open(legacy_file, 'r') as f:
+                    records = json.load(f)
+                self._write(self.path, records[-self.retain:] if isinstance(records, list) else [])
+        except Exception as e:
+            print(f"Error migrating {legacy_file} to {self.path}: {e}")
+
+    def _load(self) -> None:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        self.lines += 1
+                        try:
+                            self.tail.append(json.loads(line))
+                        except ValueError:
+                            # A partial last line from an interrupted write
+                            continue
+        except Exception as e:
+            print(f"Error loading JSONL file {self.path}: {e}")
+
+    def _write(self, path: str, records: List[Dict]) -> None:
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    def append(self, record: Dict) -> None:
+        try:
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock:
+                self._file.write(line)
+                self._file.flush()
+                self.tail.append(record)
+                self.lines += 1
+                self._unsynced += 1
+                if self._compaction_appends is not None:
+                    self._compaction_appends.append(record)
+                if self._unsynced >= FSYNC_BATCH or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+                    self._sync()
+                compact = not self._compacting and self.lines >= COMPACT_FACTOR * self.retain
+                if compact:
+                    self._compacting = True
+        except Exception as e:
+            print(f"Error appending to JSONL file {self.path}: {e}")
+            return
+        if compact:
+            threading.Thread(target=self.compact, name=f"compact-{self.path}", daemon=True).start()
+
+    def _sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        try:
+            with self._lock:
+                self._sync()
+        except Exception as e:
+            print(f"Error syncing JSONL file {self.path}: {e}")
+
+    def recent(self, limit: int) -> List[Dict]:
+        """The newest limit records, oldest first"""
+        with self._lock:
+            return list(self.tail)[-limit:] if limit > 0 else []
+
+    def find_last(self, match: Callable[[Dict], bool]) -> Optional[Dict]:
+        """Newest retained record for which match is true"""
+        with self._lock:
+            records = list(self.tail)
+        for record in reversed(records):
+            if match(record):
+                return record
+        return None
+
+    def compact(self) -> None:
+        """Rewrite the file to the retained records, dropping those keep rejects"""
+        try:
+            with self._lock:
+                records = list(self.tail)
+                self._compaction_appends = []
+            if self.keep is not None:
+                records = [record for record in records if self.keep(record)]
+            # Written outside the lock; appends made meanwhile are copied over below
+            tmp_path = self.path + '.compact'
+            self._write(tmp_path, records)
+            with self._lock:
+                missed, self._compaction_appends = self._compaction_appends, None
+                with open(tmp_path, 'a', encoding='utf-8') as f:
+                    for record in missed:
+                        f.write(json.dumps(record, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._file.close()
+                os.replace(tmp_path, self.path)
+                self._file = open(self.path, 'a', encoding='utf-8')
+                self.lines = len(records) + len(missed)
+                self._unsynced = 0
+                if self.keep is not None:
+                    self.tail = deque((record for record in self.tail if self.keep(record)), maxlen=self.retain)
+        except Exception as e:
+            print(f"Error compacting JSONL file {self.path}: {e}")
+        finally:
+            with self._lock:
+                self._compaction_appends = None
+            self._compacting = False
+
+
 class JSONStorageHandler:
     def __init__(self):
-        self.interactions_file = "interactions.json"
-        self.research_file = "research_cache.json"
+        self.interactions = JSONLLog("interactions.jsonl", INTERACTIONS_RETAIN, legacy_file="interactions.json")
+        self.research = JSONLLog("research_cache.jsonl", RESEARCH_RETAIN, legacy_file="research_cache.json",
+                                 keep=lambda data: not research_expired(data))
         self.update_times_file = "update_times.json"
 
     def _load_json(self, filename: str, default: Any) -> Any:
@@ -56,34 +328,34 @@ class JSONStorageHandler:
     def _save_json(self, filename: str, data: Any) -> None:
         """Save data to a JSON file"""
         try:
-            with open(filename, 'w') as f:
+            tmp_file = filename + '.tmp'
+            with open(tmp_file, 'w') as f:
                 json.dump(data, f, indent=2)
+            os.replace(tmp_file, filename)
         except Exception as e:
             print(f"Error saving JSON file {filename}: {e}")
 
     async def store_interaction(self, data: Dict) -> None:
-        """Store an interaction in JSON file"""
-        interactions = self._load_json(self.interactions_file, [])
-        interactions.append({
+        """Append an interaction to the interactions log"""
+        self.interactions.append({
             **data,
             'stored_at': datetime.now().isoformat()
         })
-        # Keep last 1000 interactions
-        self._save_json(self.interactions_file, interactions[-1000:])
 
     async def get_recent_interactions(self, limit: int = 10) -> List[Dict]:
-        """Get recent interactions from JSON file"""
-        interactions = self._load_json(self.interactions_file, [])
-        return interactions[-limit:]
+        """Get recent interactions from the in-memory tail of the log"""
+        return self.interactions.recent(limit)
 
     async def store_research(self, data: Dict) -> None:
-        """Store research data in JSON file"""
-        research = self._load_json(self.research_file, [])
-        research.append({
+        """Append research data to the research log"""
+        self.research.append({
             **data,
             'stored_at': datetime.now().isoformat()
         })
-        self._save_json(self.research_file, research)
+
+    async def get_research(self, topic: str) -> Optional[Dict]:
+        """Get the newest research stored for a topic"""
+        return self.research.find_last(lambda data: data.get('topic') == topic)
 
     async def store_update_time(self, update_type: str, timestamp: datetime) -> None:
         """Store last update time for a specific type"""
@@ -101,7 +373,60 @@ SQL_DEBUG = os.getenv('SQL_DEBUG', 'false').lower() == 'true'
 # Only log timing for operations slower than this threshold (in seconds)
 SLOW_QUERY_THRESHOLD = 0.5
 
+# Connection pool for the async Supabase client
+SUPABASE_MAX_CONNECTIONS = 10
+SUPABASE_TIMEOUT = 10.0
+KEEPALIVE_EXPIRY = 60  # seconds an idle connection stays warm
+
+# Seconds between attempts to replay offline writes to Supabase
+SYNC_RETRY_INTERVAL = 30
+# Rejected replays of one offline write before it is dropped
+SYNC_MAX_ATTEMPTS = 5
+
+# Interaction rows are buffered and written with one insert per table
+WRITE_BATCH_SIZE = 50       # rows waiting before a flush starts
+WRITE_FLUSH_INTERVAL = 5.0  # seconds the oldest buffered row waits at most
+WRITE_BUFFER_LIMIT = 500    # buffered plus in-flight rows before the rest spill to the local database
+
+# Live managers, whose buffered rows are spilled to the local database at exit
+_managers: "weakref.WeakSet[StorageManager]" = weakref.WeakSet()
+
+def spill_all() -> None:
+    """Keep every live manager's unwritten interaction rows on disk"""
+    for manager in list(_managers):
+        manager.spill_writes()
+
+atexit.register(spill_all)
+
+def _remote_id(response) -> Optional[int]:
+    """Id Supabase assigned to the first row of an insert"""
+    data = getattr(response, 'data', None)
+    return data[0].get('id') if data else None
+
 class StorageManager:
+    """Memory cache, Supabase, local SQLite and JSON fallback behind one async interface.
+
+    Queries go through supabase's async client over a pooled httpx
+    connection, so the event loop keeps running while a request is on the
+    network. The synchronous ``supabase`` client is kept for blocking
+    callers such as RateLimitManager's startup load and exit flush.
+
+    Every write is also kept in a local SQLite copy of the schema
+    (local_store.LocalStore). When Supabase is unreachable, writes go there
+    with an outbox entry and reads are answered from it, and the outbox is
+    replayed in order once Supabase answers again. A connection failure or
+    timeout marks the manager offline: until a background replay gets
+    through, every call is served by the local database without touching
+    the network. The JSON files are only used when the local database
+    cannot be opened.
+
+    Interaction rows (store_interaction, record_interaction and
+    record_failed_interaction) are written behind: they are buffered and
+    inserted in one request per table once WRITE_BATCH_SIZE rows are
+    waiting, after WRITE_FLUSH_INTERVAL seconds, or on flush_writes().
+    Lookups include rows that are still buffered.
+    """
+
     def __init__(self):
         # Configure SQL logging
         self.logger = logging.getLogger(__name__)
@@ -116,6 +441,8 @@ class StorageManager:
         try:
             self.logger.info("\n🗄️ INITIALIZING DATABASE CONNECTION")
             self.supabase: Client = create_client(supabase_url, supabase_key)
+            self.supabase_url = supabase_url
+            self.supabase_key = supabase_key
             self.json_fallback = JSONStorageHandler()
             self.memory_cache = MemoryCache()
             self.logger.info("✅ Database connection established")
@@ -125,6 +452,73 @@ class StorageManager:
             self.json_fallback = JSONStorageHandler()
             self.memory_cache = MemoryCache()
             self.logger.info("⚠️ Falling back to JSON storage")
+        try:
+            self.local: Optional[LocalStore] = LocalStore()
+            if self.local.pending:
+                self.logger.info(f"📤 {self.local.pending} offline writes waiting to sync")
+        except Exception as e:
+            self.logger.error(f"❌ Local database unavailable: {e}")
+            self.local = None
+        self._async_client: Optional[AsyncClient] = None
+        self._loop = None
+        # Serializes the read-then-insert scheduling in queue_article
+        self._queue_lock = asyncio.Lock()
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._last_sync_attempt = 0.0
+        # Set when Supabase stops answering, cleared by a successful replay
+        self.offline = False
+        self._buffer: Dict[str, List[Dict]] = {'interactions': [], 'tweet_interactions': []}
+        self._in_flight: Dict[str, List[Dict]] = {'interactions': [], 'tweet_interactions': []}
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        _managers.add(self)
+
+    def _db(self) -> Optional[AsyncClient]:
+        """Async Supabase client for a query, or None while offline"""
+        client = self._client()
+        if client is None:
+            return None
+        self._schedule_sync()
+        if self.offline:
+            return None
+        return client
+
+    def _client(self) -> Optional[AsyncClient]:
+        """Async Supabase client bound to the running event loop, created on first use"""
+        if not self.supabase:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._loop is not loop:
+            # Pooled connections cannot cross event loops
+            pool = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY
+                ),
+                timeout=SUPABASE_TIMEOUT,
+                follow_redirects=True
+            )
+            self._async_client = AsyncClient(
+                self.supabase_url,
+                self.supabase_key,
+                AsyncClientOptions(httpx_client=pool, postgrest_client_timeout=SUPABASE_TIMEOUT)
+            )
+            self._loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Finish buffered and in-flight writes, then close the async client's pooled connections"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        await self.flush_writes()
+        # Batches still being inserted must land or spill before the pool goes away
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._async_client is not None:
+            await self._async_client.options.httpx_client.aclose()
+            self._async_client = None
 
     def _log_query(self, operation: str, table: str, details: str = None):
         """Log database operations with consistent formatting"""
@@ -133,43 +527,223 @@ class StorageManager:
         if details:
             self.logger.info(f"📝 Details: {details}")
 
-    async def store_interaction(self, data: Dict) -> None:
-        """Store an interaction with fallback handling"""
+    def _local(self, operation: str, *args, **kwargs) -> Any:
+        """Run a LocalStore operation; a local failure is logged and returns None"""
+        if not self.local:
+            return None
         try:
-            # Try memory cache first
-            cache_key = f"interaction_{data.get('tweet_id')}"
-            self.memory_cache.set(cache_key, data)
-            
-            # Try Supabase if available
-            if self.supabase:
-                response = self.supabase.table('interactions').insert(data).execute()
+            return getattr(self.local, operation)(*args, **kwargs)
+        except Exception as e:
+            print(f"Local database {operation} failed: {e}")
+            return None
+
+    def _connection_failed(self, error: Exception) -> None:
+        """Go offline when Supabase cannot be reached or times out, so later calls skip it"""
+        if isinstance(error, httpx.TransportError) and self.local and not self.offline:
+            self.offline = True
+            # The next replay attempt doubles as the probe for Supabase coming back
+            self._last_sync_attempt = time.monotonic()
+            self.logger.warning(f"⚠️ Supabase unreachable, serving from the local database: {error}")
+
+    def _schedule_sync(self) -> None:
+        """Replay offline writes in the background, at most every SYNC_RETRY_INTERVAL seconds"""
+        if not self.local or not (self.local.pending or self.offline) or self._sync_lock.locked():
+            return
+        if time.monotonic() - self._last_sync_attempt < SYNC_RETRY_INTERVAL:
+            return
+        self._last_sync_attempt = time.monotonic()
+        self._sync_task = asyncio.get_running_loop().create_task(self.sync_pending())
+
+    async def sync_pending(self) -> int:
+        """Replay the outbox to Supabase in order, stopping while Supabase is unreachable"""
+        async with self._sync_lock:
+            return await self._replay()
+
+    async def _replay(self) -> int:
+        db = self._client()
+        if not db or not self.local:
+            return 0
+        synced = 0
+        entries = self.local.outbox()
+        if not entries and self.offline:
+            try:
+                await db.table('update_times').select('type').limit(1).execute()
+            except httpx.TransportError as e:
+                print(f"Supabase still unreachable: {e}")
+                return 0
+            except Exception:
+                # Supabase answered, if only with an error
+                pass
+        while entries:
+            for entry in entries:
+                table = entry['table_name']
+                payload = entry['payload']
+                remote_id = None
+                try:
+                    if entry['operation'] == 'insert':
+                        response = await db.table(table).insert(payload).execute()
+                        remote_id = _remote_id(response)
+                    elif entry['operation'] == 'update':
+                        target = self.local.resolve(table, entry['row_id'])
+                        if target is None:
+                            raise ValueError(f"{table} row {entry['row_id']} was never synced")
+                        await db.table(table).update(payload).eq('id', target).execute()
+                    else:
+                        await db.table(table).upsert(payload, on_conflict=UPSERT_KEYS[table]).execute()
+                except httpx.TransportError as e:
+                    self._connection_failed(e)
+                    print(f"Supabase still unreachable, {self.local.pending} offline writes pending: {e}")
+                    return synced
+                except Exception as e:
+                    # Rejected by Supabase: retry later, keeping order, until it is clearly not going through
+                    if self.local.failed(entry) < SYNC_MAX_ATTEMPTS:
+                        print(f"Error syncing offline {entry['operation']} on {table}: {e}")
+                        return synced
+                    print(f"Dropping offline {entry['operation']} on {table} after {SYNC_MAX_ATTEMPTS} attempts: {e}")
+                self.local.synced(entry, remote_id)
+                synced += 1
+            entries = self.local.outbox()
+        if synced:
+            self.logger.info(f"📤 Synced {synced} offline writes to Supabase")
+        if self.offline:
+            self.offline = False
+            self.logger.info("✅ Supabase reachable again")
+        return synced
+
+    async def _insert(self, table: str, data: Dict) -> bool:
+        """Insert a row into Supabase and the local copy; offline it is queued locally.
+
+        Returns False only when the row could be stored in neither.
+        """
+        try:
+            db = self._db()
+            if db:
+                response = await db.table(table).insert(data).execute()
                 if hasattr(response, 'data'):
-                    return
-                
+                    self._local('insert', table, data, remote_id=_remote_id(response))
+                    return True
         except Exception as e:
-            print(f"Supabase storage failed: {e}")
-        
-        # Fallback to JSON
-        await self.json_fallback.store_interaction(data)
+            self._connection_failed(e)
+            print(f"Supabase insert into {table} failed: {e}")
+        return self._local('insert', table, data, pending=True) is not None
 
-    async def get_recent_interactions(self, limit: int = 10) -> List[Dict]:
-        """Get recent interactions with fallback handling"""
+    def _background(self, coroutine) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _write_behind(self, table: str, data: Dict) -> None:
+        """Buffer a row for the next batched insert into table"""
+        buffer = self._buffer[table]
+        buffer.append(data)
+        held = sum(len(rows) for rows in self._buffer.values()) + sum(len(rows) for rows in self._in_flight.values())
+        if held >= WRITE_BUFFER_LIMIT:
+            # Flushes are not keeping up, so Supabase is slow or down: keep memory bounded
+            self.spill_writes()
+        elif len(buffer) >= WRITE_BATCH_SIZE:
+            self._background(self.flush_writes(table))
+        elif self._flush_timer is None or self._flush_timer.done():
+            self._flush_timer = self._background(self._flush_after(WRITE_FLUSH_INTERVAL))
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.flush_writes()
+
+    async def flush_writes(self, table: Optional[str] = None) -> None:
+        """Write buffered interaction rows now, with one insert per table"""
+        for name in [table] if table else list(self._buffer):
+            rows, self._buffer[name] = self._buffer[name], []
+            if rows:
+                await self._flush_rows(name, rows)
+
+    async def _flush_rows(self, table: str, rows: List[Dict]) -> None:
+        self._in_flight[table].extend(rows)
+        try:
+            try:
+                db = self._db()
+                if db:
+                    response = await db.table(table).insert(rows).execute()
+                    if hasattr(response, 'data'):
+                        returned = response.data or []
+                        ids = [row.get('id') for row in returned] if len(returned) == len(rows) else [None] * len(rows)
+                        for row, remote_id in zip(rows, ids):
+                            self._local('insert', table, row, remote_id=remote_id)
+                        return
+            except asyncio.CancelledError:
+                # Cancelled at shutdown: the rows may not have reached Supabase, so keep them on disk
+                self._spill(table, rows)
+                raise
+            except Exception as e:
+                self._connection_failed(e)
+                print(f"Supabase insert of {len(rows)} {table} rows failed: {e}")
+            self._spill(table, rows)
+        finally:
+            written = {id(row) for row in rows}
+            self._in_flight[table] = [row for row in self._in_flight[table] if id(row) not in written]
+
+    def _spill(self, table: str, rows: List[Dict]) -> None:
+        """Queue rows in the local database for a later sync, or the JSON log without one"""
+        lost = 0
+        for row in rows:
+            if self._local('insert', table, row, pending=True) is not None:
+                continue
+            if table == 'interactions':
+                self.json_fallback.interactions.append({**row, 'stored_at': datetime.now().isoformat()})
+            else:
+                lost += 1
+        if lost:
+            print(f"Could not store {lost} {table} rows")
+
+    def spill_writes(self) -> None:
+        """Move every buffered row to the local database without waiting for Supabase"""
+        for table in list(self._buffer):
+            rows, self._buffer[table] = self._buffer[table], []
+            if rows:
+                self._spill(table, rows)
+
+    def _with_buffered(self, table: str, rows: List[Dict], limit: int, interaction_type: str = None) -> List[Dict]:
+        """Stored rows with this manager's not yet written ones in front, newest first"""
+        unwritten = [
+            row for row in reversed(self._in_flight[table] + self._buffer[table])
+            if not interaction_type or row.get('interaction_type') == interaction_type
+        ]
+        return (unwritten + rows)[:limit] if unwritten else rows
+
+    async def store_interaction(self, data: Dict) -> None:
+        """Store an interaction with fallback handling"""
+        # Try memory cache first
+        cache_key = f"interaction_{data.get('tweet_id')}"
+        self.memory_cache.set(cache_key, data)
+
+        # Written with the next batch; spilled to the local database or JSON if Supabase is down
+        self._write_behind('interactions', data)
+
+    async def get_recent_query_interactions(self, limit: int = 10) -> List[Dict]:
+        """Get recent rows of the interactions table with fallback handling"""
         try:
             # Try Supabase if available
-            if self.supabase:
-                response = self.supabase.table('interactions')\
+            db = self._db()
+            if db:
+                response = await db.table('interactions')\
                     .select('*')\
                     .order('created_at', desc=True)\
                     .limit(limit)\
                     .execute()
                 if hasattr(response, 'data'):
-                    return response.data
+                    return self._with_buffered('interactions', response.data, limit)
                 
         except Exception as e:
+            self._connection_failed(e)
             print(f"Supabase query failed: {e}")
         
+        rows = self._local('select', 'interactions', order="created_at DESC", limit=limit)
+        if rows is not None:
+            return self._with_buffered('interactions', rows, limit)
+
         # Fallback to JSON
-        return await self.json_fallback.get_recent_interactions(limit)
+        rows = list(reversed(await self.json_fallback.get_recent_interactions(limit)))
+        return self._with_buffered('interactions', rows, limit)
 
     async def store_research(self, topic: str, content: str, expires_at: str) -> None:
         """Store research data with fallback handling"""
@@ -181,35 +755,29 @@ class StorageManager:
             'created_at': datetime.now(timezone.utc).isoformat()
         }
         
-        try:
-            # Cache in memory
-            cache_key = f"research_{topic}"
-            self.memory_cache.set(cache_key, data)
+        # Cache in memory
+        cache_key = f"research_{topic}"
+        self.memory_cache.set(cache_key, data)
             
-            # Store in Supabase if available
-            if self.supabase:
-                response = self.supabase.table('research_cache').insert(data).execute()
-                if hasattr(response, 'data'):
-                    return
-                
-        except Exception as e:
-            print(f"Supabase storage failed: {e}")
+        if await self._insert('research_cache', data):
+            return
         
         # Fallback to JSON
         await self.json_fallback.store_research(data)
 
     async def get_research(self, topic: str) -> Optional[Dict]:
-        """Get research data with fallback handling"""
+        """Get unexpired research data with fallback handling"""
         # Try memory cache first
         cache_key = f"research_{topic}"
         cached_data = self.memory_cache.get(cache_key)
-        if cached_data:
+        if cached_data and not research_expired(cached_data):
             return cached_data
 
         try:
             # Try Supabase if available
-            if self.supabase:
-                response = self.supabase.table('research_cache')\
+            db = self._db()
+            if db:
+                response = await db.table('research_cache')\
                     .select('*')\
                     .eq('topic', topic)\
                     .order('created_at', desc=True)\
@@ -217,13 +785,25 @@ class StorageManager:
                     .execute()
                 
                 if hasattr(response, 'data') and response.data:
+                    data = response.data[0]
+                    if research_expired(data):
+                        return None
                     # Update memory cache
-                    self.memory_cache.set(cache_key, response.data[0])
-                    return response.data[0]
+                    self.memory_cache.set(cache_key, data)
+                    return data
                     
         except Exception as e:
+            self._connection_failed(e)
             print(f"Supabase query failed: {e}")
         
+        rows = self._local('select', 'research_cache', "topic = ?", (topic,), order="created_at DESC", limit=1)
+        if rows:
+            return None if research_expired(rows[0]) else rows[0]
+
+        # Fallback to JSON, where research landed before the local database existed
+        data = await self.json_fallback.get_research(topic)
+        if data and not research_expired(data):
+            return data
         return None
 
     def format_timestamp(self, dt: datetime) -> str:
@@ -232,9 +812,15 @@ class StorageManager:
 
     async def queue_article(self, title: str, url: str, tweet_content: str, source_feed: str, is_weekly: bool = False) -> bool:
         """Queue an article for posting"""
+        # Scheduling reads the last queued slot before inserting, so one article at a time
+        async with self._queue_lock:
+            return await self._queue_article(title, url, tweet_content, source_feed, is_weekly)
+
+    async def _queue_article(self, title: str, url: str, tweet_content: str, source_feed: str, is_weekly: bool) -> bool:
         try:
-            if not self.supabase:
-                print("Supabase not available for article queuing")
+            posted = get_url_index()
+            if url in posted:
+                print(f"Article already queued or posted: {url}")
                 return False
 
             current_time = datetime.now(timezone.utc)
@@ -247,32 +833,43 @@ class StorageManager:
                 details="Fetching last scheduled article"
             )
             
-            last_article = self.supabase.table('article_queue')\
-                .select('scheduled_for')\
-                .eq('status', 'queued')\
-                .order('scheduled_for', desc=True)\
-                .limit(1)\
-                .execute()
+            # Supabase and the local copy (which also holds articles queued offline) both count
+            last_scheduled_times = [
+                row['scheduled_for'] for row in self._local(
+                    'select', 'article_queue', "status = 'queued'",
+                    order="scheduled_for DESC", limit=1, columns="id, remote_id, scheduled_for"
+                ) or []
+            ]
+            try:
+                db = self._db()
+                if db:
+                    last_article = await db.table('article_queue')\
+                        .select('scheduled_for')\
+                        .eq('status', 'queued')\
+                        .order('scheduled_for', desc=True)\
+                        .limit(1)\
+                        .execute()
+                    if hasattr(last_article, 'data') and last_article.data:
+                        last_scheduled_times.append(last_article.data[0]['scheduled_for'])
+            except Exception as e:
+                self._connection_failed(e)
+                print(f"Supabase query failed, scheduling from the local queue: {e}")
 
             # If there's already a queued article, schedule 50 minutes after it
-            if hasattr(last_article, 'data') and last_article.data:
-                try:
-                    # Handle both +00:00 and Z formats
-                    last_scheduled_str = last_article.data[0]['scheduled_for']
-                    if last_scheduled_str.endswith('+00:00'):
-                        last_scheduled_str = last_scheduled_str[:-6] + 'Z'
-                    last_scheduled = datetime.strptime(
-                        last_scheduled_str,
-                        '%Y-%m-%dT%H:%M:%S.%fZ'
-                    ).replace(tzinfo=timezone.utc)
-                    scheduled_for = max(
-                        last_scheduled + timedelta(minutes=50),
-                        scheduled_for
-                    )
-                    self.logger.info(f"📅 Scheduling for {scheduled_for.isoformat()}")
-                except Exception as e:
-                    self.logger.error(f"❌ Error parsing last scheduled time: {e}")
-                    self.logger.info("⚠️ Falling back to default scheduling")
+            last_scheduled = None
+            for value in filter(None, last_scheduled_times):
+                parsed = parse_timestamp(value)
+                if parsed is None:
+                    # The slot is taken even if unreadable, so keep the gap after now instead
+                    print(f"Could not parse scheduled_for {value!r}, spacing from the current time")
+                    parsed = current_time
+                last_scheduled = parsed if last_scheduled is None else max(last_scheduled, parsed)
+            if last_scheduled:
+                scheduled_for = max(
+                    last_scheduled + timedelta(minutes=50),
+                    scheduled_for
+                )
+                self.logger.info(f"📅 Scheduling for {scheduled_for.isoformat()}")
 
             # Queue the article
             data = {
@@ -285,8 +882,8 @@ class StorageManager:
                 'status': 'queued'
             }
             
-            response = self.supabase.table('article_queue').insert(data).execute()
-            if hasattr(response, 'data'):
+            if await self._insert('article_queue', data):
+                posted.add(url, posted_at=current_time.timestamp())
                 print(f"Article queued for {data['scheduled_for']}")
                 return True
 
@@ -297,47 +894,68 @@ class StorageManager:
 
     async def get_next_article(self) -> Optional[Dict]:
         """Get the next article that's ready to be posted"""
+        current_time = self.format_timestamp(datetime.now(timezone.utc))
         try:
-            if not self.supabase:
-                return None
+            db = self._db()
+            if db:
+                if self.local and self.local.pending:
+                    # Articles posted offline must reach Supabase before it can pick the next one
+                    await self.sync_pending()
+                    if self.local.pending:
+                        raise ConnectionError(f"{self.local.pending} offline writes not yet synced")
 
-            current_time = self.format_timestamp(datetime.now(timezone.utc))
+                # Get next scheduled article
+                response = await db.table('article_queue')\
+                    .select('*')\
+                    .eq('status', 'queued')\
+                    .lte('scheduled_for', current_time)\
+                    .order('scheduled_for')\
+                    .limit(1)\
+                    .execute()
             
-            # Get next scheduled article
-            response = self.supabase.table('article_queue')\
-                .select('*')\
-                .eq('status', 'queued')\
-                .lte('scheduled_for', current_time)\
-                .order('scheduled_for')\
-                .limit(1)\
-                .execute()
-
-            if hasattr(response, 'data') and response.data:
-                return response.data[0]
+                if hasattr(response, 'data'):
+                    self._local('mirror', 'article_queue', response.data)
+                    return response.data[0] if response.data else None
 
         except Exception as e:
+            self._connection_failed(e)
             print(f"Error getting next article: {e}")
         
-        return None
+        rows = self._local(
+            'select', 'article_queue', "status = 'queued' AND scheduled_for <= ?", (current_time,),
+            order="scheduled_for", limit=1
+        )
+        return rows[0] if rows else None
+
+    async def _update_article(self, article_id: int, data: Dict) -> bool:
+        """Update a queued article in Supabase and the local copy; offline the update is queued locally"""
+        try:
+            db = self._db()
+            if db and article_id > 0:
+                response = await db.table('article_queue')\
+                    .update(data)\
+                    .eq('id', article_id)\
+                    .execute()
+
+                if hasattr(response, 'data'):
+                    self._local('update', 'article_queue', article_id, data)
+                    return True
+
+        except Exception as e:
+            self._connection_failed(e)
+            print(f"Supabase update of article {article_id} failed: {e}")
+
+        # Negative ids are articles queued offline, updated once their insert has synced
+        return bool(self._local('update', 'article_queue', article_id, data, pending=True))
 
     async def mark_article_posted(self, article_id: int) -> bool:
         """Mark an article as posted"""
         try:
-            if not self.supabase:
-                return False
-
             data = {
                 'status': 'posted',
                 'posted_at': self.format_timestamp(datetime.now(timezone.utc))
             }
-            
-            response = self.supabase.table('article_queue')\
-                .update(data)\
-                .eq('id', article_id)\
-                .execute()
-                
-            if hasattr(response, 'data'):
-                return True
+            return await self._update_article(article_id, data)
 
         except Exception as e:
             print(f"Error marking article as posted: {e}")
@@ -347,21 +965,11 @@ class StorageManager:
     async def mark_article_failed(self, article_id: int, error_message: str) -> bool:
         """Mark an article as failed"""
         try:
-            if not self.supabase:
-                return False
-
             data = {
                 'status': 'failed',
                 'error_message': error_message
             }
-            
-            response = self.supabase.table('article_queue')\
-                .update(data)\
-                .eq('id', article_id)\
-                .execute()
-                
-            if hasattr(response, 'data'):
-                return True
+            return await self._update_article(article_id, data)
 
         except Exception as e:
             print(f"Error marking article as failed: {e}")
@@ -371,9 +979,6 @@ class StorageManager:
     async def record_interaction(self, tweet_id: str, interaction_type: str, content: str = None) -> bool:
         """Record a successful tweet interaction"""
         try:
-            if not self.supabase:
-                return False
-
             data = {
                 'tweet_id': tweet_id,
                 'interaction_type': interaction_type,
@@ -381,13 +986,8 @@ class StorageManager:
                 'success': True,
                 'created_at': self.format_timestamp(datetime.now(timezone.utc))
             }
-            
-            response = self.supabase.table('tweet_interactions')\
-                .insert(data)\
-                .execute()
-                
-            if hasattr(response, 'data'):
-                return True
+            self._write_behind('tweet_interactions', data)
+            return True
 
         except Exception as e:
             print(f"Error recording interaction: {e}")
@@ -397,9 +997,6 @@ class StorageManager:
     async def record_failed_interaction(self, tweet_id: str, interaction_type: str, error_message: str) -> bool:
         """Record a failed tweet interaction"""
         try:
-            if not self.supabase:
-                return False
-
             data = {
                 'tweet_id': tweet_id,
                 'interaction_type': interaction_type,
@@ -407,13 +1004,8 @@ class StorageManager:
                 'error_message': error_message,
                 'created_at': self.format_timestamp(datetime.now(timezone.utc))
             }
-            
-            response = self.supabase.table('tweet_interactions')\
-                .insert(data)\
-                .execute()
-                
-            if hasattr(response, 'data'):
-                return True
+            self._write_behind('tweet_interactions', data)
+            return True
 
         except Exception as e:
             print(f"Error recording failed interaction: {e}")
@@ -423,37 +1015,39 @@ class StorageManager:
     async def get_recent_interactions(self, interaction_type: str = None, limit: int = 100) -> List[Dict]:
         """Get recent tweet interactions"""
         try:
-            if not self.supabase:
-                return []
+            db = self._db()
+            if db:
+                query = db.table('tweet_interactions')\
+                    .select('*')\
+                    .order('created_at', desc=True)\
+                    .limit(limit)
 
-            query = self.supabase.table('tweet_interactions')\
-                .select('*')\
-                .order('created_at', desc=True)\
-                .limit(limit)
+                if interaction_type:
+                    query = query.eq('interaction_type', interaction_type)
                 
-            if interaction_type:
-                query = query.eq('interaction_type', interaction_type)
+                response = await query.execute()
                 
-            response = query.execute()
-            
-            if hasattr(response, 'data'):
-                return response.data
+                if hasattr(response, 'data'):
+                    return self._with_buffered('tweet_interactions', response.data, limit, interaction_type)
 
         except Exception as e:
+            self._connection_failed(e)
             print(f"Error getting recent interactions: {e}")
         
-        return []
+        where, params = ("interaction_type = ?", (interaction_type,)) if interaction_type else ("1", ())
+        rows = self._local('select', 'tweet_interactions', where, params, order="created_at DESC", limit=limit) or []
+        return self._with_buffered('tweet_interactions', rows, limit, interaction_type)
 
     async def store_update_time(self, update_type: str, timestamp: datetime) -> bool:
         """Store last update time for a specific type"""
+        data = {
+            'type': update_type,
+            'last_update': self.format_timestamp(timestamp),
+            'updated_at': self.format_timestamp(datetime.now(timezone.utc))
+        }
         try:
-            if self.supabase:
-                data = {
-                    'type': update_type,
-                    'last_update': self.format_timestamp(timestamp),
-                    'updated_at': self.format_timestamp(datetime.now(timezone.utc))
-                }
-                
+            db = self._db()
+            if db:
                 self._log_query(
                     operation="UPSERT",
                     table="update_times",
@@ -462,18 +1056,23 @@ class StorageManager:
                 
                 # Upsert the record
                 start_time = time.time()
-                response = self.supabase.table('update_times')\
+                response = await db.table('update_times')\
                     .upsert(data, on_conflict='type')\
                     .execute()
                 execution_time = time.time() - start_time
                     
                 if hasattr(response, 'data'):
                     self.logger.info(f"✅ Update time stored (took {execution_time:.2f}s)")
+                    self._local('upsert', 'update_times', data)
                     return True
                     
         except Exception as e:
+            self._connection_failed(e)
             self.logger.error(f"❌ Database error: {str(e)}")
-            self.logger.info("⚠️ Falling back to JSON storage")
+            self.logger.info("⚠️ Falling back to local storage")
+
+        if self._local('upsert', 'update_times', data, pending=True):
+            return True
             
         # Fallback to JSON storage
         await self.json_fallback.store_update_time(update_type, timestamp)
@@ -482,7 +1081,8 @@ class StorageManager:
     async def get_last_update_times(self) -> Dict[str, datetime]:
         """Get all stored update times"""
         try:
-            if self.supabase:
+            db = self._db()
+            if db:
                 self._log_query(
                     operation="SELECT",
                     table="update_times",
@@ -490,7 +1090,7 @@ class StorageManager:
                 )
                 
                 start_time = time.time()
-                response = self.supabase.table('update_times')\
+                response = await db.table('update_times')\
                     .select('type,last_update')\
                     .execute()
                 execution_time = time.time() - start_time
@@ -507,8 +1107,13 @@ class StorageManager:
                     return result
                     
         except Exception as e:
+            self._connection_failed(e)
             self.logger.error(f"❌ Database error: {str(e)}")
-            self.logger.info("⚠️ Falling back to JSON storage")
+            self.logger.info("⚠️ Falling back to local storage")
+
+        rows = self._local('select', 'update_times', columns="type, last_update")
+        if rows:
+            return {row['type']: parse_timestamp(row['last_update']) for row in rows}
             
         # Fallback to JSON storage
         return await self.json_fallback.get_update_times()
\ No newline at end of file
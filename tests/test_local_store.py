@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from local_store import LocalStore
+
+
+class LocalStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.store = LocalStore(os.path.join(self.workdir.name, 'local_store.db'))
+        self.addCleanup(self.store.close)
+
+    def article(self, url: str = 'https://news.example.com/a') -> dict:
+        return {
+            'title': 'A', 'url': url, 'tweet_content': 'text', 'source_feed': 'feed',
+            'is_weekly': False, 'scheduled_for': '2025-01-20T22:42:54.73+00:00', 'status': 'queued'
+        }
+
+    def test_offline_insert_is_queued_with_a_negative_id(self):
+        row_id = self.store.insert('article_queue', self.article(), pending=True)
+        self.assertLess(row_id, 0)
+        self.assertEqual(self.store.pending, 1)
+        [entry] = self.store.outbox()
+        self.assertEqual((entry['table_name'], entry['operation'], entry['row_id']), ('article_queue', 'insert', -row_id))
+        [row] = self.store.select('article_queue')
+        self.assertEqual(row['id'], row_id)
+        self.assertIs(row['is_weekly'], False)
+        self.assertEqual(row['scheduled_for'], '2025-01-20T22:42:54.730Z')
+
+    def test_synced_insert_remaps_the_negative_id(self):
+        row_id = self.store.insert('article_queue', self.article(), pending=True)
+        self.store.update('article_queue', row_id, {'status': 'posted'}, pending=True)
+        self.assertIsNone(self.store.resolve('article_queue', row_id))
+
+        insert, update = self.store.outbox()
+        self.store.synced(insert, remote_id=42)
+        self.assertEqual(self.store.resolve('article_queue', row_id), 42)
+        self.assertEqual(update['row_id'], row_id)
+        self.store.synced(update)
+
+        self.assertEqual(self.store.pending, 0)
+        [row] = self.store.select('article_queue')
+        self.assertEqual((row['id'], row['status']), (42, 'posted'))
+        # Later updates address the row by its Supabase id
+        self.assertTrue(self.store.update('article_queue', 42, {'status': 'failed'}))
+
+    def test_mirror_keeps_one_copy_per_remote_row(self):
+        remote = {**self.article(), 'id': 7}
+        self.store.insert('article_queue', remote, remote_id=7)
+        self.store.mirror('article_queue', [{**remote, 'status': 'posted'}])
+        [row] = self.store.select('article_queue')
+        self.assertEqual((row['id'], row['status']), (7, 'posted'))
+        self.assertEqual(self.store.pending, 0)
+
+    def test_failed_counts_attempts_and_pending_survives_reopen(self):
+        self.store.upsert('update_times', {'type': 'news', 'last_update': '2025-01-20T22:42:54Z'}, pending=True)
+        [entry] = self.store.outbox()
+        self.assertEqual(self.store.failed(entry), 1)
+        self.store.close()
+        reopened = LocalStore(self.store.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.pending, 1)
+        self.assertEqual(reopened.outbox()[0]['attempts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
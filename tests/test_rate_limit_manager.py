@@ -0,0 +1,122 @@
+import unittest
+from unittest import mock
+
+from rate_limit_manager import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+SETTINGS = {
+    "window_size": 10,
+    "window_seconds": 3600,
+    "min_requests": 3,
+    "error_rate": 0.5,
+    "base_backoff": 60,
+    "max_backoff": 300,
+    "probe_timeout": 30
+}
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        # No jitter, so backoffs are exact
+        patcher = mock.patch('rate_limit_manager.random.uniform', lambda low, high: high)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(SETTINGS)
+
+    def trip(self, now: float) -> None:
+        for offset in range(SETTINGS["min_requests"]):
+            self.breaker.record(False, now + offset)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_stays_closed_below_min_requests(self):
+        self.breaker.record(False, 0)
+        self.breaker.record(False, 1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow(2))
+
+    def test_stays_closed_below_error_rate(self):
+        for now, ok in enumerate([True, True, False, True, False]):
+            self.breaker.record(ok, now)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.error_rate(5), (0.4, 5))
+
+    def test_opens_at_error_rate(self):
+        self.trip(100)
+        self.assertEqual(self.breaker.open_count, 1)
+        self.assertEqual(self.breaker.open_until, 102 + 60)
+        self.assertFalse(self.breaker.allow(150))
+
+    def test_half_open_admits_one_probe(self):
+        self.trip(0)
+        self.assertTrue(self.breaker.allow(62))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow(70))
+        # An unanswered probe is retried after probe_timeout
+        self.assertTrue(self.breaker.allow(62 + 30))
+
+    def test_probe_success_closes(self):
+        self.trip(0)
+        self.breaker.allow(62)
+        self.breaker.record(True, 63)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.error_rate(63), (0.0, 0))
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+
+    def test_probe_failure_reopens_with_doubled_backoff(self):
+        self.trip(0)
+        self.breaker.allow(62)
+        self.breaker.record(False, 63)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.open_count, 2)
+        self.assertEqual(self.breaker.opened_for, 120)
+        self.assertEqual(self.breaker.open_until, 63 + 120)
+
+    def test_backoff_is_capped(self):
+        now = 0
+        self.trip(now)
+        for _ in range(5):
+            now = self.breaker.open_until
+            self.breaker.allow(now)
+            self.breaker.record(False, now)
+        self.assertEqual(self.breaker.open_count, 6)
+        self.assertEqual(self.breaker.opened_for, SETTINGS["max_backoff"])
+
+    def test_backoff_resets_after_a_healthy_window(self):
+        self.trip(0)
+        self.breaker.allow(62)
+        self.breaker.record(True, 63)
+        later = 63 + SETTINGS["window_seconds"] + 1
+        self.trip(later)
+        self.assertEqual(self.breaker.open_count, 1)
+        self.assertEqual(self.breaker.opened_for, 60)
+
+    def test_retrip_within_window_keeps_growing(self):
+        self.trip(0)
+        self.breaker.allow(62)
+        self.breaker.record(True, 63)
+        self.trip(100)
+        self.assertEqual(self.breaker.open_count, 2)
+        self.assertEqual(self.breaker.opened_for, 120)
+
+    def test_old_outcomes_leave_the_window(self):
+        self.breaker.record(False, 0)
+        self.breaker.record(False, 1)
+        self.breaker.record(False, SETTINGS["window_seconds"] + 10)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_restored_open_row(self):
+        row = {'circuit_state': OPEN, 'open_count': 3, 'consecutive_failures': 4}
+        breaker = CircuitBreaker.from_row(row, open_until=500, now=100)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.open_count, 3)
+        self.assertFalse(breaker.allow(200))
+        self.assertTrue(breaker.allow(500))
+
+    def test_restored_half_open_row_probes_at_once(self):
+        breaker = CircuitBreaker.from_row({'circuit_state': HALF_OPEN, 'open_count': 1}, open_until=500, now=100)
+        self.assertTrue(breaker.allow(100))
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
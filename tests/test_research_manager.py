@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import feedparser
+
+import research_manager
+from url_index import URLIndex
+
+FEED_URL = "https://feeds.example.com/health.xml"
+
+
+class RecordingStorage:
+    """Storage stand-in holding interactions-table rows, newest first"""
+
+    def __init__(self, interactions):
+        self.interactions = interactions
+
+    async def get_recent_query_interactions(self, limit: int = 10):
+        return self.interactions[:limit]
+
+
+class OpenLimiter:
+    async def can_access(self, url):
+        return True
+
+    async def record_success(self, url):
+        pass
+
+    async def record_failure(self, url):
+        pass
+
+
+class FetchRSSArticlesTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # ArticleExtractor and the search client keep state files in the working directory
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.TemporaryDirectory()
+        os.chdir(self.workdir.name)
+        self.index = URLIndex(os.path.join(self.workdir.name, "url_index.json"))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.workdir.cleanup()
+
+    def manager(self, interactions, entries):
+        feed = feedparser.FeedParserDict(entries=[feedparser.FeedParserDict(e) for e in entries])
+        snapshot = SimpleNamespace(feed=lambda url: feed)
+
+        async def take_snapshot(urls):
+            return snapshot
+
+        for name, value in (
+            ('get_url_index', lambda: self.index),
+            ('get_feed_service', lambda: SimpleNamespace(snapshot=take_snapshot)),
+        ):
+            patcher = mock.patch.object(research_manager, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        manager = research_manager.ResearchManager(
+            RecordingStorage(interactions), gen_ai=object(), rate_limiter=OpenLimiter()
+        )
+        manager.rss_feeds = [FEED_URL]
+        return manager
+
+    async def test_indexes_urls_from_interaction_metadata(self):
+        interactions = [
+            {'query_type': 'research', 'metadata': {'url': 'https://news.example.com/trial-results?utm_source=x'}},
+            {'query_type': 'research', 'metadata': {'urls': ['https://news.example.com/ai-matching/']}},
+            {'query_type': 'mention', 'metadata': None},
+        ]
+        manager = self.manager(interactions, [
+            {'title': 'Trial results', 'link': 'https://news.example.com/trial-results'},
+            {'title': 'AI matching', 'link': 'http://news.example.com/ai-matching'},
+            {'title': 'New cohort', 'link': 'https://news.example.com/new-cohort'},
+        ])
+
+        articles = await manager.fetch_rss_articles()
+
+        self.assertIn('https://news.example.com/trial-results', self.index)
+        self.assertIn('https://news.example.com/ai-matching', self.index)
+        self.assertEqual([a['link'] for a in articles], ['https://news.example.com/new-cohort'])
+
+
+if __name__ == '__main__':
+    unittest.main()
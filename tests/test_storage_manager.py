@@ -0,0 +1,310 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+
+import storage_manager
+from storage_manager import JSONLLog, MemoryCache, StorageManager, parse_timestamp, research_expired
+from url_index import URLIndex
+
+
+class ParseTimestampTest(unittest.TestCase):
+
+    def test_fractions_of_any_length(self):
+        # Postgres trims trailing zeros, so Supabase returns 1 to 6 fraction digits
+        for value, microsecond in (
+            ('2025-01-20T22:42:54.7+00:00', 700000),
+            ('2025-01-20T22:42:54.73+00:00', 730000),
+            ('2025-01-20T22:42:54.737+00:00', 737000),
+            ('2025-01-20T22:42:54.7371+00:00', 737100),
+            ('2025-01-20T22:42:54.73712+00:00', 737120),
+            ('2025-01-20T22:42:54.737123+00:00', 737123),
+        ):
+            with self.subTest(value=value):
+                parsed = parse_timestamp(value)
+                self.assertEqual(parsed, datetime(2025, 1, 20, 22, 42, 54, microsecond, tzinfo=timezone.utc))
+
+    def test_zulu_suffix_and_offsets(self):
+        self.assertEqual(
+            parse_timestamp('2025-01-20T22:42:54.73Z'),
+            datetime(2025, 1, 20, 22, 42, 54, 730000, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            parse_timestamp('2025-01-20T23:42:54.73+01:00'),
+            datetime(2025, 1, 20, 22, 42, 54, 730000, tzinfo=timezone.utc)
+        )
+
+    def test_naive_values_are_local_time(self):
+        parsed = parse_timestamp('2025-01-20T22:42:54.5')
+        self.assertIsNotNone(parsed.tzinfo)
+        self.assertEqual(parsed.replace(tzinfo=None), datetime(2025, 1, 20, 22, 42, 54, 500000))
+
+    def test_empty_and_invalid(self):
+        self.assertIsNone(parse_timestamp(None))
+        self.assertIsNone(parse_timestamp(''))
+        self.assertIsNone(parse_timestamp('not a timestamp'))
+
+    def test_research_expired_with_trimmed_fraction(self):
+        now = datetime(2025, 1, 20, 22, 42, 55, tzinfo=timezone.utc)
+        self.assertTrue(research_expired({'expires_at': '2025-01-20T22:42:54.73+00:00'}, now))
+        self.assertFalse(research_expired({'expires_at': '2025-01-20T22:42:55.7371+00:00'}, now))
+        self.assertFalse(research_expired({}, now))
+        self.assertTrue(research_expired({'expires_at': (now - timedelta(hours=1)).isoformat()}, now))
+
+
+class MemoryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('storage_manager.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = MemoryCache(max_size=3, capacities={'interaction': 2, 'research': 2})
+
+    def test_get_returns_what_was_set(self):
+        self.cache.set('research_ai', {'content': 'x'})
+        self.assertEqual(self.cache.get('research_ai'), {'content': 'x'})
+        self.assertIsNone(self.cache.get('research_other'))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('interaction_1', 1)
+        self.cache.set('interaction_2', 2)
+        # Reading 1 makes 2 the least recently used
+        self.cache.get('interaction_1')
+        self.cache.set('interaction_3', 3)
+        self.assertIsNone(self.cache.get('interaction_2'))
+        self.assertEqual(self.cache.get('interaction_1'), 1)
+        self.assertEqual(self.cache.get('interaction_3'), 3)
+
+    def test_namespaces_have_their_own_capacity(self):
+        self.cache.set('research_a', 'a')
+        for i in range(5):
+            self.cache.set(f'interaction_{i}', i)
+        self.assertEqual(self.cache.get('research_a'), 'a')
+        self.assertEqual(len(self.cache), 3)
+
+    def test_unlisted_namespace_uses_max_size(self):
+        for i in range(5):
+            self.cache.set(f'misc_{i}', i)
+        self.assertEqual(self.cache.stats()['misc']['size'], 3)
+        self.assertEqual(self.cache.stats()['misc']['capacity'], 3)
+
+    def test_expired_entry_is_a_miss(self):
+        self.cache.set('research_a', 'a', ttl=10)
+        self.now += 10
+        self.assertIsNone(self.cache.get('research_a'))
+        stats = self.cache.stats()['research']
+        self.assertEqual((stats['expirations'], stats['misses'], stats['size']), (1, 1, 0))
+
+    def test_writes_drop_expired_entries_of_other_keys(self):
+        self.cache.set('research_a', 'a', ttl=10)
+        self.cache.set('interaction_1', 1, ttl=100)
+        self.now += 20
+        self.cache.set('interaction_2', 2)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.stats()['research']['expirations'], 1)
+
+    def test_overwrite_extends_ttl(self):
+        self.cache.set('research_a', 'old', ttl=10)
+        self.now += 5
+        self.cache.set('research_a', 'new', ttl=10)
+        self.now += 8
+        # The first entry's heap item is stale and must not expire the new value
+        self.cache.set('interaction_1', 1)
+        self.assertEqual(self.cache.get('research_a'), 'new')
+
+    def test_stats(self):
+        self.cache.set('interaction_1', 1)
+        self.cache.set('interaction_2', 2)
+        self.cache.set('interaction_3', 3)
+        self.cache.get('interaction_3')
+        self.cache.get('interaction_1')
+        stats = self.cache.stats()['interaction']
+        self.assertEqual(stats, {
+            'size': 2, 'capacity': 2, 'hits': 1, 'misses': 1,
+            'evictions': 1, 'expirations': 0, 'hit_rate': 0.5
+        })
+
+
+
+class JSONLLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.path = os.path.join(self.workdir.name, 'log.jsonl')
+
+    def lines(self):
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line)['i'] for line in f]
+
+    def wait_for_compaction(self, log):
+        deadline = time.monotonic() + 5
+        while log._compacting and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(log._compacting)
+
+    def test_compacts_to_retained_records(self):
+        log = JSONLLog(self.path, retain=5)
+        for i in range(10):
+            log.append({'i': i})
+        self.wait_for_compaction(log)
+        self.assertEqual(self.lines(), [5, 6, 7, 8, 9])
+        self.assertEqual([r['i'] for r in log.recent(3)], [7, 8, 9])
+
+    def test_appends_during_compaction_are_kept(self):
+        log = JSONLLog(self.path, retain=5)
+        rewrite_started, release = threading.Event(), threading.Event()
+        write = log._write
+
+        def held_write(path, records):
+            write(path, records)
+            if path.endswith('.compact'):
+                rewrite_started.set()
+                release.wait(5)
+        log._write = held_write
+
+        for i in range(10):
+            log.append({'i': i})
+        self.assertTrue(rewrite_started.wait(5))
+        # More than retain records arrive while the file is being rewritten
+        for i in range(10, 22):
+            log.append({'i': i})
+        release.set()
+        self.wait_for_compaction(log)
+        self.assertEqual(self.lines(), list(range(5, 22)))
+        # The next append finds the file over its limit again and compacts it normally
+        log.append({'i': 22})
+        self.wait_for_compaction(log)
+        self.assertEqual(self.lines(), list(range(18, 23)))
+
+    def test_keep_drops_records_when_compacting(self):
+        log = JSONLLog(self.path, retain=4, keep=lambda record: record['i'] % 2 == 0)
+        for i in range(8):
+            log.append({'i': i})
+        self.wait_for_compaction(log)
+        self.assertEqual(self.lines(), [4, 6])
+        self.assertEqual([r['i'] for r in log.recent(10)], [4, 6])
+
+    def test_reload_and_legacy_migration(self):
+        legacy = os.path.join(self.workdir.name, 'legacy.json')
+        with open(legacy, 'w') as f:
+            json.dump([{'i': i} for i in range(8)], f)
+        log = JSONLLog(self.path, retain=5, legacy_file=legacy)
+        log.append({'i': 8})
+        log.sync()
+        reloaded = JSONLLog(self.path, retain=5, legacy_file=legacy)
+        self.assertEqual([r['i'] for r in reloaded.recent(10)], [4, 5, 6, 7, 8])
+        self.assertEqual(reloaded.find_last(lambda r: r['i'] % 2 == 1), {'i': 7})
+
+
+
+class FakeSupabase:
+    """PostgREST stand-in that can be taken offline"""
+
+    def __init__(self):
+        self.up = True
+        self.requests = []
+        self.next_id = 100
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if not self.up:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.requests.append(request)
+        if request.method == 'POST':
+            body = json.loads(request.content)
+            rows = body if isinstance(body, list) else [body]
+            returned = []
+            for row in rows:
+                self.next_id += 1
+                returned.append({**row, 'id': self.next_id})
+            return httpx.Response(201, json=returned)
+        return httpx.Response(200, json=[])
+
+
+class OfflineStorageTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.TemporaryDirectory()
+        os.chdir(self.workdir.name)
+        self.addCleanup(self.workdir.cleanup)
+        self.addCleanup(os.chdir, self.cwd)
+        self.supabase = FakeSupabase()
+        async_client = httpx.AsyncClient
+        for patcher in (
+            mock.patch.dict(os.environ, {'SUPABASE_URL': 'http://supabase.test', 'SUPABASE_KEY': 'key'}),
+            mock.patch.object(storage_manager.httpx, 'AsyncClient', lambda **kwargs: async_client(
+                transport=httpx.MockTransport(self.supabase), timeout=kwargs.get('timeout')
+            )),
+            mock.patch.object(storage_manager, 'get_url_index', lambda: self.index),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.index = URLIndex(os.path.join(self.workdir.name, 'url_index.json'))
+        self.storage = StorageManager()
+        self.addCleanup(self.storage.local.close)
+
+    async def asyncTearDown(self):
+        await self.storage.aclose()
+
+    async def test_queues_locally_and_stops_calling_supabase(self):
+        self.supabase.up = False
+        self.assertTrue(await self.storage.queue_article('A', 'https://news.example.com/a', 'text', 'feed'))
+        self.assertTrue(self.storage.offline)
+
+        calls = len(self.supabase.requests)
+        self.supabase.up = True
+        self.assertTrue(await self.storage.queue_article('B', 'https://news.example.com/b', 'text', 'feed'))
+        await self.storage.get_recent_interactions()
+        self.assertEqual(len(self.supabase.requests), calls)
+
+        self.assertEqual(self.storage.local.pending, 2)
+        first, second = self.storage.local.select('article_queue', order="scheduled_for")
+        self.assertLess(first['id'], 0)
+        gap = parse_timestamp(second['scheduled_for']) - parse_timestamp(first['scheduled_for'])
+        self.assertEqual(gap, timedelta(minutes=50))
+
+    async def test_replays_in_order_and_remaps_negative_ids(self):
+        self.supabase.up = False
+        await self.storage.queue_article('A', 'https://news.example.com/a', 'text', 'feed')
+        [queued] = self.storage.local.select('article_queue')
+        self.assertTrue(await self.storage.mark_article_posted(queued['id']))
+        self.assertEqual(self.storage.local.pending, 2)
+
+        self.supabase.up = True
+        self.assertEqual(await self.storage.sync_pending(), 2)
+
+        self.assertFalse(self.storage.offline)
+        self.assertEqual(self.storage.local.pending, 0)
+        insert, update = self.supabase.requests
+        self.assertEqual((insert.method, insert.url.path), ('POST', '/rest/v1/article_queue'))
+        remote_id = self.supabase.next_id
+        self.assertEqual(update.method, 'PATCH')
+        self.assertEqual(update.url.params['id'], f'eq.{remote_id}')
+        self.assertEqual(json.loads(update.content)['status'], 'posted')
+        [row] = self.storage.local.select('article_queue')
+        self.assertEqual((row['id'], row['status']), (remote_id, 'posted'))
+
+    async def test_background_replay_brings_the_manager_back_online(self):
+        self.supabase.up = False
+        await self.storage.get_recent_interactions()
+        self.assertTrue(self.storage.offline)
+
+        self.supabase.up = True
+        self.storage._last_sync_attempt -= storage_manager.SYNC_RETRY_INTERVAL
+        await self.storage.get_recent_interactions()
+        await self.storage._sync_task
+        self.assertFalse(self.storage.offline)
+        await self.storage.get_recent_interactions()
+        self.assertEqual(self.supabase.requests[-1].url.path, '/rest/v1/tweet_interactions')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,13 +6,14 @@ import asyncio
 from datetime import datetime, date, timezone
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
 import logging
 
-from ai_data import Data_generation
 from exmplr_API_Tweet_Class import find_enquiry
 from collect_news import collect_initial_news, check_latest_feed
-from storage_manager import StorageManager
+from feed_service import get_feed_service
+from url_index import get_url_index
+from components import get_components
+from news_config import CONTENT_AGE_LIMITS
 
 # Configure logging
 logging.basicConfig(
@@ -21,14 +22,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Recent entries kept per feed in latest_news
+MAX_LATEST_NEWS = 20
+# Articles a weekly research pass takes from each feed
+WEEKLY_ARTICLES_PER_FEED = 1
+
 # Load environment variables
 load_dotenv()
 logger.info("Environment variables loaded")
 
-# Load OpenAI API key from environment
-gen_ai = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+# OpenAI client shared with the rest of the agent
+gen_ai = get_components().openai
 logger.info("OpenAI client initialized")
 
 
@@ -65,10 +69,11 @@ class Twitter:
 
         # Initialize components
         logger.info("Initializing storage manager")
-        self.storage = StorageManager()
+        components = get_components()
+        self.storage = components.storage
         
         logger.info("Initializing AI data generation")
-        self.gen_ai = Data_generation()
+        self.gen_ai = components.data_generation
         
         # Initialize tracking lists and timestamps
         logger.info("Setting up interaction tracking")
@@ -148,7 +153,7 @@ class Twitter:
                     ref_tweet = "   "
                 total_tweet = ref_tweet + "\n\n" + original_tweet
                 logger.debug(f"Combined tweet content: {total_tweet}")
-                answer = find_enquiry(total_tweet)
+                answer = find_enquiry(total_tweet, self.gen_ai)
                 if answer != 'failed':
                     time.sleep(60)
                     self.client.like(id)
@@ -624,21 +629,34 @@ class Twitter:
             logger.error(f"Error checking content relevance: {str(e)}")
             return False
 
-    async def analyze_news(self, is_weekly=False):
+    async def check_news_feeds(self, is_weekly=False) -> int:
+        """Poll the news feeds that are due and queue tweets for new relevant articles"""
+        queued_count = 0
         try:
-            post_type = "weekly research" if is_weekly else "news"
-            logger.info(f"Starting {post_type} analysis...")
-            
+            # One snapshot of the news feeds, fetched concurrently, for the whole pass
+            snapshot = await get_feed_service().snapshot(self.links)
+
             # Check all feeds for new content
-            for url in list(self.latest_news.keys()):
+            for url in self.links:
                 logger.info(f"Checking feed: {url}")
                 
-                results = check_latest_feed(url, self.latest_news[url])
+                if is_weekly:
+                    # Weekly posts pick from the past week's entries, separately from news
+                    results = await check_latest_feed(
+                        url, snapshot, scope='weekly',
+                        max_age_hours=CONTENT_AGE_LIMITS["research"], limit=WEEKLY_ARTICLES_PER_FEED
+                    )
+                else:
+                    results = await check_latest_feed(url, snapshot)
                 if results:
                     logger.info(f"Found {len(results)} new articles")
                     
                     # Process each new article
                     for article in results:
+                        if article['url'] in get_url_index():
+                            logger.info(f"Skipping already queued article: {article['title']}")
+                            continue
+
                         # Skip relevance check for weekly posts
                         if not is_weekly:
                             # Validation Process
@@ -675,17 +693,27 @@ class Twitter:
                         )
                         
                         if queued:
+                            queued_count += 1
                             logger.info("✅ Successfully queued article")
                             logger.info(f"Queue Status: Article '{article['title']}' ready for posting")
                         else:
                             logger.error("❌ Failed to queue article - Database error")
                     
-                    # Update cache with new articles if we got results
-                    if results:
-                        self.latest_news[url] = results
+                    # Keep the newest entries; the feed's seen-set decides what is new
+                    self.latest_news[url] = (results + self.latest_news.get(url, []))[:MAX_LATEST_NEWS]
                 else:
                     logger.info(f"No new content found in {url}")
+        except Exception as e:
+            logger.error(f"Error checking news feeds: {str(e)}")
+        return queued_count
+
+    async def analyze_news(self, is_weekly=False):
+        try:
+            post_type = "weekly research" if is_weekly else "news"
+            logger.info(f"Starting {post_type} analysis...")
             
+            await self.check_news_feeds(is_weekly=is_weekly)
+
             # Check Queue for Articles Ready to Post
             logger.info("\nChecking posting queue...")
             next_article = await self.storage.get_next_article()
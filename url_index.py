@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Iterable, Optional
+from urllib.parse import urlparse, urlencode, parse_qsl, urlunparse
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the article body
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so the same article always maps to one form.
+
+    Drops tracking parameters and fragments, sorts the query, lowercases
+    the host, strips trailing slashes and treats http and https alike.
+    """
+    parsed = urlparse(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ]
+    scheme = parsed.scheme.lower()
+    if scheme in ('http', 'https'):
+        scheme = 'https'
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((
+        scheme,
+        parsed.netloc.lower(),
+        path,
+        parsed.params,
+        urlencode(sorted(query)),
+        ''
+    ))
+
+def url_key(url: str) -> str:
+    """Short hash of a URL's canonical form"""
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()[:16]
+
+
+class URLIndex:
+    """Set of posted article URLs keyed by canonical-URL hash.
+
+    Maps each hash to the time the article was posted or queued, persisted
+    to a local JSON file and bounded to the most recent max_entries.
+    """
+
+    def __init__(self, index_file: str = "url_index.json", max_entries: int = 10000):
+        self.index_file = index_file
+        self.max_entries = max_entries
+        self.posted: "OrderedDict[str, float]" = self._load()
+
+    def _load(self) -> "OrderedDict[str, float]":
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    return OrderedDict(sorted(json.load(f).items(), key=lambda item: item[1]))
+        except Exception as e:
+            logger.error(f"Error loading URL index: {e}")
+        return OrderedDict()
+
+    def _save(self) -> None:
+        try:
+            tmp_file = self.index_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(self.posted, f)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.error(f"Error saving URL index: {e}")
+
+    def __contains__(self, url: str) -> bool:
+        return bool(url) and url_key(url) in self.posted
+
+    def posted_at(self, url: str) -> Optional[float]:
+        return self.posted.get(url_key(url)) if url else None
+
+    def add(self, url: str, posted_at: Optional[float] = None) -> bool:
+        """Record a posted URL; returns False if it was already indexed"""
+        return self.add_many([url], posted_at) > 0
+
+    def add_many(self, urls: Iterable[str], posted_at: Optional[float] = None) -> int:
+        """Record several posted URLs with one write; returns how many were new"""
+        added = 0
+        for url in urls:
+            if not url:
+                continue
+            key = url_key(url)
+            if key in self.posted:
+                continue
+            self.posted[key] = posted_at if posted_at is not None else time.time()
+            added += 1
+        if added:
+            while len(self.posted) > self.max_entries:
+                self.posted.popitem(last=False)
+            self._save()
+        return added
+
+
+_index: Optional[URLIndex] = None
+
+def get_url_index() -> URLIndex:
+    """Process-wide posted-URL index"""
+    global _index
+    if _index is None:
+        _index = URLIndex()
+    return _index